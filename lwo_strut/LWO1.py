@@ -1,7 +1,5 @@
-import struct
-import chunk
-
 from .lwoBase import LWOBase, _lwo_base, _obj_layer, _obj_surf
+from .lwoCodec import U2, I2, F4, U2x2, U1x4, ID4, u2_array
 
 #, _obj_surf, _surf_texture, _surf_position
 class _surf_texture_5(_lwo_base):
@@ -18,6 +16,14 @@ class _surf_texture_5(_lwo_base):
 
 class LWO1(LWOBase):
     """Read version 1 file, LW < 6."""
+
+    # LWOB image paths live in the surface textures.
+    lazy_chunks = {
+        "tags": (b"SRFS",),
+        "surfs": (b"SURF",),
+        "clips": (b"SURF",),
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.file_types = [b"LWOB", b"LWLO"]
@@ -27,7 +33,7 @@ class LWO1(LWOBase):
         bytes = self.bytes2
         # XXX: Need to check what these two exactly mean for a LWOB/LWLO file.
         new_layr = _obj_layer()
-        new_layr.index, flags = struct.unpack(">HH", bytes[0:4])
+        new_layr.index, flags = U2x2.unpack_from(bytes, 0)
 
         self.info("Reading Object Layer")
         offset = 4
@@ -47,24 +53,21 @@ class LWO1(LWOBase):
         But it also includes the surface index.
         """
         bytes = self.bytes2
-        self.info(f"    Reading Layer ({self.layers[-1].name}) Polygons")
+        self.info("    Reading Layer (%s) Polygons", self.layers[-1].name)
         offset = 0
         chunk_len = len(bytes)
         old_pols_count = len(self.layers[-1].pols)
         poly = 0
 
         while offset < chunk_len:
-            (pnts_count,) = struct.unpack(">H", bytes[offset : offset + 2])
+            (pnts_count,) = U2.unpack_from(bytes, offset)
             offset += 2
-            all_face_pnts = []
-            for j in range(pnts_count):
-                (face_pnt,) = struct.unpack(">H", bytes[offset : offset + 2])
-                offset += 2
-                all_face_pnts.append(face_pnt)
+            all_face_pnts = list(u2_array(pnts_count).unpack_from(bytes, offset))
+            offset += 2 * pnts_count
             all_face_pnts.reverse()
 
             self.layers[-1].pols.append(all_face_pnts)
-            (sid,) = struct.unpack(">h", bytes[offset : offset + 2])
+            (sid,) = I2.unpack_from(bytes, offset)
             offset += 2
             sid = abs(sid) - 1
             if sid not in self.layers[-1].surf_tags:
@@ -88,44 +91,45 @@ class LWO1(LWOBase):
         offset = name_len
         chunk_len = len(bytes)
         while offset < chunk_len:
-            (subchunk_name,) = struct.unpack("4s", bytes[offset : offset + 4])
+            (subchunk_name,) = ID4.unpack_from(bytes, offset)
             offset += 4
-            (subchunk_len,) = struct.unpack(">H", bytes[offset : offset + 2])
+            (subchunk_len,) = U2.unpack_from(bytes, offset)
             offset += 2
 
             # Now test which subchunk it is.
             if b"COLR" == subchunk_name:
-                color = struct.unpack(">BBBB", bytes[offset : offset + 4])
+                color = U1x4.unpack_from(bytes, offset)
                 surf.colr = [color[0] / 255.0, color[1] / 255.0, color[2] / 255.0]
 
             elif b"DIFF" == subchunk_name:
-                (surf.diff,) = struct.unpack(">h", bytes[offset : offset + 2])
+                (surf.diff,) = I2.unpack_from(bytes, offset)
                 surf.diff /= 256.0  # Yes, 256 not 255.
 
             elif b"LUMI" == subchunk_name:
-                (surf.lumi,) = struct.unpack(">h", bytes[offset : offset + 2])
+                (surf.lumi,) = I2.unpack_from(bytes, offset)
                 surf.lumi /= 256.0
 
             elif b"SPEC" == subchunk_name:
-                (surf.spec,) = struct.unpack(">h", bytes[offset : offset + 2])
+                (surf.spec,) = I2.unpack_from(bytes, offset)
                 surf.spec /= 256.0
 
             elif b"REFL" == subchunk_name:
-                (surf.refl,) = struct.unpack(">h", bytes[offset : offset + 2])
+                (surf.refl,) = I2.unpack_from(bytes, offset)
                 surf.refl /= 256.0
 
             elif b"TRAN" == subchunk_name:
-                (surf.tran,) = struct.unpack(">h", bytes[offset : offset + 2])
+                (surf.tran,) = I2.unpack_from(bytes, offset)
                 surf.tran /= 256.0
 
             elif b"RIND" == subchunk_name:
-                (surf.rind,) = struct.unpack(">f", bytes[offset : offset + 4])
+                (surf.rind,) = F4.unpack_from(bytes, offset)
 
             elif b"GLOS" == subchunk_name:
-                (surf.glos,) = struct.unpack(">h", bytes[offset : offset + 2])
+                (surf.glos,) = I2.unpack_from(bytes, offset)
 
             elif b"SMAN" == subchunk_name:
-                (s_angle,) = struct.unpack(">f", bytes[offset : offset + 4])
+                (s_angle,) = F4.unpack_from(bytes, offset)
+                surf.smooth_angle = s_angle
                 if s_angle > 0.0:
                     surf.smooth = True
 
@@ -148,7 +152,7 @@ class LWO1(LWOBase):
 
             elif b"TFLG" == subchunk_name:
                 if texture:
-                    (mapping,) = struct.unpack(">h", bytes[offset : offset + 2])
+                    (mapping,) = I2.unpack_from(bytes, offset)
                     if mapping & 1:
                         texture.X = True
                     elif mapping & 2:
@@ -156,72 +160,72 @@ class LWO1(LWOBase):
                     elif mapping & 4:
                         texture.Z = True
             elif b"FLAG" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"VLUM" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"VDIF" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"VSPC" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"VRFL" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"VTRN" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"RFLT" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"ALPH" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TOPC" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TWRP" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TSIZ" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TCTR" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TAAS" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TVAL" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TFP0" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TAMP" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"RIMG" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TCLR" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TFAL" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TVEL" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TREF" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TALP" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"EDGE" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"GLOW" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TIP0" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TFP1" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TFP2" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"TFP3" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"SPBF" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"SHDR" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"SDAT" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             elif b"IMSQ" == subchunk_name:
-                self.debug(f"Unimplemented SubBlock: {subchunk_name}")  
+                self.debug("Unimplemented SubBlock: %s", subchunk_name)  
             else:
                 self.error(f"Unsupported SubBlock: {subchunk_name}")
-                #self.debug(f"Unsupported SubBlock: {subchunk_name}")
+                #self.debug("Unsupported SubBlock: %s", subchunk_name)
 
             offset += subchunk_len
 
@@ -246,7 +250,7 @@ class LWO1(LWOBase):
             self.last_pols_count = self.read_pols()
             self.layers[-1].has_subds = True
         elif b"PTAG" == chunkname:
-            (tag_type,) = struct.unpack("4s", self.rootchunk.read(4))
+            tag_type = bytes(self.rootchunk.read(4))
             if tag_type == b"SURF":
                 raise Exception("Missing commented out function")
             #                     read_surf_tags_5(
@@ -1,7 +1,20 @@
-import struct
-import chunk
-
 from .lwoBase import LWOBase, _obj_layer, _obj_surf, _surf_texture, _surf_position
+from .lwoDispatch import lwoDispatch
+from .lwoCodec import U2, I2, U4, F4, U2x2, VEC2, VEC12, COL16, SUBCHUNK, vx_records
+from .lwoArray import (
+    np,
+    EdgeWeights,
+    PolygonArray,
+    PointRowArray,
+    SurfaceTags,
+    VMapArray,
+    VMadArray,
+    decode_pols,
+    edge_key,
+    next_points,
+    payload_floats,
+    scan_vx,
+)
 
 
 class LWO2(LWOBase):
@@ -29,7 +42,7 @@ class LWO2(LWOBase):
     def read_clip(self):
         """Read texture clip path"""
         bytes = self.bytes2
-        (c_id, ) = struct.unpack(">L", bytes[0:4])
+        (c_id, ) = U4.unpack_from(bytes, 0)
         orig_path, path_len = self.read_lwostring(bytes[10:])
         self.clips[c_id] = orig_path
 
@@ -37,14 +50,14 @@ class LWO2(LWOBase):
         """Read the object's layer data."""
         bytes = self.bytes2
         new_layr = _obj_layer()
-        new_layr.index, flags = struct.unpack(">HH", bytes[0:4])
+        new_layr.index, flags = U2x2.unpack_from(bytes, 0)
 
         if flags > 0 and not self.ch.load_hidden:
             return False
 
         self.info("Reading Object Layer")
         offset = 4
-        pivot = struct.unpack(">fff", bytes[offset : offset + 12])
+        pivot = VEC12.unpack_from(bytes, offset)
         # Swap Y and Z to match Blender's pitch.
         new_layr.pivot = [pivot[0], pivot[2], pivot[1]]
         offset += 12
@@ -57,80 +70,69 @@ class LWO2(LWOBase):
             new_layr.name = f"Layer {new_layr.index + 1}"
 
         if len(bytes) == offset + 2:
-            (new_layr.parent_index,) = struct.unpack(
-                ">h", bytes[offset : offset + 2]
-            )
+            (new_layr.parent_index,) = I2.unpack_from(bytes, offset)
 
         self.layers.append(new_layr)
 
     def read_weightmap(self):
         """Read a weight map's values."""
         bytes = self.bytes2
-        chunk_len = len(bytes)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         offset += name_len
-        weights = []
 
-        while offset < chunk_len:
-            pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pnt_id_len
-            (value,) = struct.unpack(">f", bytes[offset : offset + 4])
-            offset += 4
-            weights.append([pnt_id, value])
+        if self.use_numpy:
+            (pnt_ids,), raw = scan_vx(bytes[offset:], 1, 4)
+            weights = PointRowArray(pnt_ids, payload_floats(raw)[:, 0])
+        else:
+            weights = [[pnt_id, value] for pnt_id, value in vx_records(bytes[offset:], 1, F4)]
 
         self.layers[-1].wmaps[name] = weights
 
     def read_morph(self, is_abs):
         """Read an endomorph's relative or absolute displacement values."""
         bytes = self.bytes2
-        chunk_len = len(bytes)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         offset += name_len
         deltas = []
 
-        while offset < chunk_len:
-            pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pnt_id_len
-            pos = struct.unpack(">fff", bytes[offset : offset + 12])
-            offset += 12
-            pnt = self.layers[-1].pnts[pnt_id]
+        if self.use_numpy:
+            (pnt_ids,), raw = scan_vx(bytes[offset:], 1, 12)
+            # Swap the Y and Z to match Blender's pitch.
+            pos = payload_floats(raw)[:, [0, 2, 1]].astype(np.float64)
+            if not is_abs:
+                pos += np.asarray(self.layers[-1].pnts)[pnt_ids]
+            if len(pnt_ids):
+                self.layers[-1].morphs[name] = PointRowArray(pnt_ids, pos)
+            return
+
+        pnts = self.layers[-1].pnts
+        for pnt_id, x, y, z in vx_records(bytes[offset:], 1, VEC12):
+            pnt = pnts[pnt_id]
 
             if is_abs:
-                deltas.append([pnt_id, pos[0], pos[2], pos[1]])
+                deltas.append([pnt_id, x, z, y])
             else:
                 # Swap the Y and Z to match Blender's pitch.
-                deltas.append(
-                    [pnt_id, pnt[0] + pos[0], pnt[1] + pos[2], pnt[2] + pos[1]]
-                )
+                deltas.append([pnt_id, pnt[0] + x, pnt[1] + z, pnt[2] + y])
 
+        if deltas:
             self.layers[-1].morphs[name] = deltas
 
     def read_colmap(self):
         """Read the RGB or RGBA color map."""
         bytes = self.bytes2
-        chunk_len = len(bytes)
-        (dia,) = struct.unpack(">H", bytes[0:2])
+        (dia,) = U2.unpack_from(bytes, 0)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         offset += name_len
         colors = {}
 
-        if dia == 3:
-            while offset < chunk_len:
-                pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-                offset += pnt_id_len
-                col = struct.unpack(">fff", bytes[offset : offset + 12])
-                offset += 12
-                colors[pnt_id] = (col[0], col[1], col[2])
-        elif dia == 4:
-            while offset < chunk_len:
-                pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-                offset += pnt_id_len
-                col = struct.unpack(">ffff", bytes[offset : offset + 16])
-                offset += 16
-                colors[pnt_id] = (col[0], col[1], col[2])
+        if dia in (3, 4):
+            payload = VEC12 if dia == 3 else COL16
+            for r in vx_records(bytes[offset:], 1, payload):
+                colors[r[0]] = r[1:4]
 
         if name in self.layers[-1].colmaps:
             if "PointMap" in self.layers[-1].colmaps[name]:
@@ -143,61 +145,35 @@ class LWO2(LWOBase):
     def read_normmap(self):
         """Read vertex normal maps."""
         bytes = self.bytes2
-        chunk_len = len(bytes)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         offset += name_len
         vnorms = {}
 
-        while offset < chunk_len:
-            pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pnt_id_len
-            norm = struct.unpack(">fff", bytes[offset : offset + 12])
-            offset += 12
-            vnorms[pnt_id] = [norm[0], norm[2], norm[1]]
+        for pnt_id, x, y, z in vx_records(bytes[offset:], 1, VEC12):
+            vnorms[pnt_id] = [x, z, y]
 
         self.layers[-1].vnorms = vnorms
 
     def read_color_vmad(self):
         """Read the Discontinuous (per-polygon) RGB values."""
         bytes = self.bytes2
-        chunk_len = len(bytes)
-        (dia,) = struct.unpack(">H", bytes[0:2])
+        (dia,) = U2.unpack_from(bytes, 0)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         offset += name_len
         colors = {}
         abs_pid = len(self.layers[-1].pols) - self.last_pols_count
 
-        if dia == 3:
-            while offset < chunk_len:
-                pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-                offset += pnt_id_len
-                pol_id, pol_id_len = self.read_vx(bytes[offset : offset + 4])
-                offset += pol_id_len
-
+        if dia in (3, 4):
+            payload = VEC12 if dia == 3 else COL16
+            for r in vx_records(bytes[offset:], 2, payload):
                 # The PolyID in a VMAD can be relative, this offsets it.
-                pol_id += abs_pid
-                col = struct.unpack(">fff", bytes[offset : offset + 12])
-                offset += 12
+                pol_id = r[1] + abs_pid
                 if pol_id in colors:
-                    colors[pol_id][pnt_id] = (col[0], col[1], col[2])
+                    colors[pol_id][r[0]] = r[2:5]
                 else:
-                    colors[pol_id] = dict({pnt_id: (col[0], col[1], col[2])})
-        elif dia == 4:
-            while offset < chunk_len:
-                pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-                offset += pnt_id_len
-                pol_id, pol_id_len = self.read_vx(bytes[offset : offset + 4])
-                offset += pol_id_len
-
-                pol_id += abs_pid
-                col = struct.unpack(">ffff", bytes[offset : offset + 16])
-                offset += 16
-                if pol_id in colors:
-                    colors[pol_id][pnt_id] = (col[0], col[1], col[2])
-                else:
-                    colors[pol_id] = dict({pnt_id: (col[0], col[1], col[2])})
+                    colors[pol_id] = {r[0]: r[2:5]}
 
         if name in self.layers[-1].colmaps:
             if "FaceMap" in self.layers[-1].colmaps[name]:
@@ -210,18 +186,17 @@ class LWO2(LWOBase):
     def read_uvmap(self):
         """Read the simple UV coord values."""
         bytes = self.bytes2
-        chunk_len = len(bytes)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         offset += name_len
         uv_coords = {}
 
-        while offset < chunk_len:
-            pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pnt_id_len
-            pos = struct.unpack(">ff", bytes[offset : offset + 8])
-            offset += 8
-            uv_coords[pnt_id] = (pos[0], pos[1])
+        if self.use_numpy:
+            (pnt_ids,), raw = scan_vx(bytes[offset:], 1, 8)
+            uv_coords = VMapArray(pnt_ids, payload_floats(raw))
+        else:
+            for pnt_id, u, v in vx_records(bytes[offset:], 1, VEC2):
+                uv_coords[pnt_id] = (u, v)
 
         if name in self.layers[-1].uvmaps_vmap:
             if "PointMap" in self.layers[-1].uvmaps_vmap[name]:
@@ -234,26 +209,22 @@ class LWO2(LWOBase):
     def read_uv_vmad(self):
         """Read the Discontinuous (per-polygon) uv values."""
         bytes = self.bytes2
-        chunk_len = len(bytes)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         offset += name_len
         uv_coords = {}
         abs_pid = len(self.layers[-1].pols) - self.last_pols_count
 
-        while offset < chunk_len:
-            pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pnt_id_len
-            pol_id, pol_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pol_id_len
-
-            pol_id += abs_pid
-            pos = struct.unpack(">ff", bytes[offset : offset + 8])
-            offset += 8
-            if pol_id in uv_coords:
-                uv_coords[pol_id][pnt_id] = (pos[0], pos[1])
-            else:
-                uv_coords[pol_id] = dict({pnt_id: (pos[0], pos[1])})
+        if self.use_numpy:
+            (pnt_ids, pol_ids), raw = scan_vx(bytes[offset:], 2, 8)
+            uv_coords = VMadArray(pol_ids + abs_pid, pnt_ids, payload_floats(raw))
+        else:
+            for pnt_id, pol_id, u, v in vx_records(bytes[offset:], 2, VEC2):
+                pol_id += abs_pid
+                if pol_id in uv_coords:
+                    uv_coords[pol_id][pnt_id] = (u, v)
+                else:
+                    uv_coords[pol_id] = {pnt_id: (u, v)}
 
         if name in self.layers[-1].uvmaps_vmad:
             if "FaceMap" in self.layers[-1].uvmaps_vmad[name]:
@@ -266,7 +237,6 @@ class LWO2(LWOBase):
     def read_weight_vmad(self):
         """Read the VMAD Weight values."""
         bytes = self.bytes2
-        chunk_len = len(bytes)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         if name != "Edge Weight":
@@ -277,14 +247,21 @@ class LWO2(LWOBase):
         # normal pointing at you). This gives edges a 'direction' which is used
         # when it comes to storing CC edge weight values. The weight is given
         # to the point preceding the edge that the weight belongs to.
-        while offset < chunk_len:
-            pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pnt_id_len
-            pol_id, pol_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pol_id_len
-            (weight,) = struct.unpack(">f", bytes[offset : offset + 4])
-            offset += 4
+        if self.use_numpy:
+            (pnt_ids, pol_ids), raw = scan_vx(bytes[offset:], 2, 4)
+            pols = PolygonArray.from_lists(self.layers[-1].pols)
+            second_pnts = next_points(pols, pol_ids, pnt_ids)
+            found = second_pnts >= 0
+            weights = EdgeWeights(
+                edge_key(second_pnts[found], pnt_ids[found]),
+                payload_floats(raw)[found, 0],
+            )
+            edge_weights = EdgeWeights.from_dict(self.layers[-1].edge_weights)
+            edge_weights.update(weights)
+            self.layers[-1].edge_weights = edge_weights
+            return
 
+        for pnt_id, pol_id, weight in vx_records(bytes[offset:], 2, F4):
             face_pnts = self.layers[-1].pols[pol_id]
             try:
                 # Find the point's location in the polygon's point list
@@ -303,36 +280,39 @@ class LWO2(LWOBase):
     def read_normal_vmad(self):
         """Read the VMAD Split Vertex Normals"""
         bytes = self.bytes2
-        chunk_len = len(bytes)
         offset = 2
         name, name_len = self.read_lwostring(bytes[offset:])
         lnorms = {}
         offset += name_len
 
-        while offset < chunk_len:
-            pnt_id, pnt_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pnt_id_len
-            pol_id, pol_id_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pol_id_len
-            norm = struct.unpack(">fff", bytes[offset : offset + 12])
-            offset += 12
-            if not (pol_id in lnorms.keys()):
+        for pnt_id, pol_id, x, y, z in vx_records(bytes[offset:], 2, VEC12):
+            if pol_id not in lnorms:
                 lnorms[pol_id] = []
-            lnorms[pol_id].append([pnt_id, norm[0], norm[2], norm[1]])
+            lnorms[pol_id].append([pnt_id, x, z, y])
 
-        self.info(f"LENGTH {len(lnorms.keys())}")
+        self.info("LENGTH %s", len(lnorms.keys()))
         self.layers[-1].lnorms = lnorms
 
     def read_pols(self):
         """Read the layer's polygons, each one is just a list of point indexes."""
-        self.info(f"    Reading Layer ({self.layers[-1].name}) Polygons")
+        self.info("    Reading Layer (%s) Polygons", self.layers[-1].name)
         bytes = self.bytes2
+        if self.use_numpy:
+            pols = decode_pols(bytes)
+            if len(self.layers[-1].pols):
+                self.layers[-1].pols = PolygonArray.from_lists(self.layers[-1].pols)
+                self.layers[-1].pols.extend(pols)
+            else:
+                self.layers[-1].pols = pols
+            self.last_pols_count = len(pols)
+            return
+
         offset = 0
         pols_count = len(bytes)
         old_pols_count = len(self.layers[-1].pols)
 
         while offset < pols_count:
-            (pnts_count,) = struct.unpack(">H", bytes[offset : offset + 2])
+            (pnts_count,) = U2.unpack_from(bytes, offset)
             offset += 2
             all_face_pnts = []
             for j in range(pnts_count):
@@ -347,13 +327,13 @@ class LWO2(LWOBase):
 
     def read_bones(self):
         """Read the layer's skelegons."""
-        self.info(f"    Reading Layer ({self.layers[-1].name}) Bones")
+        self.info("    Reading Layer (%s) Bones", self.layers[-1].name)
         bytes = self.bytes2
         offset = 0
         bones_count = len(bytes)
 
         while offset < bones_count:
-            (pnts_count,) = struct.unpack(">H", bytes[offset : offset + 2])
+            (pnts_count,) = U2.unpack_from(bytes, offset)
             offset += 2
             all_bone_pnts = []
             for j in range(pnts_count):
@@ -362,12 +342,11 @@ class LWO2(LWOBase):
                 all_bone_pnts.append(bone_pnt)
 
             self.layers[-1].bones.append(all_bone_pnts)
+        self.just_read_bones = True
 
     def read_bone_tags(self, type):
         """Read the bone name or roll tags."""
         bytes = self.bytes2
-        offset = 0
-        chunk_len = len(bytes)
 
         if "BONE" == type:
             bone_dict = self.layers[-1].bone_names
@@ -376,11 +355,7 @@ class LWO2(LWOBase):
         else:
             return
 
-        while offset < chunk_len:
-            pid, pid_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pid_len
-            (tid,) = struct.unpack(">H", bytes[offset : offset + 2])
-            offset += 2
+        for pid, tid in vx_records(bytes, 1, U2):
             bone_dict[pid] = self.tags[tid]
 
     def read_position(self, subbytes, offset, subchunk_len):
@@ -388,41 +363,11 @@ class LWO2(LWOBase):
         suboffset = 0
 
         while suboffset < subchunk_len:
-            (subsubchunk_name,) = struct.unpack(
-                "4s", subbytes[offset + suboffset : offset + suboffset + 4]
-            )
-            suboffset += 4
-            (slen,) = struct.unpack(
-                ">H", subbytes[offset + suboffset : offset + suboffset + 2]
+            subsubchunk_name, slen = SUBCHUNK.unpack_from(subbytes, offset + suboffset)
+            suboffset += 6
+            self.position_handlers.dispatch(
+                self, subsubchunk_name, p, subbytes, offset + suboffset, slen
             )
-            suboffset += 2
-
-            if b"CNTR" == subsubchunk_name:
-                p.cntr = struct.unpack(">fffh", subbytes[offset + suboffset : offset + suboffset + 14])
-                if 20 == slen:
-                    _ = struct.unpack(">hf", subbytes[offset + suboffset + 14 : offset + suboffset + slen])
-            elif b"SIZE" == subsubchunk_name:
-                p.size = struct.unpack(
-                    ">fffh", subbytes[offset + suboffset : offset + suboffset + 14]
-                )
-                if 20 == slen:
-                    _ = struct.unpack(">hf", subbytes[offset + suboffset + 14 : offset + suboffset + slen])
-            elif b"ROTA" == subsubchunk_name:
-                p.rota = struct.unpack(
-                    ">fffH", subbytes[offset + suboffset : offset + suboffset + 14]
-                )
-                if 20 == slen:
-                    _ = struct.unpack(">hf", subbytes[offset + suboffset + 14 : offset + suboffset + slen])
-            elif b"FALL" == subsubchunk_name:
-                p.fall = struct.unpack(
-                    ">hfffh", subbytes[offset + suboffset : offset + suboffset + slen]
-                )
-            elif b"OREF" == subsubchunk_name:
-                p.oref, name_len = self.read_lwostring(subbytes[offset + suboffset :])
-            elif b"CSYS" == subsubchunk_name:
-                (p.csys,) = struct.unpack(
-                    ">h", subbytes[offset + suboffset : offset + suboffset + slen]
-                )
             suboffset += slen
         return p
 
@@ -432,113 +377,44 @@ class LWO2(LWOBase):
         
         suboffset = 6 + ord_len
         while suboffset < subchunk_len:
-            (subsubchunk_name,) = struct.unpack(
-                "4s", subbytes[offset + suboffset : offset + suboffset + 4]
+            subsubchunk_name, subsubchunk_len = SUBCHUNK.unpack_from(
+                subbytes, offset + suboffset
             )
-            suboffset += 4
-            (subsubchunk_len,) = struct.unpack(
-                ">H", subbytes[offset + suboffset : offset + suboffset + 2]
+            suboffset += 6
+            self.texture_handlers.dispatch(
+                self, subsubchunk_name, texture, subbytes, offset + suboffset, subsubchunk_len
             )
-            suboffset += 2
-            #self.debug(f"xx {num} {} {subsubchunk_len}")
-                        
-            if b"TMAP" == subsubchunk_name:
-                texture.position = self.read_position(
-                    subbytes, (offset + suboffset), subsubchunk_len
-                )
-            elif b"CHAN" == subsubchunk_name:
-                (texture.channel,) = struct.unpack(
-                    "4s",
-                    subbytes[offset + suboffset : offset + suboffset + 4],
-                )
-                texture.channel = texture.channel.decode("ascii")
-            elif b"OPAC" == subsubchunk_name:
-                (texture.opactype,) = struct.unpack(
-                    ">H",
-                    subbytes[offset + suboffset : offset + suboffset + 2],
-                )
-                (texture.opac,) = struct.unpack(
-                    ">f",
-                    subbytes[offset + suboffset + 2 : offset + suboffset + 6],
-                )
-            elif b"ENAB" == subsubchunk_name:
-                (texture.enab,) = struct.unpack(
-                    ">H",
-                    subbytes[offset + suboffset : offset + suboffset + 2],
-                )
-            elif b"IMAG" == subsubchunk_name:
-                (texture.clipid,) = struct.unpack(
-                    ">H",
-                    subbytes[offset + suboffset : offset + suboffset + 2],
-                )
-            elif b"PROJ" == subsubchunk_name:
-                (texture.projection,) = struct.unpack(
-                    ">H",
-                    subbytes[offset + suboffset : offset + suboffset + 2],
-                )
-            elif b"VMAP" == subsubchunk_name:
-                texture.uvname, name_len = self.read_lwostring(
-                    subbytes[offset + suboffset :]
-                )
-            elif b"FUNC" == subsubchunk_name:  # This is the procedural
-                texture.func, name_len = self.read_lwostring(
-                    subbytes[offset + suboffset :]
-                )
-            elif b"NEGA" == subsubchunk_name:
-                (texture.nega,) = struct.unpack(
-                    ">H",
-                    subbytes[offset + suboffset : offset + suboffset + 2],
-                )
-            elif b"AXIS" == subsubchunk_name:
-                (texture.axis,) = struct.unpack(
-                    ">H",
-                    subbytes[offset + suboffset : offset + suboffset + 2],
-                )
-            elif b"WRAP" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name} {subchunk_len}")                 
-            elif b"WRPW" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"WRPH" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"AAST" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"PIXB" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"VALU" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"TAMP" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"STCK" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"PNAM" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"INAM" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"GRST" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"GREN" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"GRPT" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"IKEY" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"FKEY" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            elif b"GVER" == subsubchunk_name:
-                self.debug(f"Unimplemented SubSubBlock: {subsubchunk_name}")                                
-            else:
-                self.error(f"Unsupported SubSubBlock: {subsubchunk_name} {subbytes[offset + suboffset:]}")  
-                raise
             suboffset += subsubchunk_len
 
         return texture
 
+    def read_fields(self, x, data, offset, length, s, *attrs):
+        """Unpack a subchunk into attributes of x, one attribute takes every value."""
+        values = s.unpack_from(data, offset)
+        if len(attrs) == 1:
+            setattr(x, attrs[0], values[0] if len(values) == 1 else values)
+        else:
+            for attr, value in zip(attrs, values):
+                setattr(x, attr, value)
+
+    def read_string_field(self, x, data, offset, length, attr):
+        value, value_len = self.read_lwostring(data[offset:])
+        setattr(x, attr, value)
+
+    def read_texture_tmap(self, texture, data, offset, length):
+        texture.position = self.read_position(data, offset, length)
+
+    def read_texture_chan(self, texture, data, offset, length):
+        texture.channel = bytes(data[offset : offset + 4]).decode("ascii")
+
+    def unsupported_subsubchunk(self, name, texture, data, offset, length):
+        self.error(f"Unsupported SubSubBlock: {name} {bytes(data[offset:])}")
+        raise Exception(f"Unsupported SubSubBlock: {name}")
+
     def read_surf_tags(self):
         """Read the list of PolyIDs and tag indexes."""
-        self.info(f"    Reading Layer ({self.layers[-1].name}) Surface Assignments")
+        self.info("    Reading Layer (%s) Surface Assignments", self.layers[-1].name)
         bytes = self.bytes2
-        offset = 0
-        chunk_len = len(bytes)
 
         # Read in the PolyID/Surface Index pairs.
         abs_pid = len(self.layers[-1].pols) - self.last_pols_count
@@ -548,14 +424,18 @@ class LWO2(LWOBase):
             raise Exception(
                 len(self.layers[-1].pols), self.last_pols_count, self.layers[-1].pols
             )
-        while offset < chunk_len:
-            pid, pid_len = self.read_vx(bytes[offset : offset + 4])
-            offset += pid_len
-            (sid,) = struct.unpack(">H", bytes[offset : offset + 2])
-            offset += 2
-            if sid not in self.layers[-1].surf_tags:
-                self.layers[-1].surf_tags[sid] = []
-            self.layers[-1].surf_tags[sid].append(pid + abs_pid)
+        surf_tags = self.layers[-1].surf_tags
+        if self.use_numpy:
+            (pids,), raw = scan_vx(bytes, 1, 2)
+            surf_tags = SurfaceTags.from_dict(surf_tags)
+            surf_tags.assign(pids + abs_pid, raw.view(">u2")[:, 0], len(self.layers[-1].pols))
+            self.layers[-1].surf_tags = surf_tags
+            return
+
+        for pid, sid in vx_records(bytes, 1, U2):
+            if sid not in surf_tags:
+                surf_tags[sid] = []
+            surf_tags[sid].append(pid + abs_pid)
 
     def read_surf(self):
         """Read the object's surface data."""
@@ -568,259 +448,174 @@ class LWO2(LWOBase):
         if len(name) != 0:
             surf.name = name
 
-        #self.debug(f"{name}, {name_len}")
         # We have to read this, but we won't use it...yet.
         s_name, s_name_len = self.read_lwostring(bytes[name_len:])
         offset = name_len + s_name_len
         block_size = len(bytes)
         while offset < block_size:
-            (subchunk_name,) = struct.unpack("4s", bytes[offset : offset + 4])
-            offset += 4
-            (subchunk_len,) = struct.unpack(">H", bytes[offset : offset + 2])
-            offset += 2
-            #self.debug(f"read_surf {subchunk_name}, {subchunk_len}")
-            
-
-            # Now test which subchunk it is.
-            if b"COLR" == subchunk_name:
-                surf.colr = struct.unpack(">fff", bytes[offset : offset + 12])
-                # Don't bother with any envelopes for now.
-
-            elif b"DIFF" == subchunk_name:
-                (surf.diff,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"LUMI" == subchunk_name:
-                (surf.lumi,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"SPEC" == subchunk_name:
-                (surf.spec,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"REFL" == subchunk_name:
-                (surf.refl,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"RBLR" == subchunk_name:
-                (surf.rblr,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"TRAN" == subchunk_name:
-                (surf.tran,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"RIND" == subchunk_name:
-                (surf.rind,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"TBLR" == subchunk_name:
-                (surf.tblr,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"TRNL" == subchunk_name:
-                (surf.trnl,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"GLOS" == subchunk_name:
-                (surf.glos,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"SHRP" == subchunk_name:
-                (surf.shrp,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"SMAN" == subchunk_name:
-                (s_angle,) = struct.unpack(">f", bytes[offset : offset + 4])
-                # self.debug(s_angle)
-                if s_angle > 0.0:
-                    surf.smooth = True
-            elif b"BUMP" == subchunk_name:
-                (surf.bump,) = struct.unpack(">f", bytes[offset : offset + 4])
-
-            elif b"BLOK" == subchunk_name:
-                (block_type,) = struct.unpack("4s", bytes[offset : offset + 4])
-                (num,) = struct.unpack(">H", bytes[offset + 4 : offset + 6])
-                texture = None
-                if (
-                       b"IMAP" == block_type
-                    or b"PROC" == block_type
-                    or b"SHDR" == block_type
-                    or b"GRAD" == block_type
-                ):
-                    delta = 0
-                    if 44 == num: # FIXME, don't know why this hack is needed
-                        delta = 2
-                    texture = self.read_texture(bytes, offset, subchunk_len, delta)
-                else:
-                    self.error(f"Unimplemented texture type: {block_type}")
-                
-                if None is not texture:
-                    texture.type = block_type.decode("ascii")
-                    if texture.channel not in surf.textures.keys():
-                        surf.textures[texture.channel] = []
-                    surf.textures[texture.channel].append(texture)
-#                     if texture.channel not in surf.textures2:
-#                         surf.textures2[texture.channel] = []
-#                     surf.textures2[texture.channel].append(texture)
-            elif b"VERS" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")
-            elif b"NODS" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"GVAL" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"NVSK" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"CLRF" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"CLRH" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"ADTR" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"SIDE" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"RFOP" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"RIMG" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"TIMG" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"TROP" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"ALPH" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"BUF1" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"BUF2" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"BUF3" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"BUF4" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"LINE" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"NORM" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"RFRS" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"VCOL" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"RFLS" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"CMNT" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"FLAG" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"RSAN" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"LCOL" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"LSIZ" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            elif b"TSAN" == subchunk_name:
-                self.debug(f"Unimplemented SubChunk: {subchunk_name}")  
-            else:
-                self.error(f"Unsupported SubBlock: {subchunk_name}")    
-
+            subchunk_name, subchunk_len = SUBCHUNK.unpack_from(bytes, offset)
+            offset += 6
+            self.surf_handlers.dispatch(
+                self, subchunk_name, surf, bytes, offset, subchunk_len
+            )
             offset += subchunk_len
 
         self.surfs[surf.name] = surf
 
+    def read_surf_sman(self, surf, data, offset, length):
+        (s_angle,) = F4.unpack_from(data, offset)
+        surf.smooth_angle = s_angle
+        if s_angle > 0.0:
+            surf.smooth = True
+
+    def read_surf_blok(self, surf, data, offset, length):
+        block_type, num = SUBCHUNK.unpack_from(data, offset)
+        texture = None
+        if block_type in (b"IMAP", b"PROC", b"SHDR", b"GRAD"):
+            delta = 0
+            if 44 == num: # FIXME, don't know why this hack is needed
+                delta = 2
+            texture = self.read_texture(data, offset, length, delta)
+        else:
+            self.error(f"Unimplemented texture type: {block_type}")
+
+        if None is not texture:
+            texture.type = block_type.decode("ascii")
+            if texture.channel not in surf.textures.keys():
+                surf.textures[texture.channel] = []
+            surf.textures[texture.channel].append(texture)
+
+    def unsupported_subchunk(self, name, surf, data, offset, length):
+        self.error(f"Unsupported SubBlock: {name}")
+
     def parse_tags(self):
-        chunkname = self.rootchunk.chunkname
-        if b"TAGS" == chunkname:
-            self.read_tags()
-        elif b"LAYR" == chunkname:
-            self.read_layr()
-        elif b"PNTS" == chunkname:
-            self.read_pnts()
-        elif b"VMAP" == chunkname:
-            vmap_type = self.rootchunk.read(4)
-
-            if vmap_type == b"WGHT":
-                self.read_weightmap()
-            elif vmap_type == b"MORF":
-                self.read_morph(False)
-            elif vmap_type == b"SPOT":
-                self.read_morph(True)
-            elif vmap_type == b"TXUV":
-                self.read_uvmap()
-            elif vmap_type == b"RGB " or vmap_type == b"RGBA":
-                self.read_colmap()
-            elif vmap_type == b"NORM":
-                self.read_normmap()
-            elif vmap_type == b"PICK":
-                self.rootchunk.skip()  # SKIPPING
-            else:
-                self.debug(f"Skipping vmap_type: {vmap_type}")
-                self.rootchunk.skip()
-
-        elif b"VMAD" == chunkname:
-            vmad_type = self.rootchunk.read(4)
-
-            if vmad_type == b"TXUV":
-                self.read_uv_vmad()
-            elif vmad_type == b"RGB " or vmad_type == b"RGBA":
-                self.read_color_vmad()
-            elif vmad_type == b"WGHT":
-                # We only read the Edge Weight map if it's there.
-                self.read_weight_vmad()
-            elif vmad_type == b"NORM":
-                self.read_normal_vmad()
-            else:
-                self.debug(f"Skipping vmad_type: {vmad_type}")
-                self.rootchunk.skip()
-
-        elif b"POLS" == chunkname:
-            face_type = self.rootchunk.read(4)
-            self.just_read_bones = False
-            # PTCH is LW's Subpatches, SUBD is CatmullClark.
-            if (
-                face_type == b"FACE" or face_type == b"PTCH" or face_type == b"SUBD"
-            ):
-                self.read_pols()
-                if face_type != b"FACE":
-                    self.layers[-1].has_subds = True
-            elif face_type == b"BONE":
-                self.read_bones()
-                self.just_read_bones = True
-            else:
-                self.debug(f"Skipping face_type: {face_type}")
-                self.rootchunk.skip()
-
-        elif b"PTAG" == chunkname:
-            (tag_type,) = struct.unpack("4s", self.rootchunk.read(4))
-            if tag_type == b"SURF" and not self.just_read_bones:
-                # Ignore the surface data if we just read a bones chunk.
-                self.read_surf_tags()
-
-            elif self.ch.skel_to_arm:
-                if tag_type == b"BNUP":
-                    self.read_bone_tags("BNUP")
-                elif tag_type == b"BONE":
-                    self.read_bone_tags("BONE")
-                elif tag_type == b"PART":
-                    self.rootchunk.skip()  # SKIPPING
-                elif tag_type == b"COLR":
-                    self.rootchunk.skip()  # SKIPPING
-                else:
-                    self.debug(f"Skipping tag: {tag_type}")
-                    self.rootchunk.skip()
-            else:
-                self.debug(f"Skipping tag_type: {tag_type}")
-                self.rootchunk.skip()
-        elif b"SURF" == chunkname:
-            self.read_surf()
-        elif b"CLIP" == chunkname:
-            self.read_clip()
-        elif b"BBOX" == chunkname:
-            self.rootchunk.skip()  # SKIPPING
-            self.debug(f"Unimplemented Chunk: {chunkname}")  
-        elif b"VMPA" == chunkname:
-            self.rootchunk.skip()  # SKIPPING
-            self.debug(f"Unimplemented Chunk: {chunkname}")  
-        elif b"PNTS" == chunkname:
-            self.rootchunk.skip()  # SKIPPING
-            self.debug(f"Unimplemented Chunk: {chunkname}")  
-        elif b"POLS" == chunkname:
-            self.rootchunk.skip()  # SKIPPING
-            self.debug(f"Unimplemented Chunk: {chunkname}")  
-        elif b"PTAG" == chunkname:
-            self.rootchunk.skip()  # SKIPPING
-            self.debug(f"Unimplemented Chunk: {chunkname}")  
-        elif b"ENVL" == chunkname:
-            self.rootchunk.skip()  # SKIPPING
-            self.debug(f"Unimplemented Chunk: {chunkname}")  
+        self.chunk_handlers.dispatch(self, self.rootchunk.chunkname)
+
+    def parse_vmap(self):
+        self.vmap_handlers.dispatch(self, bytes(self.rootchunk.read(4)))
+
+    def parse_vmad(self):
+        self.vmad_handlers.dispatch(self, bytes(self.rootchunk.read(4)))
+
+    def parse_pols(self):
+        face_type = bytes(self.rootchunk.read(4))
+        self.just_read_bones = False
+        self.pols_handlers.dispatch(self, face_type)
+
+    def read_subd_pols(self):
+        # PTCH is LW's Subpatches, SUBD is CatmullClark.
+        self.read_pols()
+        self.layers[-1].has_subds = True
+
+    def parse_ptag(self):
+        tag_type = bytes(self.rootchunk.read(4))
+        if tag_type == b"SURF" and not self.just_read_bones:
+            # Ignore the surface data if we just read a bones chunk.
+            self.read_surf_tags()
+        elif self.ch.skel_to_arm:
+            self.ptag_handlers.dispatch(self, tag_type)
         else:
-            self.error(f"Skipping Chunk: {chunkname}")       
+            self.debug("Skipping tag_type: %s", tag_type)
             self.rootchunk.skip()
- 
+
+    def unsupported_chunk(self, chunkname):
+        self.error(f"Skipping Chunk: {chunkname}")
+        self.rootchunk.skip()
+
+
+chunk_handlers = lwoDispatch(
+    "chunk", "unsupported_chunk", "Unimplemented Chunk: %s", skip=True
+)
+chunk_handlers.register(b"TAGS", "read_tags")
+chunk_handlers.register(b"LAYR", "read_layr")
+chunk_handlers.register(b"PNTS", "read_pnts")
+chunk_handlers.register(b"VMAP", "parse_vmap")
+chunk_handlers.register(b"VMAD", "parse_vmad")
+chunk_handlers.register(b"POLS", "parse_pols")
+chunk_handlers.register(b"PTAG", "parse_ptag")
+chunk_handlers.register(b"SURF", "read_surf")
+chunk_handlers.register(b"CLIP", "read_clip")
+chunk_handlers.ignore(b"BBOX", b"VMPA", b"ENVL")
+
+vmap_handlers = lwoDispatch("VMAP", None, "Skipping vmap_type: %s", skip=True)
+vmap_handlers.register(b"WGHT", "read_weightmap")
+vmap_handlers.register(b"MORF", "read_morph", False)
+vmap_handlers.register(b"SPOT", "read_morph", True)
+vmap_handlers.register(b"TXUV", "read_uvmap")
+vmap_handlers.register(b"RGB ", "read_colmap")
+vmap_handlers.register(b"RGBA", "read_colmap")
+vmap_handlers.register(b"NORM", "read_normmap")
+vmap_handlers.ignore(b"PICK", log=False)
+
+vmad_handlers = lwoDispatch("VMAD", None, "Skipping vmad_type: %s", skip=True)
+vmad_handlers.register(b"TXUV", "read_uv_vmad")
+vmad_handlers.register(b"RGB ", "read_color_vmad")
+vmad_handlers.register(b"RGBA", "read_color_vmad")
+# We only read the Edge Weight map if it's there.
+vmad_handlers.register(b"WGHT", "read_weight_vmad")
+vmad_handlers.register(b"NORM", "read_normal_vmad")
+
+pols_handlers = lwoDispatch("POLS", None, "Skipping face_type: %s", skip=True)
+pols_handlers.register(b"FACE", "read_pols")
+pols_handlers.register(b"PTCH", "read_subd_pols")
+pols_handlers.register(b"SUBD", "read_subd_pols")
+pols_handlers.register(b"BONE", "read_bones")
+
+# Only used with skel_to_arm, the SURF tags are read before.
+ptag_handlers = lwoDispatch("PTAG", None, "Skipping tag: %s", skip=True)
+ptag_handlers.register(b"BNUP", "read_bone_tags", "BNUP")
+ptag_handlers.register(b"BONE", "read_bone_tags", "BONE")
+ptag_handlers.ignore(b"PART", b"COLR", log=False)
+
+surf_handlers = lwoDispatch("SURF", "unsupported_subchunk", "Unimplemented SubChunk: %s")
+# Don't bother with any envelopes for now.
+surf_handlers.register(b"COLR", "read_fields", "colr", fmt=">fff")
+for name in (
+    b"DIFF", b"LUMI", b"SPEC", b"REFL", b"RBLR", b"TRAN", b"RIND",
+    b"TBLR", b"TRNL", b"GLOS", b"SHRP", b"BUMP",
+):
+    surf_handlers.register(name, "read_fields", name.decode("ascii").lower(), fmt=">f")
+surf_handlers.register(b"SMAN", "read_surf_sman")
+surf_handlers.register(b"BLOK", "read_surf_blok")
+surf_handlers.ignore(
+    b"VERS", b"NODS", b"GVAL", b"NVSK", b"CLRF", b"CLRH", b"ADTR", b"SIDE",
+    b"RFOP", b"RIMG", b"TIMG", b"TROP", b"ALPH", b"BUF1", b"BUF2", b"BUF3",
+    b"BUF4", b"LINE", b"NORM", b"RFRS", b"VCOL", b"RFLS", b"CMNT", b"FLAG",
+    b"RSAN", b"LCOL", b"LSIZ", b"TSAN",
+)
+
+texture_handlers = lwoDispatch(
+    "BLOK", "unsupported_subsubchunk", "Unimplemented SubSubBlock: %s"
+)
+texture_handlers.register(b"TMAP", "read_texture_tmap")
+texture_handlers.register(b"CHAN", "read_texture_chan")
+texture_handlers.register(b"OPAC", "read_fields", "opactype", "opac", fmt=">Hf")
+texture_handlers.register(b"ENAB", "read_fields", "enab", fmt=">H")
+texture_handlers.register(b"IMAG", "read_fields", "clipid", fmt=">H")
+texture_handlers.register(b"PROJ", "read_fields", "projection", fmt=">H")
+texture_handlers.register(b"VMAP", "read_string_field", "uvname")
+# This is the procedural
+texture_handlers.register(b"FUNC", "read_string_field", "func")
+texture_handlers.register(b"NEGA", "read_fields", "nega", fmt=">H")
+texture_handlers.register(b"AXIS", "read_fields", "axis", fmt=">H")
+texture_handlers.ignore(
+    b"WRAP", b"WRPW", b"WRPH", b"AAST", b"PIXB", b"VALU", b"TAMP", b"STCK",
+    b"PNAM", b"INAM", b"GRST", b"GREN", b"GRPT", b"IKEY", b"FKEY", b"GVER",
+)
+
+position_handlers = lwoDispatch("TMAP")
+position_handlers.register(b"CNTR", "read_fields", "cntr", fmt=">fffh")
+position_handlers.register(b"SIZE", "read_fields", "size", fmt=">fffh")
+position_handlers.register(b"ROTA", "read_fields", "rota", fmt=">fffH")
+position_handlers.register(b"FALL", "read_fields", "fall", fmt=">hfffh")
+position_handlers.register(b"OREF", "read_string_field", "oref")
+position_handlers.register(b"CSYS", "read_fields", "csys", fmt=">h")
+
+LWO2.chunk_handlers = chunk_handlers
+LWO2.vmap_handlers = vmap_handlers
+LWO2.vmad_handlers = vmad_handlers
+LWO2.pols_handlers = pols_handlers
+LWO2.ptag_handlers = ptag_handlers
+LWO2.surf_handlers = surf_handlers
+LWO2.texture_handlers = texture_handlers
+LWO2.position_handlers = position_handlers
@@ -0,0 +1,981 @@
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+HAVE_NUMPY = np is not None
+
+
+def decode_pnts(data, pivot):
+    """
+    Decode a whole PNTS payload in one pass.
+
+    Returns an (N, 3) float64 array with the pivot removed and Y/Z swapped,
+    the same values read_pnts produces point by point.
+    """
+    count = len(data) // 12
+    raw = np.frombuffer(data, dtype=">f4", count=count * 3).reshape(count, 3)
+    pnts = np.empty((count, 3), dtype=np.float64)
+    pnts[:, 0] = raw[:, 0]
+    pnts[:, 1] = raw[:, 2]
+    pnts[:, 2] = raw[:, 1]
+    pnts -= pivot
+    return pnts
+
+
+def tolist(value):
+    """Recursively turn array-backed values back into plain lists."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, dict):
+        return type(value)((k, tolist(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [tolist(v) for v in value]
+    return value
+
+
+def values_equal(a, b):
+    """
+    Compare two values, either of which may be a numpy array or hold one,
+    always giving a bool.
+    """
+    if HAVE_NUMPY and (isinstance(a, np.ndarray) or isinstance(b, np.ndarray)):
+        return tolist(a) == tolist(b)
+    try:
+        return bool(a == b)
+    except ValueError:
+        # An array inside a container, its == can't be used as a bool.
+        pass
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(values_equal(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(values_equal(i, j) for i, j in zip(a, b))
+    return False
+
+
+class PolygonArray:
+    """
+    Polygons in a CSR layout.
+
+    The point indices of face i are indices[offsets[i]:offsets[i + 1]].
+    Indexing and iteration hand back plain lists so the array can stand in
+    for the list of lists read_pols builds.
+    """
+
+    __slots__ = ("indices", "offsets")
+
+    def __init__(self, indices=None, offsets=None):
+        if indices is None:
+            indices = np.zeros(0, dtype=np.int32)
+        if offsets is None:
+            offsets = np.zeros(1, dtype=np.int64)
+        self.indices = indices
+        self.offsets = offsets
+
+    @classmethod
+    def from_lists(cls, pols):
+        if isinstance(pols, cls):
+            return pols
+        counts = np.fromiter((len(p) for p in pols), dtype=np.int64, count=len(pols))
+        offsets = np.zeros(len(pols) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        indices = np.fromiter(
+            (i for p in pols for i in p), dtype=np.int32, count=int(offsets[-1])
+        )
+        return cls(indices, offsets)
+
+    @property
+    def counts(self):
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                raise IndexError("PolygonArray slices must be contiguous")
+            stop = max(start, stop)
+            offsets = self.offsets[start : stop + 1]
+            indices = self.indices[offsets[0] : offsets[-1]]
+            return PolygonArray(indices, offsets - offsets[0])
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("polygon index out of range")
+        return self.indices[self.offsets[i] : self.offsets[i + 1]].tolist()
+
+    def __iter__(self):
+        indices = self.indices.tolist()
+        offsets = self.offsets.tolist()
+        for a, b in zip(offsets[:-1], offsets[1:]):
+            yield indices[a:b]
+
+    def extend(self, pols):
+        pols = PolygonArray.from_lists(pols)
+        self.indices = np.concatenate((self.indices, pols.indices))
+        self.offsets = np.concatenate(
+            (self.offsets, pols.offsets[1:] + self.offsets[-1])
+        )
+
+    def tolist(self):
+        return list(self)
+
+    def __eq__(self, x):
+        if isinstance(x, PolygonArray):
+            return np.array_equal(self.offsets, x.offsets) and np.array_equal(
+                self.indices, x.indices
+            )
+        if isinstance(x, list):
+            return self.tolist() == x
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+def uniform_faces(data):
+    """
+    View a POLS payload as a (faces, 1 + count) array of words when every face
+    has the same number of 2 byte indices, otherwise return None.
+    """
+    if len(data) % 2:
+        return None
+    words = np.frombuffer(data, dtype=">u2")
+    pnts_count = int(words[0])
+    stride = pnts_count + 1
+    if not pnts_count or len(words) % stride:
+        return None
+    faces = words.reshape(-1, stride)
+    # A 0xFF high byte marks a 4 byte VX, which breaks the layout.
+    if (faces[:, 0] != pnts_count).any() or (faces[:, 1:] >= 0xFF00).any():
+        return None
+    return faces
+
+
+def decode_pols(data):
+    """
+    Decode an LWO2 POLS payload (after the FACE/PTCH/SUBD type) into a
+    PolygonArray, reversing each face's winding like read_pols does.
+    """
+    if len(data) == 0:
+        return PolygonArray()
+
+    faces = uniform_faces(data)
+    if faces is not None:
+        indices = faces[:, :0:-1].astype(np.int32).ravel()
+        offsets = np.arange(len(faces) + 1, dtype=np.int64) * (faces.shape[1] - 1)
+        return PolygonArray(indices, offsets)
+
+    u8 = np.frombuffer(data, dtype=np.uint8)
+    words, values = _vx_tokens(u8)
+    first = _face_starts(values)
+    # A count word is 2 bytes, one with a 0xFF high byte, a face of 65280
+    # points or more, would have been split as a 4 byte VX.
+    if (u8[2 * words[first]] == 255).any():
+        raise ValueError("POLS face with more than 65279 points")
+
+    counts = values[first]
+    offsets = np.zeros(len(first) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    face = np.repeat(np.arange(len(first)), counts)
+    # Corner j of face i is the face's token count - j, reversing the winding.
+    src = np.repeat(first + counts, counts) - (np.arange(offsets[-1]) - offsets[face])
+    return PolygonArray(values[src], offsets)
+
+
+def _vx_at(u8, pos):
+    """Decode the VX indices starting at byte positions pos, and their sizes."""
+    big = np.take(u8, pos, mode="clip") == 255
+    b1 = np.take(u8, pos + 1, mode="clip").astype(np.int32)
+    b2 = np.take(u8, pos + 2, mode="clip").astype(np.int32)
+    b3 = np.take(u8, pos + 3, mode="clip").astype(np.int32)
+    small = u8[pos].astype(np.int32) << 8 | b1
+    index = np.where(big, b1 << 16 | b2 << 8 | b3, small)
+    return index, np.where(big, 4, 2)
+
+
+def _vx_tokens(u8):
+    """
+    Split a run of VX indices and 2 byte words, such as a POLS payload, into
+    its tokens from the lead bytes alone. A word with a 0xFF lead starts a
+    4 byte VX unless it is the second half of one, which only happens in a
+    run of 0xFF leads. There the VX start at an even distance from the
+    first word of the run.
+
+    Returns the word index and int32 value of every token.
+    """
+    if len(u8) % 2:
+        raise ValueError("VX data of odd length")
+    words = u8.view(">u2")
+    big = np.flatnonzero(u8[0::2] == 255)
+    new_run = np.diff(big, prepend=-2) != 1
+    if not new_run.all():
+        run_start = big[new_run][np.cumsum(new_run) - 1]
+        big = big[(big - run_start) & 1 == 0]
+    if len(big) and big[-1] + 1 == len(words):
+        raise ValueError("VX data ends inside a 4 byte index")
+
+    token = np.ones(len(words), dtype=bool)
+    token[big + 1] = False
+    k = np.flatnonzero(token)
+    values = words[k].astype(np.int32)
+    # Each 4 byte VX before it took one word out.
+    at = big - np.arange(len(big))
+    values[at] = (values[at] & 0xFF) << 16 | words[big + 1]
+    return k, values
+
+
+def _face_starts(counts, shift=6):
+    """
+    The token index of every face of a POLS payload, following the point
+    counts from the first face. Every token is followed, as if it started
+    a face, to its last face within its block of 1 << shift tokens, by
+    doubling. The chain from the first face then takes a step per block,
+    and the faces within the blocks it enters are found all at once.
+    """
+    total = len(counts)
+    dtype = np.int32 if total < 1 << 30 else np.int64
+    t = np.arange(total, dtype=dtype)
+    nxt = t + 1 + counts.astype(dtype)
+    same_block = ((nxt >> shift) == (t >> shift)) & (nxt < total)
+
+    last = np.where(same_block, nxt, t)
+    active = np.flatnonzero(same_block)
+    while len(active):
+        step = last[last[active]]
+        moved = step != last[active]
+        last[active] = step
+        active = active[moved]
+    leave = nxt[last]
+
+    entries = []
+    i = 0
+    leave_at = leave.item
+    while i < total:
+        entries.append(i)
+        i = leave_at(i)
+    if i != total:
+        raise ValueError("POLS data ends inside a face")
+
+    cur = np.array(entries, dtype=dtype)
+    stop = np.minimum(((cur >> shift) + 1) << shift, total)
+    parts = [cur]
+    while len(cur):
+        cur = nxt[cur]
+        inside = cur < stop
+        cur, stop = cur[inside], stop[inside]
+        parts.append(cur)
+    return np.sort(np.concatenate(parts)).astype(np.int64)
+
+
+def _record_starts(data, u8, nvx, payload):
+    """
+    The byte offset of every record. Records are taken in runs that have
+    the same VX sizes as the first one of the run, which covers the usual
+    case of ids sorted past 0xFF00. Short runs are walked one at a time.
+    """
+    chunk_len = len(u8)
+    parts = []
+    offset = 0
+    window = 64
+    while offset < chunk_len:
+        sizes = []
+        pos = offset
+        for i in range(nvx):
+            sizes.append(4 if data[pos] == 255 else 2)
+            pos += sizes[-1]
+        stride = pos - offset + payload
+        count = max(1, min(window, (chunk_len - offset) // stride))
+        starts = offset + stride * np.arange(count, dtype=np.int64)
+        ok = np.ones(count, dtype=bool)
+        lead = starts
+        for size in sizes:
+            ok &= (np.take(u8, lead, mode="clip") == 255) == (size == 4)
+            lead = lead + size
+        run = count if ok.all() else int(np.argmin(ok))
+        parts.append(starts[:run])
+        offset += run * stride
+        window = window * 2 if run == count else 64
+
+        if run < 16:
+            # Mixed sizes, walking is cheaper than more small arrays.
+            walked = []
+            while offset < chunk_len and len(walked) < 256:
+                walked.append(offset)
+                for i in range(nvx):
+                    offset += 4 if data[offset] == 255 else 2
+                offset += payload
+            parts.append(np.array(walked, dtype=np.int64))
+
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def scan_vx(data, nvx, payload):
+    """
+    Decode a chunk of records made of nvx VX indices followed by a fixed
+    payload of bytes, as in PTAG, VMAP and VMAD chunks.
+
+    Returns a list of nvx int32 index arrays and an (N, payload) uint8 array
+    of the raw big-endian payloads.
+    """
+    u8 = np.frombuffer(data, dtype=np.uint8)
+    stride = 2 * nvx + payload
+    if len(u8) % stride == 0:
+        # Fast path, every VX is 2 bytes so the records have a fixed stride.
+        rec = u8.reshape(-1, stride)
+        if not any((rec[:, 2 * i] == 255).any() for i in range(nvx)):
+            words = rec[:, : 2 * nvx].astype(np.int32)
+            ids = [words[:, 2 * i] << 8 | words[:, 2 * i + 1] for i in range(nvx)]
+            return ids, np.ascontiguousarray(rec[:, 2 * nvx :])
+
+    pos = _record_starts(memoryview(data).cast("B"), u8, nvx, payload)
+    ids = []
+    for i in range(nvx):
+        index, size = _vx_at(u8, pos)
+        ids.append(index)
+        pos = pos + size
+    return ids, u8[pos[:, None] + np.arange(payload)]
+
+
+def payload_floats(raw):
+    """View raw big-endian payloads as native float32 rows."""
+    return raw.view(">f4").astype(np.float32)
+
+
+def _has_duplicates(keys):
+    # Maps are usually written in id order, which needs no sort to check.
+    if len(keys) < 2 or (keys[1:] > keys[:-1]).all():
+        return False
+    keys = np.sort(keys)
+    return bool((keys[1:] == keys[:-1]).any())
+
+
+def _last_unique(keys):
+    """Positions of the last occurrence of each key, in order."""
+    rev = keys[::-1]
+    _, idx = np.unique(rev, return_index=True)
+    return np.sort(len(keys) - 1 - idx)
+
+
+class VMapArray:
+    """
+    A per point map (VMAP) as parallel arrays, int32 point ids and a float32
+    row of values for each. It reads like the {pnt_id: (u, v)} dict that
+    read_uvmap builds.
+    """
+
+    __slots__ = ("ids", "data", "_rows")
+
+    def __init__(self, ids, data):
+        if _has_duplicates(ids):
+            keep = _last_unique(ids)
+            ids, data = ids[keep], data[keep]
+        self.ids = ids
+        self.data = data
+        self._rows = None
+
+    @classmethod
+    def from_dict(cls, d):
+        if isinstance(d, cls):
+            return d
+        ids = np.fromiter(d.keys(), dtype=np.int32, count=len(d))
+        data = np.array(list(d.values()), dtype=np.float32).reshape(len(d), -1)
+        return cls(ids, data)
+
+    def __reduce__(self):
+        return (self.__class__, (self.ids, self.data))
+
+    def rows(self, ids):
+        """The row of each id in ids, -1 where it has no value."""
+        if self._rows is None:
+            size = int(self.ids.max()) + 1 if len(self.ids) else 0
+            self._rows = np.full(size, -1, dtype=np.int64)
+            self._rows[self.ids] = np.arange(len(self.ids))
+        ids = np.asarray(ids)
+        inside = (ids >= 0) & (ids < len(self._rows))
+        rows = np.full(ids.shape, -1, dtype=np.int64)
+        rows[inside] = self._rows[ids[inside]]
+        return rows
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def keys(self):
+        return self.ids.tolist()
+
+    def values(self):
+        return [tuple(row) for row in self.data.tolist()]
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __contains__(self, pnt_id):
+        return self.rows([pnt_id])[0] >= 0
+
+    def __getitem__(self, pnt_id):
+        row = self.rows([pnt_id])[0]
+        if row < 0:
+            raise KeyError(pnt_id)
+        return tuple(self.data[row].tolist())
+
+    def get(self, pnt_id, default=None):
+        return self[pnt_id] if pnt_id in self else default
+
+    def update(self, other):
+        other = VMapArray.from_dict(other)
+        keep = ~np.isin(self.ids, other.ids)
+        self.ids = np.concatenate((self.ids[keep], other.ids))
+        self.data = np.concatenate((self.data[keep], other.data))
+        self._rows = None
+
+    def tolist(self):
+        return dict(self.items())
+
+    def __eq__(self, x):
+        if isinstance(x, (dict, VMapArray)):
+            return self.tolist() == (x.tolist() if isinstance(x, VMapArray) else x)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+class VMadArray:
+    """
+    A per polygon corner map (VMAD) as parallel arrays of int32 polygon
+    ids, int32 point ids and float32 value rows. It reads like the
+    {pol_id: {pnt_id: (u, v)}} dict that read_uv_vmad builds.
+    """
+
+    __slots__ = ("pol_ids", "pnt_ids", "data", "_index")
+
+    def __init__(self, pol_ids, pnt_ids, data):
+        keys = pol_ids.astype(np.int64) << 32 | pnt_ids.astype(np.int64)
+        if _has_duplicates(keys):
+            keep = _last_unique(keys)
+            pol_ids, pnt_ids, data = pol_ids[keep], pnt_ids[keep], data[keep]
+        self.pol_ids = pol_ids
+        self.pnt_ids = pnt_ids
+        self.data = data
+        self._index = None
+
+    @classmethod
+    def from_dict(cls, d):
+        if isinstance(d, cls):
+            return d
+        rows = [(pol, pnt, v) for pol, pnts in d.items() for pnt, v in pnts.items()]
+        pol_ids = np.array([r[0] for r in rows], dtype=np.int32)
+        pnt_ids = np.array([r[1] for r in rows], dtype=np.int32)
+        data = np.array([r[2] for r in rows], dtype=np.float32).reshape(len(rows), -1)
+        return cls(pol_ids, pnt_ids, data)
+
+    def __reduce__(self):
+        return (self.__class__, (self.pol_ids, self.pnt_ids, self.data))
+
+    @property
+    def keys64(self):
+        """(pol_id << 32 | pnt_id) for each row."""
+        return self.pol_ids.astype(np.int64) << 32 | self.pnt_ids.astype(np.int64)
+
+    def index(self):
+        """
+        The rows ordered by polygon id, the sorted polygon ids, the start
+        and end of each one's rows in that order, and the polygons in the
+        order they first appear, built on first use.
+        """
+        if self._index is None:
+            order = np.argsort(self.pol_ids, kind="stable")
+            sorted_ids = self.pol_ids[order]
+            starts = np.flatnonzero(np.diff(sorted_ids, prepend=-1) != 0)
+            ends = np.append(starts[1:], len(order))
+            # The stable sort keeps a polygon's first row at its start.
+            appear = np.argsort(order[starts], kind="stable")
+            pols = sorted_ids[starts].astype(np.int64)
+            self._index = (order, pols, starts, ends, appear)
+        return self._index
+
+    def _rows(self, pol_id):
+        """The rows of a polygon, None when it has none."""
+        if not isinstance(pol_id, (int, np.integer)) or not 0 <= pol_id < 1 << 32:
+            return None
+        order, pols, starts, ends, _ = self.index()
+        # A scalar of the array's own type, or searchsorted converts the array.
+        i = int(pols.searchsorted(np.int64(pol_id)))
+        if i == len(pols) or pols[i] != pol_id:
+            return None
+        return order[starts[i] : ends[i]]
+
+    def tolist(self):
+        return dict(self.items())
+
+    def __len__(self):
+        return len(self.index()[1])
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        _, pols, _, _, appear = self.index()
+        return pols[appear].tolist()
+
+    def values(self):
+        order, _, starts, ends, appear = self.index()
+        pnts = self.pnt_ids[order].tolist()
+        data = [tuple(v) for v in self.data[order].tolist()]
+        return [
+            dict(zip(pnts[a:b], data[a:b]))
+            for a, b in zip(starts[appear].tolist(), ends[appear].tolist())
+        ]
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __contains__(self, pol_id):
+        return self._rows(pol_id) is not None
+
+    def __getitem__(self, pol_id):
+        rows = self._rows(pol_id)
+        if rows is None:
+            raise KeyError(pol_id)
+        return {
+            pnt: tuple(v)
+            for pnt, v in zip(self.pnt_ids[rows].tolist(), self.data[rows].tolist())
+        }
+
+    def get(self, pol_id, default=None):
+        return self[pol_id] if pol_id in self else default
+
+    def update(self, other):
+        # Like dict.update, a polygon's corners are replaced as a whole.
+        other = VMadArray.from_dict(other)
+        keep = ~np.isin(self.pol_ids, other.pol_ids)
+        self.pol_ids = np.concatenate((self.pol_ids[keep], other.pol_ids))
+        self.pnt_ids = np.concatenate((self.pnt_ids[keep], other.pnt_ids))
+        self.data = np.concatenate((self.data[keep], other.data))
+        self._index = None
+
+    def __eq__(self, x):
+        if isinstance(x, (dict, VMadArray)):
+            return self.tolist() == (x.tolist() if isinstance(x, VMadArray) else x)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+class PointRowArray:
+    """
+    A list of [pnt_id, value, ...] rows, as read for weight maps and
+    morphs, held as an int32 id array and a float array of values, (N,)
+    for weights or (N, 3) for morph positions.
+    """
+
+    __slots__ = ("ids", "values")
+
+    def __init__(self, ids, values):
+        self.ids = ids
+        self.values = values
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _row(self, pnt_id, value):
+        if isinstance(value, list):
+            return [pnt_id] + value
+        return [pnt_id, value]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return PointRowArray(self.ids[i], self.values[i])
+        return self._row(int(self.ids[i]), self.values[i].tolist())
+
+    def __iter__(self):
+        for pnt_id, value in zip(self.ids.tolist(), self.values.tolist()):
+            yield self._row(pnt_id, value)
+
+    def tolist(self):
+        return list(self)
+
+    def __eq__(self, x):
+        if isinstance(x, PointRowArray):
+            return np.array_equal(self.ids, x.ids) and np.array_equal(
+                self.values, x.values
+            )
+        if isinstance(x, list):
+            return self.tolist() == x
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+def edge_key(a, b):
+    """Pack the point ids of an edge, a and b ints or int arrays, as a << 32 | b."""
+    if np is not None and isinstance(a, np.ndarray):
+        return a.astype(np.int64) << 32 | np.asarray(b, dtype=np.int64)
+    return a << 32 | b
+
+
+class EdgeWeights:
+    """
+    Subdivision edge weights as parallel arrays of packed edge keys, see
+    edge_key, kept sorted, and float32 weights. It reads like the
+    {"second_pnt pnt_id": weight} dict that read_weight_vmad builds, and
+    also takes (second_pnt, pnt_id) tuples as keys.
+    """
+
+    __slots__ = ("keys64", "weights")
+
+    def __init__(self, keys64, weights):
+        order = np.argsort(keys64, kind="stable")
+        keys64, weights = keys64[order], weights[order]
+        if len(keys64):
+            # Like a dict, the last weight given to an edge wins.
+            last = np.append(keys64[1:] != keys64[:-1], True)
+            keys64, weights = keys64[last], weights[last]
+        self.keys64 = keys64
+        self.weights = weights
+
+    @classmethod
+    def from_dict(cls, d):
+        if isinstance(d, cls):
+            return d
+        pairs = [tuple(map(int, k.split())) if isinstance(k, str) else k for k in d]
+        keys64 = np.array([edge_key(a, b) for a, b in pairs], dtype=np.int64)
+        weights = np.array(list(d.values()), dtype=np.float32)
+        return cls(keys64, weights)
+
+    def __reduce__(self):
+        return (self.__class__, (self.keys64, self.weights))
+
+    def pairs(self):
+        """The (second_pnt, pnt_id) int32 arrays of the edges."""
+        return (self.keys64 >> 32).astype(np.int32), (self.keys64 & 0xFFFFFFFF).astype(
+            np.int32
+        )
+
+    def lookup(self, a, b, fill=0.0):
+        """The weight of each edge (a[i], b[i]), fill where there is none."""
+        keys64 = edge_key(np.asarray(a), b)
+        values = np.full(keys64.shape, fill, dtype=np.float32)
+        if len(self.keys64):
+            pos = np.minimum(np.searchsorted(self.keys64, keys64), len(self.keys64) - 1)
+            found = self.keys64[pos] == keys64
+            values[found] = self.weights[pos[found]]
+        return values
+
+    def _pos(self, key):
+        if isinstance(key, str):
+            key = tuple(map(int, key.split()))
+        pos = int(np.searchsorted(self.keys64, edge_key(*key)))
+        if pos < len(self.keys64) and self.keys64[pos] == edge_key(*key):
+            return pos
+        return -1
+
+    def __len__(self):
+        return len(self.keys64)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return [f"{a} {b}" for a, b in zip(*(x.tolist() for x in self.pairs()))]
+
+    def values(self):
+        return self.weights.tolist()
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __contains__(self, key):
+        return self._pos(key) >= 0
+
+    def __getitem__(self, key):
+        pos = self._pos(key)
+        if pos < 0:
+            raise KeyError(key)
+        return float(self.weights[pos])
+
+    def get(self, key, default=None):
+        pos = self._pos(key)
+        return float(self.weights[pos]) if pos >= 0 else default
+
+    def update(self, other):
+        other = EdgeWeights.from_dict(other)
+        self.__init__(
+            np.concatenate((self.keys64, other.keys64)),
+            np.concatenate((self.weights, other.weights)),
+        )
+
+    def tolist(self):
+        return dict(self.items())
+
+    def __eq__(self, x):
+        if isinstance(x, EdgeWeights):
+            return np.array_equal(self.keys64, x.keys64) and np.array_equal(
+                self.weights, x.weights
+            )
+        if isinstance(x, dict):
+            return self.tolist() == x
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+class SurfaceTags:
+    """
+    A layer's surface assignments (PTAG SURF) as the int32 polygon ids and
+    tags of the records, in file order. It reads like the
+    {tag: [pol_id, ...]} dict that read_surf_tags builds, duplicates and
+    all, while index gives a single tag per face.
+    """
+
+    __slots__ = ("pol_ids", "tags", "count", "_index", "_groups", "_by_tag")
+
+    def __init__(self, pol_ids=None, tags=None, count=0):
+        if pol_ids is None:
+            pol_ids = np.zeros(0, dtype=np.int32)
+        if tags is None:
+            tags = np.zeros(0, dtype=np.int32)
+        self.pol_ids = pol_ids
+        self.tags = tags
+        self.count = count
+        self._index = None
+        self._groups = None
+        self._by_tag = None
+
+    @classmethod
+    def from_dict(cls, d, count=0):
+        if isinstance(d, cls):
+            return d
+        x = cls(count=count)
+        if d:
+            tags = np.concatenate(
+                [np.full(len(pol_ids), tag, dtype=np.int32) for tag, pol_ids in d.items()]
+            )
+            pol_ids = np.fromiter(
+                (pol_id for pol_ids in d.values() for pol_id in pol_ids),
+                dtype=np.int32,
+                count=len(tags),
+            )
+            x.assign(pol_ids, tags, count)
+        return x
+
+    def __reduce__(self):
+        return (self.__class__, (self.pol_ids, self.tags, self.count))
+
+    def assign(self, pol_ids, tags, count=0):
+        """Add the records of a PTAG chunk, for a layer of at least count faces."""
+        self.pol_ids = np.concatenate((self.pol_ids, pol_ids.astype(np.int32)))
+        self.tags = np.concatenate((self.tags, tags.astype(np.int32)))
+        self.count = max(self.count, count)
+        self._index = self._groups = self._by_tag = None
+
+    @property
+    def index(self):
+        """
+        The tag of each face, int16 where the tags fit, and -1 for faces
+        with no surface. A face tagged twice keeps its last tag.
+        """
+        if self._index is None:
+            pol_ids, tags = self.pol_ids, self.tags
+            size = max(self.count, int(pol_ids.max()) + 1 if len(pol_ids) else 0)
+            small = not len(tags) or tags.max() <= np.iinfo(np.int16).max
+            index = np.full(size, -1, dtype=np.int16 if small else np.int32)
+            if _has_duplicates(pol_ids):
+                keep = _last_unique(pol_ids)
+                pol_ids, tags = pol_ids[keep], tags[keep]
+            index[pol_ids] = tags
+            self._index = index
+        return self._index
+
+    def groups(self):
+        """
+        The faces grouped by their tag in index: (faces, tags, starts).
+        faces holds every tagged face id once, ordered by tag with a stable
+        sort so each tag keeps its faces in order, and the faces of tags[i]
+        are faces[starts[i]:starts[i + 1]].
+        """
+        if self._groups is None:
+            index = self.index
+            order = np.argsort(index, kind="stable")
+            # The untagged faces, -1, sort first.
+            order = order[np.searchsorted(index[order], 0) :].astype(np.int32)
+            tags = index[order]
+            starts = np.flatnonzero(np.diff(tags, prepend=-1))
+            self._groups = (order, tags[starts], np.append(starts, len(order)))
+        return self._groups
+
+    def faces(self, tag):
+        """The face ids with tag in index, as an int32 array."""
+        faces, tags, starts = self.groups()
+        i = np.searchsorted(tags, tag)
+        if i == len(tags) or tags[i] != tag:
+            return faces[:0]
+        return faces[starts[i] : starts[i + 1]]
+
+    def by_tag(self):
+        """
+        The records ordered by tag, the sorted tags, the start and end of
+        each one's records in that order, and the tags in the order they
+        first appear, built on first use.
+        """
+        if self._by_tag is None:
+            order = np.argsort(self.tags, kind="stable")
+            sorted_tags = self.tags[order]
+            starts = np.flatnonzero(np.diff(sorted_tags, prepend=-1) != 0)
+            ends = np.append(starts[1:], len(order))
+            appear = np.argsort(order[starts], kind="stable")
+            tags = sorted_tags[starts].astype(np.int64)
+            self._by_tag = (order, tags, starts, ends, appear)
+        return self._by_tag
+
+    def _records(self, tag):
+        """The records of a tag, None when it has none."""
+        if not isinstance(tag, (int, np.integer)) or not 0 <= tag < 1 << 32:
+            return None
+        order, tags, starts, ends, _ = self.by_tag()
+        i = int(tags.searchsorted(np.int64(tag)))
+        if i == len(tags) or tags[i] != tag:
+            return None
+        return order[starts[i] : ends[i]]
+
+    def __len__(self):
+        return len(self.by_tag()[1])
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        _, tags, _, _, appear = self.by_tag()
+        return tags[appear].tolist()
+
+    def values(self):
+        order, _, starts, ends, appear = self.by_tag()
+        pol_ids = self.pol_ids[order].tolist()
+        return [pol_ids[a:b] for a, b in zip(starts[appear].tolist(), ends[appear].tolist())]
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def __contains__(self, tag):
+        return self._records(tag) is not None
+
+    def __getitem__(self, tag):
+        records = self._records(tag)
+        if records is None:
+            raise KeyError(tag)
+        return self.pol_ids[records].tolist()
+
+    def get(self, tag, default=None):
+        return self[tag] if tag in self else default
+
+    def tolist(self):
+        return dict(self.items())
+
+    def __eq__(self, x):
+        if isinstance(x, SurfaceTags):
+            return self.tolist() == x.tolist()
+        if isinstance(x, dict):
+            return self.tolist() == x
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+def surface_groups(surf_tags, count=0):
+    """
+    SurfaceTags.groups() for a layer's surf_tags, whether it was read into
+    a SurfaceTags or a plain dict.
+    """
+    return SurfaceTags.from_dict(surf_tags, count).groups()
+
+
+def corner_faces(pols):
+    """The face of each corner of a PolygonArray."""
+    return np.repeat(np.arange(len(pols), dtype=np.int32), pols.counts)
+
+
+def next_points(pols, pol_ids, pnt_ids):
+    """
+    The point after pnt_ids[i] in polygon pol_ids[i] of a PolygonArray,
+    wrapping around to the first, or -1 where the polygon does not have
+    the point. A point repeated in a polygon is taken at its first corner,
+    as list.index does.
+    """
+    corner_keys = edge_key(corner_faces(pols), pols.indices)
+    order = np.argsort(corner_keys, kind="stable")
+    corner_keys = corner_keys[order]
+    keys64 = edge_key(pol_ids, pnt_ids)
+    result = np.full(len(keys64), -1, dtype=np.int32)
+    if not len(corner_keys):
+        return result
+
+    pos = np.minimum(np.searchsorted(corner_keys, keys64), len(corner_keys) - 1)
+    found = corner_keys[pos] == keys64
+    corner = order[pos[found]] + 1
+    faces = pol_ids[found]
+    wrap = corner == pols.offsets[faces + 1]
+    corner[wrap] = pols.offsets[faces[wrap]]
+    result[found] = pols.indices[corner]
+    return result
+
+
+def resolve_corners(pols, point_map=None, face_map=None, dim=2, fill=0.0):
+    """
+    Per corner values for a PolygonArray, in the order of pols.indices.
+    Values come from the point map (VMAP) and are overridden by the face
+    map (VMAD) wherever that has the polygon's corner.
+    """
+    corner_pnts = pols.indices
+    values = np.full((len(corner_pnts), dim), fill, dtype=np.float32)
+
+    if point_map:
+        point_map = VMapArray.from_dict(point_map)
+        rows = point_map.rows(corner_pnts)
+        found = rows >= 0
+        values[found] = point_map.data[rows[found], :dim]
+
+    if face_map:
+        face_map = VMadArray.from_dict(face_map)
+        keys = face_map.keys64
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        corner_keys = corner_faces(pols).astype(np.int64) << 32 | corner_pnts
+        pos = np.clip(np.searchsorted(keys, corner_keys), 0, max(len(keys) - 1, 0))
+        if len(keys):
+            found = keys[pos] == corner_keys
+            values[found] = face_map.data[order[pos[found]], :dim]
+
+    return values
+
+
+def corner_uvs(layer, name, fill=0.0):
+    """
+    A dense (corners, 2) float32 UV buffer for a layer's polygons, aligned
+    with PolygonArray.from_lists(layer.pols).indices. VMAD UVs take
+    precedence over the VMAP ones.
+    """
+    pols = PolygonArray.from_lists(layer.pols)
+    point_map = layer.uvmaps_vmap.get(name, {}).get("PointMap")
+    face_map = layer.uvmaps_vmad.get(name, {}).get("FaceMap")
+    return resolve_corners(pols, point_map, face_map, 2, fill)
@@ -16,13 +16,37 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 
-import chunk
 import struct
 import logging
 from pprint import pprint
 from collections import OrderedDict
 
-from .lwoLogger import LWOLogger
+from .lwoLogger import LWOLogger, LWOLog
+from .lwoChunk import map_source, close_source, source_label, iter_chunks, read_lwostring
+from .lwoCodec import HEADER, U4, VEC12
+from .lwoArray import HAVE_NUMPY, np, decode_pnts, values_equal
+
+# Bump this whenever a reader change alters the parsed output, it
+# invalidates any cached parses.
+PARSER_VERSION = 5
+
+
+class chd:
+    def __init__(self):
+        self.load_hidden = True
+        self.skel_to_arm = False
+        self.search_paths = []
+        self.recursive = True
+        self.images = {}
+        self.cancel_search = False
+        self.use_numpy = False
+        self.lazy = False
+        self.cache = None
+        self.image_index = None
+        self.image_index_dir = None
+        # Off for batch runs, the readers then skip their debug and info
+        # messages without formatting them.
+        self.log_chunks = True
 
 
 class _lwo_base:
@@ -32,7 +56,7 @@ class _lwo_base:
         for k in self.__slots__:
             a = getattr(self, k)
             b = getattr(x, k)
-            if not a == b:
+            if not values_equal(a, b):
                 print(f"{k} mismatch:")
                 print(f"\t{a} != {b}")
                 return False
@@ -135,6 +159,9 @@ class _obj_surf(_lwo_base):
         self.bump = 1.0  # Bump
         self.strs = 0.0  # Smooth Threshold
         self.smooth = False  # Surface Smoothing
+        # The SMAN angle in radians. Not a slot, so the parsed elements and
+        # their pickles are unchanged.
+        self.smooth_angle = 0.0
         self.textures = {}  # Textures list
         self.textures2 = {}  # Textures list
         self.textures_5 = []  # Textures list for LWOB
@@ -235,9 +262,68 @@ class _surf_texture(_lwo_base):
         print()
 
 
+class _lwo_event(_lwo_base):
+    __slots__ = (
+        "type",
+        "chunk",
+        "subtype",
+        "layer",
+        "name",
+        "data",
+    )
+
+    def __init__(self, type, chunk, layer=None):
+        self.type = type
+        self.chunk = chunk
+        self.subtype = None
+        self.layer = layer
+        self.name = None
+        self.data = None
+
+
 class LWOBase:
+    # The chunks a lazily read attribute is built from.
+    lazy_chunks = {
+        "tags": (b"TAGS",),
+        "surfs": (b"SURF",),
+        "clips": (b"CLIP",),
+    }
+    # Where the map a VMAP, VMAD or PTAG chunk was read into is kept in the
+    # layer: the attribute, whether it is keyed by the map's name, and the
+    # key below that.
+    event_maps = {
+        (b"VMAP", b"TXUV"): ("uvmaps_vmap", True, "PointMap"),
+        (b"VMAP", b"RGB "): ("colmaps", True, "PointMap"),
+        (b"VMAP", b"RGBA"): ("colmaps", True, "PointMap"),
+        (b"VMAP", b"WGHT"): ("wmaps", True, None),
+        (b"VMAP", b"MORF"): ("morphs", True, None),
+        (b"VMAP", b"SPOT"): ("morphs", True, None),
+        (b"VMAP", b"NORM"): ("vnorms", False, None),
+        (b"VMAD", b"TXUV"): ("uvmaps_vmad", True, "FaceMap"),
+        (b"VMAD", b"RGB "): ("colmaps", True, "FaceMap"),
+        (b"VMAD", b"RGBA"): ("colmaps", True, "FaceMap"),
+        (b"VMAD", b"WGHT"): ("edge_weights", False, None),
+        (b"VMAD", b"NORM"): ("lnorms", False, None),
+        (b"PTAG", b"SURF"): ("surf_tags", False, None),
+        (b"PTAG", b"BONE"): ("bone_names", False, None),
+        (b"PTAG", b"BNUP"): ("bone_rolls", False, None),
+    }
+
+    # Everything a parse produces, what a cache has to keep.
+    parsed_attrs = (
+        "file_type",
+        "layers",
+        "surfs",
+        "materials",
+        "tags",
+        "clips",
+        "pnt_count",
+    )
+
     def __init__(self, filename=None, loglevel=logging.INFO):
-        self.filename = filename
+        # A path, a bytes like buffer or a binary file object.
+        self.source = filename
+        self.filename = filename if filename is None else source_label(filename)
         self.file_types = []
         self.file_type = []
         self.layers = []
@@ -249,52 +335,46 @@ class LWOBase:
         
         self.pnt_count = 0
         
+        self.map = None
+        self.chunks = []
+        # A dict here collects [count, seconds] per (table, chunk ID).
+        self.chunk_stats = None
         self.rootchunk = None
         self.seek = 0
 
         self.pnt_count = 0
 
+        self.ch = chd()
+
         self.l = LWOLogger("LWO", loglevel)
+        self.log = LWOLog(self.l)
+
+    @property
+    def use_numpy(self):
+        return HAVE_NUMPY and self.ch.use_numpy
 
     @property
     def bytes2(self):
-#         self.debug(self.rootchunk)
-#         self.debug(self.rootchunk.getsize())
-#         self.debug(self.rootchunk.getname())
-#         self.debug(self.rootchunk.tell())
-        #self.rootchunk.seek(0)
         return self.rootchunk.read()
         
-    def debug(self, msg):
-         self.l.debug(msg)
-        
-    def info(self, msg):
-        self.l.info(msg)
+    def debug(self, msg, *args):
+        self.log.debug(msg, *args)
 
-    def warning(self, msg):
-        self.l.warning(msg)
+    def info(self, msg, *args):
+        self.log.info(msg, *args)
 
-    def error(self, msg):
+    def warning(self, msg, *args):
+        self.log.warning(msg, *args)
+
+    def error(self, msg, *args):
         if self.l.level < logging.INFO:
-            raise Exception(f"{self.filename} {msg}")
+            raise Exception(f"{self.filename} {msg % args if args else msg}")
         else:
-            self.l.error(msg)
+            self.l.error(msg, *args)
 
     def read_lwostring(self, raw_name):
         """Parse a zero-padded string."""
-
-        i = raw_name.find(b"\0")
-        name_len = i + 1
-        if name_len % 2 == 1:  # Test for oddness.
-            name_len += 1
-
-        if i > 0:
-            # Some plugins put non-text strings in the tags chunk.
-            name = raw_name[0:i].decode("utf-8", "ignore")
-        else:
-            name = ""
-
-        return name, name_len
+        return read_lwostring(raw_name)
 
     def read_tags(self):
         """Read the object's Tags chunk."""
@@ -311,58 +391,206 @@ class LWOBase:
     def read_pnts(self):
         """Read the layer's points."""
         bytes = self.bytes2
-        self.info(f"    Reading Layer ({self.layers[-1].name }) Points")
-        offset = 0
-        chunk_len = len(bytes)
-
-        while offset < chunk_len:
-            pnts = struct.unpack(">fff", bytes[offset : offset + 12])
-            offset += 12
-            # Re-order the points so that the mesh has the right pitch,
-            # the pivot already has the correct order.
-            pnts = [
-                pnts[0] - self.layers[-1].pivot[0],
-                pnts[2] - self.layers[-1].pivot[1],
-                pnts[1] - self.layers[-1].pivot[2],
-            ]
-            self.pnt_count += 1
-            self.layers[-1].pnts.append(pnts)
+        self.info("    Reading Layer (%s) Points", self.layers[-1].name)
+        if self.use_numpy:
+            pnts = decode_pnts(bytes, self.layers[-1].pivot)
+            if len(self.layers[-1].pnts):
+                old = np.asarray(self.layers[-1].pnts, dtype=np.float64)
+                pnts = np.concatenate((old.reshape(-1, 3), pnts))
+            self.pnt_count += len(pnts) - len(self.layers[-1].pnts)
+            self.layers[-1].pnts = pnts
+            return
 
-    def read_lwo(self):
-        self.f = open(self.filename, "rb")
+        # Re-order the points so that the mesh has the right pitch,
+        # the pivot already has the correct order.
+        pivot = self.layers[-1].pivot
+        pnts = [
+            [x - pivot[0], z - pivot[1], y - pivot[2]]
+            for x, y, z in VEC12.iter_unpack(bytes)
+        ]
+        self.pnt_count += len(pnts)
+        self.layers[-1].pnts.extend(pnts)
+
+    def open_lwo(self):
+        """
+        Map the file and index its chunks, nothing is parsed yet. A buffer
+        already set in self.map, by LWODetect, is used rather than reading
+        the source again.
+        """
+        if self.map is None:
+            self.map = map_source(self.source)
+        buf = memoryview(self.map)
         try:
-            header, chunk_size, chunk_name = struct.unpack(">4s1L4s", self.f.read(12))
-        except:
+            header, chunk_size, chunk_name = HEADER.unpack_from(buf)
+        except struct.error:
+            buf.release()
             self.error(f"Error parsing file header! Filename {self.filename}")
-            self.f.close()
-            return
+            self.close()
+            return False
 
         if not chunk_name in self.file_types:
+            buf.release()
+            self.close()
             raise Exception(
                 f"Incorrect file type: {chunk_name} not in {self.file_types}"
             )
         self.file_type = chunk_name
+        self.log.refresh(quiet=not self.ch.log_chunks)
+
+        if self.ch.use_numpy and not HAVE_NUMPY:
+            self.warning("numpy is not installed, use_numpy is ignored")
+
+        self.info("Importing LWO: %s", self.filename)
+        self.info("%s Format", self.file_type.decode('ascii'))
+
+        self.chunks = list(iter_chunks(buf))
+        return True
+
+    def get_state(self):
+        return {k: getattr(self, k) for k in self.parsed_attrs}
+
+    def set_state(self, state):
+        for k in self.parsed_attrs:
+            setattr(self, k, state[k])
 
-        self.info(f"Importing LWO: {self.filename}")
-        self.info(f"{self.file_type.decode('ascii')} Format")
-
-        while True:
-            try:
-                self.rootchunk = chunk.Chunk(self.f)
-            except EOFError:
-                break
-            self.parse_tags()
-        del self.f
-
-#         self.chunks = []
-#         while True:
-#             try:
-#                  self.chunks.append(chunk.Chunk(self.f))
-#             except EOFError:
-#                 break
-#         del self.f
-#         
-#         for rootchunk in self.chunks:
-#             self.debug(rootchunk)
-#             #self.parse_tags()
-#         exit()
+    def read_lwo(self):
+        if self.open_lwo():
+            self.parse_chunks()
+
+    def parse_chunks(self, wanted=None):
+        """
+        Parse the indexed chunks whose name passes wanted, or all of them.
+        Chunks are always parsed in file order, the rest are kept for later.
+        """
+        pending = []
+        try:
+            for self.rootchunk in self.chunks:
+                if wanted is None or wanted(self.rootchunk.chunkname):
+                    self.parse_tags()
+                else:
+                    pending.append(self.rootchunk)
+        except BaseException:
+            pending = []
+            raise
+        finally:
+            self.chunks = pending
+            if not pending:
+                self.close()
+
+    def iter_events(self, drop_layers=False):
+        """
+        Parse the file a chunk at a time, yielding _lwo_event objects as the
+        layers, points, polygons, maps, tags, surfaces and clips are read.
+
+        The data of a vmap, vmad or ptag event is the map the chunk was read
+        into, the whole of it where several chunks add to one map.
+
+        With drop_layers only the layer being read is kept in self.layers,
+        so a consumer can write each layer out and have it freed before the
+        next one is read.
+        """
+        if not self.open_lwo():
+            return
+        try:
+            for self.rootchunk in self.chunks:
+                for event in self.parse_event(drop_layers):
+                    yield event
+        finally:
+            self.close()
+
+    def parse_event(self, drop_layers=False):
+        """Parse the current chunk, returning the events it produced."""
+        chunkname = self.rootchunk.chunkname
+        data = self.rootchunk.data
+        subtype = bytes(data[0:4])
+        layer = self.layers[-1] if self.layers else None
+        layer_count = len(self.layers)
+        pnts_count = len(layer.pnts) if layer else 0
+        pols_count = len(layer.pols) if layer else 0
+        bones_count = len(layer.bones) if layer else 0
+        del data
+
+        self.parse_tags()
+
+        events = []
+        if len(self.layers) > layer_count:
+            # A LAYR, or the first PNTS of an LWOB file.
+            layer = self.layers[-1]
+            pnts_count = pols_count = bones_count = 0
+            events.append(_lwo_event("layer", chunkname, layer))
+            if drop_layers:
+                del self.layers[:-1]
+
+        if chunkname in (b"TAGS", b"SRFS"):
+            event = _lwo_event("tags", chunkname)
+            event.data = self.tags
+            events.append(event)
+        elif b"PNTS" == chunkname:
+            event = _lwo_event("pnts", chunkname, layer)
+            event.data = layer.pnts[pnts_count:]
+            events.append(event)
+        elif b"POLS" == chunkname and layer is not None:
+            event = _lwo_event("pols", chunkname, layer)
+            if len(layer.bones) > bones_count:
+                event.subtype = b"BONE"
+                event.data = layer.bones[bones_count:]
+            else:
+                event.subtype = subtype
+                event.data = layer.pols[pols_count:]
+            events.append(event)
+        elif chunkname in (b"VMAP", b"VMAD", b"PTAG"):
+            event = _lwo_event(chunkname.decode("ascii").lower(), chunkname, layer)
+            event.subtype = subtype
+            if b"PTAG" != chunkname:
+                event.name, name_len = self.read_lwostring(self.rootchunk.data[6:])
+            event.data = self.event_map(layer, chunkname, subtype, event.name)
+            events.append(event)
+        elif b"SURF" == chunkname:
+            event = _lwo_event("surf", chunkname)
+            event.name = self.read_lwostring(self.rootchunk.data)[0] or "Default"
+            event.data = self.surfs.get(event.name)
+            events.append(event)
+        elif b"CLIP" == chunkname:
+            event = _lwo_event("clip", chunkname)
+            (event.name,) = U4.unpack_from(self.rootchunk.data, 0)
+            event.data = self.clips.get(event.name)
+            events.append(event)
+        return events
+
+    def event_map(self, layer, chunkname, subtype, name):
+        """The layer's map a VMAP, VMAD or PTAG chunk was read into, if any."""
+        where = self.event_maps.get((chunkname, subtype))
+        if where is None or layer is None:
+            return None
+        attr, named, key = where
+        if attr == "edge_weights" and name != "Edge Weight":
+            # The other weight VMADs aren't read.
+            return None
+        value = getattr(layer, attr)
+        if named:
+            value = value.get(name)
+        if key is not None and value is not None:
+            value = value.get(key)
+        return value
+
+    def load(self, name):
+        """Parse whatever chunks the attribute name needs, for lazy reads."""
+        if not self.chunks:
+            return
+        if name in self.lazy_chunks:
+            names = self.lazy_chunks[name]
+            self.parse_chunks(lambda x: x in names)
+        elif name == "layers":
+            # Layers take everything else, PTAG/VMAD need the chunk order.
+            names = self.lazy_chunks["surfs"] + self.lazy_chunks["clips"]
+            self.parse_chunks(lambda x: x not in names)
+        else:
+            self.parse_chunks()
+
+    def close(self):
+        """Drop the chunk views and unmap the file."""
+        self.chunks = []
+        self.rootchunk = None
+        if self.map is not None:
+            close_source(self.map)
+            self.map = None
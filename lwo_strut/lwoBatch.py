@@ -0,0 +1,118 @@
+import os
+import sys
+import logging
+import argparse
+from glob import glob
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .lwoBase import _lwo_base, chd
+from .lwoDetect import _lwo_stat
+from .lwoObject import lwoObject
+
+
+class _batch_result(_lwo_base):
+    __slots__ = (
+        "filename",
+        "elements",
+        "stat",
+        "error",
+    )
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.elements = None
+        self.stat = None
+        self.error = None
+
+
+def summarise(x):
+    """An _lwo_stat for a parsed lwoObject."""
+    stat = _lwo_stat(x.filename)
+    stat.file_type = x.lwo.file_type.decode("ascii")
+    stat.layers = len(x.layers)
+    stat.pnts = sum(len(layer.pnts) for layer in x.layers)
+    stat.pols = sum(len(layer.pols) for layer in x.layers)
+    stat.tags = list(x.tags)
+    stat.surfs = list(x.surfs)
+    stat.clips = list(x.clips.values())
+    return stat
+
+
+def load_one(filename, ch=None, loglevel=logging.WARNING, summary=False):
+    """Read one file, any exception is recorded on the result."""
+    result = _batch_result(filename)
+    try:
+        x = lwoObject(filename, loglevel)
+        x.read(ch)
+        if summary:
+            result.stat = summarise(x)
+        else:
+            result.elements = x.elements
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def find_lwo(paths):
+    """Expand directories into the LWO files below them."""
+    infiles = []
+    for path in paths:
+        if os.path.isdir(path):
+            infiles.extend(
+                sorted(glob(f"{path}/**/*.[Ll][Ww][Oo]", recursive=True))
+            )
+        else:
+            infiles.append(path)
+    return infiles
+
+
+def load_many(paths, workers=None, ch=None, loglevel=logging.WARNING, summary=False):
+    """
+    Read many files in a process pool, yielding a _batch_result for each one
+    as it completes. A failing file sets result.error rather than stopping
+    the run. With workers=1 everything is read in this process.
+    """
+    if workers == 1:
+        for filename in paths:
+            yield load_one(filename, ch, loglevel, summary)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(load_one, filename, ch, loglevel, summary): filename
+            for filename in paths
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # The worker itself died, e.g. BrokenProcessPool.
+                result = _batch_result(futures[future])
+                result.error = f"{type(e).__name__}: {e}"
+                yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse many LWO files in parallel.")
+    parser.add_argument("paths", nargs="+", help="LWO files or directories to search")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--numpy", action="store_true", help="decode into arrays")
+    args = parser.parse_args(argv)
+
+    ch = chd()
+    ch.log_chunks = False
+    ch.use_numpy = args.numpy
+
+    errors = 0
+    for result in load_many(find_lwo(args.paths), args.workers, ch, summary=True):
+        if result.error is None:
+            s = result.stat
+            print(f"OK    {result.filename}: {s.layers} layers {s.pnts} points {s.pols} polygons")
+        else:
+            errors += 1
+            print(f"ERROR {result.filename}: {result.error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
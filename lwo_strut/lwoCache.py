@@ -0,0 +1,109 @@
+import os
+import pickle
+import hashlib
+import tempfile
+
+from .lwoBase import PARSER_VERSION
+
+
+class lwoCache:
+    """
+    An on disk cache of parsed objects.
+
+    Entries for files are keyed on the path, size, mtime and optionally a
+    hash of the content, entries for buffers on the content alone. Both
+    keys also hold the parser version and the chd options that change what
+    the parser produces. Writes are atomic, and once the cache grows past
+    max_size bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, max_size=1 << 30, hash_content=False):
+        self.path = os.path.abspath(path)
+        self.max_size = max_size
+        self.hash_content = hash_content
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def options(ch):
+        """The parser version and the chd options a key depends on."""
+        return [PARSER_VERSION, ch.load_hidden, ch.skel_to_arm, ch.use_numpy]
+
+    def key(self, filename, ch):
+        st = os.stat(filename)
+        parts = [os.path.abspath(filename), st.st_size, st.st_mtime_ns]
+        parts += self.options(ch)
+        if self.hash_content:
+            h = hashlib.sha256()
+            with open(filename, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            parts.append(h.hexdigest())
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def key_data(self, data, ch):
+        """The key of an object read from a buffer, always by its content."""
+        parts = [len(data), hashlib.sha256(data).hexdigest()]
+        parts += self.options(ch)
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def entry(self, key):
+        return os.path.join(self.path, f"{key}.pickle")
+
+    def get(self, key):
+        """The cached value for key, or None."""
+        entry = self.entry(key)
+        try:
+            with open(entry, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # A stale or damaged entry, treat it as a miss.
+            self.remove(entry)
+            return None
+        try:
+            # The mtime of an entry is its last use.
+            os.utime(entry)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        fd, tmpfile = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpfile, self.entry(key))
+        except BaseException:
+            self.remove(tmpfile)
+            raise
+        self.evict()
+
+    def remove(self, entry):
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        for e in os.scandir(self.path):
+            if not e.name.endswith(".pickle"):
+                continue
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, e.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_size:
+                break
+            self.remove(entry)
+            total -= size
+
+    def clear(self):
+        for e in os.scandir(self.path):
+            if e.name.endswith((".pickle", ".tmp")):
+                self.remove(e.path)
@@ -0,0 +1,145 @@
+import io
+import os
+import mmap
+
+from .lwoCodec import CHUNK
+
+
+def map_file(filename):
+    """Map a file read only, the mapping stays valid once the file is closed."""
+    with open(filename, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped.
+            return b""
+
+
+def source_path(source):
+    """The file path of a source, None for buffers and unnamed streams."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    name = getattr(source, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name
+    return None
+
+
+def source_label(source):
+    """A name for a source in messages."""
+    return source_path(source) or f"<{type(source).__name__}>"
+
+
+def map_source(source):
+    """
+    The contents of a source as a buffer, read once and never copied where
+    it can be helped. Paths and real files are mapped read only, bytes,
+    bytearray and memoryview are used as they are, other file objects are
+    read from their current position, which is then restored when the
+    stream is seekable.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return map_file(source)
+    if isinstance(source, (bytes, bytearray)):
+        return source
+    if isinstance(source, memoryview):
+        return source if source.format == "B" else source.cast("B")
+
+    pos = source.tell() if source.seekable() else None
+    if pos == 0:
+        try:
+            return mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            # Not a real file, or an empty one.
+            pass
+    data = source.read()
+    if pos is not None:
+        source.seek(pos)
+    return data
+
+
+def close_source(buf):
+    """Unmap a buffer from map_source, the caller's own buffers are left alone."""
+    if isinstance(buf, mmap.mmap):
+        try:
+            buf.close()
+        except BufferError:
+            # Something still holds a view of the mapping, it is unmapped
+            # once that is garbage collected.
+            pass
+
+
+def find_null(raw):
+    """Find the first zero byte without copying the whole buffer."""
+    if not isinstance(raw, memoryview):
+        return raw.find(b"\0")
+    for start in range(0, len(raw), 64):
+        i = bytes(raw[start : start + 64]).find(b"\0")
+        if i >= 0:
+            return start + i
+    return -1
+
+
+def read_lwostring(raw_name):
+    """Parse a zero-padded string."""
+
+    i = find_null(raw_name)
+    name_len = i + 1
+    if name_len % 2 == 1:  # Test for oddness.
+        name_len += 1
+
+    if i > 0:
+        # Some plugins put non-text strings in the tags chunk.
+        name = str(raw_name[0:i], "utf-8", "ignore")
+    else:
+        name = ""
+
+    return name, name_len
+
+
+class LWOChunk:
+    """
+    A single IFF chunk inside a mapped LWO file.
+
+    This replaces chunk.Chunk, read() hands back memoryview slices of the
+    mapping, so the chunk payload is never copied.
+    """
+
+    def __init__(self, buf, offset):
+        self.chunkname, self.chunksize = CHUNK.unpack_from(buf, offset)
+        self.offset = offset + 8
+        self.data = buf[self.offset : self.offset + self.chunksize]
+        self.size_read = 0
+
+    def getname(self):
+        return self.chunkname
+
+    def getsize(self):
+        return self.chunksize
+
+    def tell(self):
+        return self.size_read
+
+    def read(self, size=-1):
+        start = self.size_read
+        if size < 0:
+            self.size_read = len(self.data)
+        else:
+            self.size_read = min(start + size, len(self.data))
+        return self.data[start : self.size_read]
+
+    def skip(self):
+        self.size_read = len(self.data)
+
+    @property
+    def next_offset(self):
+        # Chunks are padded to an even length.
+        return self.offset + self.chunksize + (self.chunksize & 1)
+
+
+def iter_chunks(buf, offset=12):
+    """Yield the chunks of a FORM, starting after its 12 byte header."""
+    while offset + 8 <= len(buf):
+        rootchunk = LWOChunk(buf, offset)
+        yield rootchunk
+        offset = rootchunk.next_offset
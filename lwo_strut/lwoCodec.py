@@ -0,0 +1,110 @@
+"""
+Precompiled structs for the big-endian fields of LWO files.
+
+Decode with unpack_from(buffer, offset) straight from a chunk's memoryview
+rather than struct.unpack on a slice, which parses the format again and
+copies the bytes on every call, and with iter_unpack over runs of fixed
+size records.
+"""
+import struct
+from functools import lru_cache
+
+ID4 = struct.Struct("4s")
+U2 = struct.Struct(">H")
+I2 = struct.Struct(">h")
+U4 = struct.Struct(">L")
+F4 = struct.Struct(">f")
+U2x2 = struct.Struct(">HH")
+U1x4 = struct.Struct(">BBBB")
+VEC2 = struct.Struct(">ff")
+VEC12 = struct.Struct(">fff")
+COL16 = struct.Struct(">ffff")
+
+HEADER = struct.Struct(">4sL4s")
+CHUNK = struct.Struct(">4sL")
+SUBCHUNK = struct.Struct(">4sH")
+
+
+@lru_cache(maxsize=None)
+def u2_array(n):
+    """A struct for n U2s, as in the fixed size LWOB polygons."""
+    return struct.Struct(f">{n}H")
+
+
+@lru_cache(maxsize=None)
+def vx_record(sizes, payload):
+    """A struct for one record of VX indices of the given sizes and a payload."""
+    vx = "".join("L" if size == 4 else "H" for size in sizes)
+    return struct.Struct(f">{vx}{payload.format.lstrip('>')}")
+
+
+def vx_records(data, nvx, payload):
+    """
+    Decode a chunk of records made of nvx VX indices followed by a payload
+    struct, as in PTAG, VMAP and VMAD chunks. Returns a list with a tuple
+    of the indices and the payload values for each record.
+
+    Records are taken in runs that have the same VX sizes as the first one
+    of the run, each decoded with a single iter_unpack, which covers the
+    usual chunk of 2 byte indices or of ids sorted past 0xFF00. Short runs
+    are walked one record at a time.
+    """
+    # Indexed in place, chunk payloads are slices of the file mapping.
+    data = memoryview(data)
+    if data.format != "B":
+        data = data.cast("B")
+    chunk_len = len(data)
+    size = payload.size
+    records = []
+    offset = 0
+    window = 64
+    while offset < chunk_len:
+        sizes = []
+        pos = offset
+        for i in range(nvx):
+            sizes.append(4 if data[pos] == 255 else 2)
+            pos += sizes[-1]
+        stride = pos - offset + size
+        count = min(window, (chunk_len - offset) // stride)
+        run = count
+        lead = offset
+        for vx_size in sizes:
+            # Every lead byte of the run's VXs, 0xFF only for the 4 byte ones.
+            leads = bytes(data[lead : lead + count * stride : stride])
+            if vx_size == 4:
+                run = min(run, len(leads) - len(leads.lstrip(b"\xff")))
+            elif b"\xff" in leads:
+                run = min(run, leads.index(b"\xff"))
+            lead += vx_size
+
+        if run:
+            end = offset + run * stride
+            values = vx_record(tuple(sizes), payload).iter_unpack(data[offset:end])
+            if 4 in sizes:
+                masks = [0xFFFFFF if vx_size == 4 else 0xFFFF for vx_size in sizes]
+                values = [
+                    tuple([v & m for v, m in zip(r, masks)]) + r[nvx:] for r in values
+                ]
+            records.extend(values)
+            offset = end
+        window = window * 2 if run == count else 64
+
+        if run < 16:
+            # Mixed sizes, walking is cheaper than more short runs.
+            for _ in range(256):
+                if offset >= chunk_len:
+                    break
+                ids = []
+                for i in range(nvx):
+                    if data[offset] == 255:
+                        ids.append(
+                            data[offset + 1] << 16 | data[offset + 2] << 8 | data[offset + 3]
+                        )
+                        offset += 4
+                    else:
+                        ids.append(data[offset] << 8 | data[offset + 1])
+                        offset += 2
+                records.append(tuple(ids) + payload.unpack_from(data, offset))
+                offset += size
+
+    return records
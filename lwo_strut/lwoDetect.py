@@ -3,19 +3,97 @@ import struct
 from .LWO1 import LWO1
 from .LWO2 import LWO2
 from .LWO3 import LWO3
+from .lwoBase import _lwo_base
+from .lwoArray import HAVE_NUMPY, uniform_faces
+from .lwoChunk import map_source, close_source, source_label, iter_chunks, read_lwostring
+from .lwoCodec import HEADER, SUBCHUNK
 from .lwoExceptions import lwoUnsupportedFileException
 
 
+class _lwo_stat(_lwo_base):
+    __slots__ = (
+        "filename",
+        "file_type",
+        "layers",
+        "pnts",
+        "pols",
+        "tags",
+        "surfs",
+        "clips",
+    )
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file_type = ""
+        self.layers = 0
+        self.pnts = 0
+        self.pols = 0
+        self.tags = []
+        self.surfs = []
+        self.clips = []
+
+
+def _count_pols(data, lwob=False):
+    """Count the faces in a POLS payload by walking the face headers."""
+    if HAVE_NUMPY and not lwob and len(data):
+        faces = uniform_faces(data)
+        if faces is not None:
+            return len(faces)
+
+    count = 0
+    offset = 0
+    chunk_len = len(data)
+    while offset < chunk_len:
+        pnts_count = data[offset] << 8 | data[offset + 1]
+        offset += 2
+        if lwob:
+            # LWOB indices are always 2 bytes, followed by the surface.
+            offset += 2 * pnts_count + 2
+        else:
+            for j in range(pnts_count):
+                offset += 4 if data[offset] == 255 else 2
+        count += 1
+    return count
+
+
+def _read_strings(data):
+    strings = []
+    offset = 0
+    while offset < len(data):
+        name, name_len = read_lwostring(data[offset:])
+        offset += name_len
+        strings.append(name)
+    return strings
+
+
+def _surf_images(data, offset):
+    """The TIMG paths in an LWOB surface, these become its clips."""
+    paths = []
+    while offset + 6 <= len(data):
+        subchunk_name, subchunk_len = SUBCHUNK.unpack_from(data, offset)
+        offset += 6
+        if b"TIMG" == subchunk_name:
+            path, path_len = read_lwostring(data[offset:])
+            if path != "(none)":
+                paths.append(path)
+        offset += subchunk_len
+    return paths
+
+
 class LWODetect:
     def __new__(self, filename, loglevel=logging.INFO):
-        f = open(filename, "rb")
+        """
+        The reader for an LWO source: a path, bytes, bytearray, memoryview
+        or binary file object. The source is read once, the reader parses
+        the same buffer the header was sniffed from.
+        """
+        m = map_source(filename)
+        label = source_label(filename)
         try:
-            header, chunk_size, chunk_name = struct.unpack(">4s1L4s", f.read(12))
-        except:
-            f.close()
-            raise Exception(f"Error parsing file header! Filename {filename}")
-        f.close()
-        del f
+            header, chunk_size, chunk_name = HEADER.unpack_from(m)
+        except struct.error:
+            close_source(m)
+            raise Exception(f"Error parsing file header! Filename {label}")
 
         if chunk_name == b"LWO2":
             lwo = LWO2(filename, loglevel)
@@ -23,7 +101,70 @@ class LWODetect:
             # LWOB and LWLO are the old format, LWLO is a layered object.
             lwo = LWO1(filename, loglevel)
         else:
-            msg = f"Invalid LWO File Type: {filename}"
+            close_source(m)
+            msg = f"Invalid LWO File Type: {label}"
             raise lwoUnsupportedFileException(msg)
 
+        lwo.map = m
         return lwo
+
+    @staticmethod
+    def probe(filename):
+        """
+        Summarise a file, or any source LWODetect takes, without parsing
+        its geometry.
+
+        Only the chunk headers are walked, the small TAGS, LAYR, SURF and
+        CLIP chunks are read for names and the point count comes from the
+        PNTS chunk sizes.
+        """
+        m = map_source(filename)
+        filename = source_label(filename)
+        buf = memoryview(m)
+        try:
+            try:
+                header, chunk_size, chunk_name = HEADER.unpack_from(buf)
+            except struct.error:
+                raise Exception(f"Error parsing file header! Filename {filename}")
+            if chunk_name not in (b"LWO2", b"LWOB", b"LWLO"):
+                msg = f"Invalid LWO File Type: {filename}"
+                raise lwoUnsupportedFileException(msg)
+            lwob = chunk_name != b"LWO2"
+
+            stat = _lwo_stat(filename)
+            stat.file_type = chunk_name.decode("ascii")
+            for rootchunk in iter_chunks(buf):
+                name = rootchunk.chunkname
+                data = rootchunk.data
+                if name in (b"TAGS", b"SRFS"):
+                    stat.tags.extend(_read_strings(data))
+                elif b"LAYR" == name:
+                    stat.layers += 1
+                elif b"PNTS" == name:
+                    stat.pnts += len(data) // 12
+                elif b"POLS" == name and lwob:
+                    stat.pols += _count_pols(data, lwob=True)
+                elif b"POLS" == name and bytes(data[0:4]) in (
+                    b"FACE",
+                    b"PTCH",
+                    b"SUBD",
+                ):
+                    stat.pols += _count_pols(data[4:])
+                elif b"SURF" == name:
+                    surf_name, name_len = read_lwostring(data)
+                    stat.surfs.append(surf_name or "Default")
+                    if lwob:
+                        stat.clips.extend(_surf_images(data, name_len))
+                elif b"CLIP" == name:
+                    path, path_len = read_lwostring(data[10:])
+                    stat.clips.append(path)
+
+            if lwob and stat.pnts and not stat.layers:
+                # LWOB files have no LAYR chunk, the parser makes one.
+                stat.layers = 1
+            return stat
+        finally:
+            del buf
+            close_source(m)
+
+    stat = probe
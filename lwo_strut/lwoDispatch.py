@@ -0,0 +1,78 @@
+import time
+import struct
+
+
+class lwoDispatch:
+    """
+    A table from a 4 byte chunk or subchunk ID to the reader method that
+    handles it, in place of chains of if b"XXXX" == name.
+
+    A handler is the name of a reader method, or a function taking the
+    reader first. It is called with the dispatch arguments followed by the
+    arguments it was registered with. Registering with a struct format puts
+    the compiled struct.Struct first among those. Ignored IDs are only
+    logged, and any other ID goes to the default handler with the ID in
+    front of the dispatch arguments, or is ignored when there is none.
+
+    When reader.chunk_stats is a dict, a call count and the seconds spent
+    are collected for every (table name, ID).
+    """
+
+    def __init__(self, name, default=None, ignored_msg=None, skip=False):
+        self.name = name
+        self.default = default
+        self.ignored_msg = ignored_msg
+        # Skip the rest of the root chunk for ignored IDs.
+        self.skip = skip
+        self.table = {}
+
+    def register(self, id, handler, *args, fmt=None):
+        if fmt is not None:
+            args = (struct.Struct(fmt),) + args
+        self.table[id] = (handler, args)
+
+    def ignore(self, *ids, log=True):
+        for id in ids:
+            self.table[id] = (None, log)
+
+    def copy(self, name=None):
+        """A table with the same entries, to extend without touching this one."""
+        other = lwoDispatch(name or self.name, self.default, self.ignored_msg, self.skip)
+        other.table = dict(self.table)
+        return other
+
+    def dispatch(self, reader, id, *extra):
+        stats = reader.chunk_stats
+        if stats is None:
+            return self.call(reader, id, extra)
+        start = time.perf_counter()
+        try:
+            return self.call(reader, id, extra)
+        finally:
+            s = stats.setdefault((self.name, id), [0, 0.0])
+            s[0] += 1
+            s[1] += time.perf_counter() - start
+
+    def call(self, reader, id, extra):
+        entry = self.table.get(id)
+        if entry is None:
+            if self.default is None:
+                return self.ignored(reader, id, True)
+            return self.handler(reader, self.default)(id, *extra)
+
+        handler, args = entry
+        if handler is None:
+            return self.ignored(reader, id, args)
+        return self.handler(reader, handler)(*extra, *args)
+
+    def ignored(self, reader, id, log):
+        if self.skip:
+            reader.rootchunk.skip()
+        if log and self.ignored_msg:
+            reader.debug(self.ignored_msg, id)
+
+    @staticmethod
+    def handler(reader, handler):
+        if isinstance(handler, str):
+            return getattr(reader, handler)
+        return lambda *args: handler(reader, *args)
@@ -0,0 +1,433 @@
+"""
+Export parsed layers to binary glTF (.glb), binary PLY and OBJ.
+
+The file is streamed with iter_events(drop_layers=True): each layer is
+turned into vertex and index buffers, written out in bulk and freed before
+the next one is read, so the whole object is never held twice. The counts
+a format needs ahead of its data are patched in, or the data staged in a
+temporary file, once the last layer has been written.
+
+All three formats are written Y up: the parser's points and normals are
+Z up, and are turned with (x, y, z) -> (x, z, -y).
+
+Surfaces are read after the layers, so computed normals use the default
+smoothing angle rather than each surface's SMAN.
+"""
+import os
+import sys
+import json
+import shutil
+import struct
+import logging
+import argparse
+import tempfile
+
+from .lwoArray import np, PolygonArray, SurfaceTags
+from .lwoObject import lwoObject
+from .lwoTriangulate import triangulate
+from .lwoVertexBuffer import build_vertex_buffer, layout
+
+# Rows formatted per write for OBJ.
+_OBJ_ROWS = 65536
+# The most corners a PLY face can have with a uchar count.
+_PLY_MAX_CORNERS = 255
+
+_GLB_HEADER = struct.Struct("<4sII")
+_GLB_CHUNK = struct.Struct("<I4s")
+_GL_FLOAT = 5126
+_GL_UNSIGNED_INT = 5125
+_GL_ARRAY_BUFFER = 34962
+_GL_ELEMENT_ARRAY_BUFFER = 34963
+
+_PLY_PROPERTIES = {
+    "position": ("x", "y", "z"),
+    "normal": ("nx", "ny", "nz"),
+    "uv": ("s", "t"),
+    "color": ("red", "green", "blue"),
+}
+
+
+def _source(x):
+    """An lwoObject for x, or x itself if it is one already."""
+    if isinstance(x, lwoObject):
+        return x
+    return lwoObject(x, logging.WARNING)
+
+
+def iter_layers(x, ch=None):
+    """
+    Each layer of an lwoObject once it has been read. Only the layer
+    yielded is kept, x.lwo holds the tags and surfaces when done.
+    """
+    layer = None
+    for event in x.iter_events(ch, drop_layers=True):
+        if event.type == "layer":
+            if layer is not None:
+                yield layer
+            layer = event.layer
+    if layer is not None:
+        yield layer
+
+
+def layer_name(layer):
+    return layer.name or f"Layer {layer.index + 1}"
+
+
+def has_uvs(layer):
+    return bool(layer.uvmaps_vmap) or bool(layer.uvmaps_vmad)
+
+
+def surface_index(layer):
+    """The surface tag of each of a layer's faces, -1 for none."""
+    count = len(layer.pols)
+    index = np.full(count, -1, dtype=np.int64)
+    tagged = SurfaceTags.from_dict(layer.surf_tags, count).index[:count]
+    index[: len(tagged)] = tagged
+    return index
+
+
+def _layer_buffers(layer, attributes):
+    """
+    The vertex buffer of a layer, with its triangle indices ordered by
+    surface tag: (vertices, indices, tags, starts) where the triangles of
+    tags[i] are indices[3 * starts[i]:3 * starts[i + 1]].
+    """
+    # Converted once for every step, the streamed layer is dropped after.
+    pols = layer.pols = PolygonArray.from_lists(layer.pols)
+    vertices, corner_vertex = build_vertex_buffer(layer, attributes, triangles=False)
+    _, faces, corners = triangulate(layer.pnts, pols)
+    tri_tags = surface_index(layer)[faces]
+    order = np.argsort(tri_tags, kind="stable")
+    tri_tags = tri_tags[order]
+    indices = corner_vertex[corners.reshape(-1, 3)[order]].reshape(-1)
+    starts = np.flatnonzero(np.diff(tri_tags, prepend=-2))
+    return vertices, indices, tri_tags[starts], np.append(starts, len(tri_tags))
+
+
+def _y_up(vertices, attributes):
+    """Turn the points and normals of a vertex buffer from Z up to Y up, in place."""
+    for name, first, size in layout(attributes):
+        if name in ("position", "normal"):
+            vertices[:, first + 1 : first + 3] = vertices[:, [first + 2, first + 1]]
+            vertices[:, first + 2] *= -1
+
+
+def _pad(f, size, fill=b"\0"):
+    """Pad what has been written to f to a multiple of 4 bytes."""
+    padding = -size % 4
+    f.write(fill * padding)
+    return size + padding
+
+
+def export_glb(x, outfile, ch=None):
+    """
+    Write an lwoObject, or any source it takes, to a binary glTF file: a
+    mesh per layer, a primitive per surface and a material per surface
+    named by its tag. UVs are flipped to a top left origin.
+    """
+    gltf = {
+        "asset": {"version": "2.0", "generator": "lwo_strut"},
+        "scene": 0,
+        "scenes": [{"nodes": []}],
+        "nodes": [],
+        "meshes": [],
+        "accessors": [],
+        "bufferViews": [],
+    }
+    x = _source(x)
+    materials = {}
+    offset = 0
+
+    with tempfile.TemporaryFile() as staged:
+        for layer in iter_layers(x, ch):
+            attributes = ["position", "normal"] + (["uv"] if has_uvs(layer) else [])
+            vertices, indices, tags, starts = _layer_buffers(layer, attributes)
+            if not len(indices):
+                continue
+
+            # glTF's v runs down.
+            _y_up(vertices, attributes)
+            for name, first, size in layout(attributes):
+                if name == "uv":
+                    vertices[:, first + 1] = 1 - vertices[:, first + 1]
+
+            data = vertices.astype("<f4").tobytes()
+            staged.write(data)
+            gltf["bufferViews"].append(
+                {
+                    "buffer": 0,
+                    "byteOffset": offset,
+                    "byteLength": len(data),
+                    "byteStride": vertices.shape[1] * 4,
+                    "target": _GL_ARRAY_BUFFER,
+                }
+            )
+            offset += len(data)
+            vertex_view = len(gltf["bufferViews"]) - 1
+            data = indices.astype("<u4").tobytes()
+            staged.write(data)
+            gltf["bufferViews"].append(
+                {
+                    "buffer": 0,
+                    "byteOffset": offset,
+                    "byteLength": len(data),
+                    "target": _GL_ELEMENT_ARRAY_BUFFER,
+                }
+            )
+            offset += len(data)
+            index_view = len(gltf["bufferViews"]) - 1
+            del data
+
+            accessors = gltf["accessors"]
+            names = {"position": "POSITION", "normal": "NORMAL", "uv": "TEXCOORD_0"}
+            vec = {2: "VEC2", 3: "VEC3"}
+            primitive_attributes = {}
+            for name, first, size in layout(attributes):
+                accessor = {
+                    "bufferView": vertex_view,
+                    "byteOffset": first * 4,
+                    "componentType": _GL_FLOAT,
+                    "count": len(vertices),
+                    "type": vec[size],
+                }
+                if name == "position":
+                    accessor["min"] = vertices[:, :3].min(axis=0).tolist()
+                    accessor["max"] = vertices[:, :3].max(axis=0).tolist()
+                primitive_attributes[names[name]] = len(accessors)
+                accessors.append(accessor)
+
+            primitives = []
+            for tag, a, b in zip(tags.tolist(), starts[:-1].tolist(), starts[1:].tolist()):
+                primitive = {"attributes": primitive_attributes, "indices": len(accessors)}
+                accessors.append(
+                    {
+                        "bufferView": index_view,
+                        "byteOffset": a * 12,
+                        "componentType": _GL_UNSIGNED_INT,
+                        "count": (b - a) * 3,
+                        "type": "SCALAR",
+                    }
+                )
+                if tag >= 0:
+                    primitive["material"] = materials.setdefault(tag, len(materials))
+                primitives.append(primitive)
+
+            name = layer_name(layer)
+            gltf["meshes"].append({"name": name, "primitives": primitives})
+            gltf["scenes"][0]["nodes"].append(len(gltf["nodes"]))
+            gltf["nodes"].append({"name": name, "mesh": len(gltf["meshes"]) - 1})
+
+        gltf["materials"] = [None] * len(materials)
+        for tag, i in materials.items():
+            gltf["materials"][i] = _glb_material(x.lwo, tag)
+        if offset:
+            gltf["buffers"] = [{"byteLength": offset}]
+        gltf = {k: v for k, v in gltf.items() if v != []}
+
+        header = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+        header += b" " * (-len(header) % 4)
+        bin_size = offset + (-offset % 4)
+        total = _GLB_HEADER.size + _GLB_CHUNK.size + len(header)
+        if offset:
+            total += _GLB_CHUNK.size + bin_size
+        with open(outfile, "wb") as f:
+            f.write(_GLB_HEADER.pack(b"glTF", 2, total))
+            f.write(_GLB_CHUNK.pack(len(header), b"JSON"))
+            f.write(header)
+            if offset:
+                f.write(_GLB_CHUNK.pack(bin_size, b"BIN\0"))
+                staged.seek(0)
+                shutil.copyfileobj(staged, f)
+                _pad(f, offset)
+
+
+def surface_name(lwo, tag):
+    """The surface name of a tag, made up for a tag past the end of TAGS."""
+    if tag < len(lwo.tags) and lwo.tags[tag]:
+        return lwo.tags[tag]
+    return f"Surface {tag}"
+
+
+def _glb_material(lwo, tag):
+    """A glTF material for surface tag, colored from the surface if read."""
+    name = surface_name(lwo, tag)
+    material = {"name": name}
+    surf = lwo.surfs.get(name)
+    if surf is not None:
+        material["pbrMetallicRoughness"] = {
+            "baseColorFactor": [float(c) for c in surf.colr] + [1.0 - surf.tran],
+            "metallicFactor": 0.0,
+        }
+        if surf.tran > 0:
+            material["alphaMode"] = "BLEND"
+    return material
+
+
+def _ply_faces(layer, pols, corner_vertex):
+    """
+    The uchar count and uint32 indices of every face as a little endian
+    byte array. Faces with more corners than a uchar can count are written
+    as their triangles.
+    """
+    counts = pols.counts
+    if len(counts) and counts.max() > _PLY_MAX_CORNERS:
+        large = counts > _PLY_MAX_CORNERS
+        _, faces, corners = triangulate(layer.pnts, pols)
+        corners = corners.reshape(-1, 3)[large[faces]].reshape(-1)
+        keep = ~np.repeat(large, counts)
+        corner_vertex = np.concatenate((corner_vertex[keep], corner_vertex[corners]))
+        counts = np.concatenate((counts[~large], np.full(len(corners) // 3, 3)))
+
+    record = np.zeros(len(counts) + 4 * len(corner_vertex), dtype=np.uint8)
+    starts = np.cumsum(counts) - counts
+    heads = 4 * starts + np.arange(len(counts))
+    record[heads] = counts
+    # Corner k follows k earlier corners and the counts of its face and those before.
+    face_of_corner = np.repeat(np.arange(len(counts)), counts)
+    first = 4 * np.arange(len(corner_vertex)) + face_of_corner + 1
+    data = corner_vertex.astype("<u4").view(np.uint8).reshape(-1, 4)
+    record[first[:, None] + np.arange(4)] = data
+    return record, len(counts)
+
+
+def export_ply(x, outfile, ch=None, attributes=("position", "normal", "uv")):
+    """
+    Write an lwoObject, or any source it takes, to a binary little endian
+    PLY file, the layers merged into one mesh of float vertex properties
+    and faces. Layers without UVs, or colors, have those filled with
+    zeros, or ones.
+    """
+    attributes = list(attributes)
+    header = ["ply", "format binary_little_endian 1.0", "comment lwo_strut export"]
+    header.append("element vertex %010d")
+    for name, first, size in layout(attributes):
+        for prop in _PLY_PROPERTIES[name.partition(":")[0]]:
+            header.append(f"property float {prop}")
+    header.append("element face %010d")
+    header.append("property list uchar uint vertex_indices")
+    header.append("end_header")
+    header = "\n".join(header) + "\n"
+
+    x = _source(x)
+    vertex_count = 0
+    face_count = 0
+    with open(outfile, "wb") as f, tempfile.TemporaryFile() as staged:
+        f.write((header % (0, 0)).encode("ascii"))
+        for layer in iter_layers(x, ch):
+            pols = layer.pols = PolygonArray.from_lists(layer.pols)
+            vertices, corner_vertex = build_vertex_buffer(layer, attributes, triangles=False)
+            _y_up(vertices, attributes)
+            f.write(vertices.astype("<f4").tobytes())
+            record, count = _ply_faces(layer, pols, corner_vertex + np.uint32(vertex_count))
+            staged.write(record.tobytes())
+            vertex_count += len(vertices)
+            face_count += count
+
+        staged.seek(0)
+        shutil.copyfileobj(staged, f)
+        # The counts are fixed width, patch them in over the placeholders.
+        f.seek(0)
+        f.write((header % (vertex_count, face_count)).encode("ascii"))
+
+
+def _obj_rows(f, prefix, rows):
+    """Write the rows of a float array as OBJ lines, in batches."""
+    fmt = prefix + " %.7g" * rows.shape[1] + "\n"
+    for start in range(0, len(rows), _OBJ_ROWS):
+        batch = rows[start : start + _OBJ_ROWS]
+        f.write(((fmt * len(batch)) % tuple(batch.ravel().tolist())).encode("ascii"))
+
+
+def _obj_faces(f, counts, numbers, fmt):
+    """
+    Write faces of counts corners, numbers holding the number of each
+    corner for every field of fmt, in order.
+    """
+    numbers = np.stack(numbers, axis=1)
+    slots = numbers.shape[1]
+    for size in np.unique(counts).tolist():
+        # Faces of one size, one format.
+        rows = numbers[np.repeat(counts == size, counts)].reshape(-1, size * slots)
+        line = "f" + (" " + fmt) * size + "\n"
+        for start in range(0, len(rows), _OBJ_ROWS):
+            batch = rows[start : start + _OBJ_ROWS]
+            f.write(((line * len(batch)) % tuple(batch.ravel().tolist())).encode("ascii"))
+
+
+def export_obj(x, outfile, ch=None):
+    """
+    Write an lwoObject, or any source it takes, to an OBJ file, an object
+    per layer with a usemtl group per surface. A vertex is a v, vn and,
+    for layers with UVs, vt line. The vt lines are counted apart, as the
+    layers without UVs have none.
+    """
+    x = _source(x)
+    vertex_count = 0
+    uv_count = 0
+    with open(outfile, "wb") as f:
+        f.write(b"# lwo_strut export\n")
+        for layer in iter_layers(x, ch):
+            uvs = has_uvs(layer)
+            attributes = ["position", "normal"] + (["uv"] if uvs else [])
+            pols = layer.pols = PolygonArray.from_lists(layer.pols)
+            vertices, corner_vertex = build_vertex_buffer(layer, attributes, triangles=False)
+            _y_up(vertices, attributes)
+
+            f.write(f"o {layer_name(layer)}\n".encode("utf-8"))
+            _obj_rows(f, "v", vertices[:, :3])
+            if uvs:
+                _obj_rows(f, "vt", vertices[:, 6:8])
+            _obj_rows(f, "vn", vertices[:, 3:6])
+
+            tags = surface_index(layer)
+            order = np.argsort(tags, kind="stable")
+            counts = pols.counts
+            corner_vertex = corner_vertex.astype(np.int64)
+            starts = np.flatnonzero(np.diff(tags[order], prepend=-2))
+            ends = np.append(starts[1:], len(order))
+            fmt = "%d/%d/%d" if uvs else "%d//%d"
+            for a, b in zip(starts.tolist(), ends.tolist()):
+                faces = order[a:b]
+                tag = int(tags[faces[0]])
+                if tag >= 0:
+                    f.write(f"usemtl {surface_name(x.lwo, tag)}\n".encode("utf-8"))
+                corners = corner_vertex[_face_corners(pols, faces)]
+                numbers = [corners + vertex_count + 1]
+                if uvs:
+                    numbers.append(corners + uv_count + 1)
+                numbers.append(numbers[0])
+                _obj_faces(f, counts[faces], numbers, fmt)
+            vertex_count += len(vertices)
+            if uvs:
+                uv_count += len(vertices)
+
+
+def _face_corners(pols, faces):
+    """The corners of faces of a PolygonArray, face by face."""
+    counts = pols.counts[faces]
+    starts = pols.offsets[faces]
+    return np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+
+
+EXPORTERS = {".glb": export_glb, ".ply": export_ply, ".obj": export_obj}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert an LWO file to glb, PLY or OBJ.")
+    parser.add_argument("infile", help="LWO file to read")
+    parser.add_argument("outfile", help="file to write, the format is taken from its extension")
+    parser.add_argument("--numpy", action="store_true", help="decode into arrays")
+    args = parser.parse_args(argv)
+
+    ext = os.path.splitext(args.outfile)[1].lower()
+    if ext not in EXPORTERS:
+        parser.error(f"unknown output format {ext}, use one of {', '.join(EXPORTERS)}")
+    x = lwoObject(args.infile, logging.WARNING)
+    x.ch.log_chunks = False
+    x.ch.use_numpy = args.numpy
+    EXPORTERS[ext](x, args.outfile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
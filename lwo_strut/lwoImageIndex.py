@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Bump when the saved index layout changes, older files are then ignored.
+INDEX_VERSION = 1
+# A directory changed this recently may change again within the same mtime
+# tick, its listing is not trusted by the next run.
+_RACY_NS = 2 * 10 ** 9
+
+
+def list_dir(path):
+    """The file and subdirectory names of a directory that the walk uses."""
+    files = []
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir():
+                    subdirs.append(entry.name)
+                elif "." in entry.name:
+                    files.append(entry.name)
+            except OSError:
+                continue
+    return files, subdirs
+
+
+def walk_root(root, recursive=True, previous=None):
+    """
+    Index the image files below root by lower cased basename, each name
+    maps to its paths in walk order.
+
+    This follows what glob(f"{root}/**/*.*") used to find: names with a
+    dot in them, hidden entries skipped, a directory's files before those
+    of its subdirectories. Without recursive only the files one directory
+    down are taken, as ** then matches a single directory.
+
+    previous holds the directory listings of an earlier walk, keyed by
+    path, as [mtime_ns, files, subdirs]. A directory whose mtime has not
+    changed is not listed again. Returns the index, this walk's listings
+    and how many directories had to be listed.
+    """
+    index = {}
+    dirs = {}
+    seen = set()
+    listed = 0
+    previous = previous or {}
+    now = time.time_ns()
+
+    def walk(path, depth):
+        nonlocal listed
+        try:
+            real = os.path.realpath(path)
+            if real in seen:
+                return
+            seen.add(real)
+            mtime = os.stat(path).st_mtime_ns
+            old = previous.get(path)
+            if old is not None and old[0] == mtime:
+                files, subdirs = old[1], old[2]
+            else:
+                files, subdirs = list_dir(path)
+                listed += 1
+        except OSError:
+            return
+
+        dirs[path] = [mtime if now - mtime > _RACY_NS else None, files, subdirs]
+        if recursive or depth == 1:
+            for name in files:
+                index.setdefault(name.lower(), []).append(os.path.join(path, name))
+
+        if recursive or depth == 0:
+            for name in subdirs:
+                walk(os.path.join(path, name), depth + 1)
+
+    walk(root, 0)
+    return index, dirs, listed
+
+
+def scan_root(root, recursive=True):
+    return walk_root(root, recursive)[0]
+
+
+class lwoImageIndex:
+    """
+    A case insensitive basename index of the files below the search roots,
+    so a clip resolves with a dict lookup per root instead of a scan of
+    every file. Roots are walked once, in parallel, and the index can be
+    shared between many lwoObjects through ch.image_index.
+
+    With a path the directory listings of each root are saved there, and a
+    later run only lists the directories whose mtime has changed.
+    """
+
+    def __init__(self, workers=None, path=None):
+        self.workers = workers
+        self.path = path and os.path.abspath(path)
+        self.roots = {}
+        self.dirs_listed = 0
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    def entry(self, root, recursive):
+        key = repr([os.path.abspath(root), recursive]).encode("utf-8")
+        return os.path.join(self.path, f"{hashlib.sha256(key).hexdigest()}.json")
+
+    def load(self, root, recursive):
+        """The saved directory listings for a root, or None."""
+        try:
+            with open(self.entry(root, recursive), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("version") != INDEX_VERSION or saved.get("root") != root:
+            return None
+        return saved.get("dirs")
+
+    def save(self, root, recursive, dirs):
+        saved = {"version": INDEX_VERSION, "root": root, "dirs": dirs}
+        fd, tmpfile = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(saved, f, separators=(",", ":"))
+            os.replace(tmpfile, self.entry(root, recursive))
+        except BaseException:
+            try:
+                os.remove(tmpfile)
+            except OSError:
+                pass
+            raise
+
+    def scan(self, root, recursive):
+        previous = self.load(root, recursive) if self.path else None
+        index, dirs, listed = walk_root(root, recursive, previous)
+        self.dirs_listed += listed
+        if self.path and (listed or dirs != previous):
+            try:
+                self.save(root, recursive, dirs)
+            except OSError:
+                pass
+        return index
+
+    def add_roots(self, roots, recursive=True):
+        missing = []
+        for root in roots:
+            if (root, recursive) not in self.roots and root not in missing:
+                missing.append(root)
+        if len(missing) == 1:
+            self.roots[(missing[0], recursive)] = self.scan(missing[0], recursive)
+        elif missing:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                found = pool.map(lambda root: self.scan(root, recursive), missing)
+                for root, index in zip(missing, found):
+                    self.roots[(root, recursive)] = index
+
+    def find(self, roots, imagefile, recursive=True):
+        """Every path, across the roots in order, named imagefile."""
+        self.add_roots(roots, recursive)
+        name = imagefile.lower()
+        paths = []
+        for root in roots:
+            paths.extend(self.roots[(root, recursive)].get(name, ()))
+        return paths
+
+    def clear(self):
+        """
+        Forget the indexed roots, they are walked again when next used, and
+        revalidated against the saved listings when there is a path.
+        """
+        self.roots.clear()
@@ -1,10 +1,16 @@
 import sys
 import logging
 
+# Loggers that already have their stdout handler.
+_configured = set()
+
+
 class LWOLogger:
     def __new__(self, type, loglevel=logging.INFO):
         l = logging.getLogger(type)
         l.setLevel(loglevel)
+        if type in _configured:
+            return l
 
         stdout_handler = logging.StreamHandler(sys.stdout)
         stdout_handler.setLevel(loglevel)
@@ -18,4 +24,42 @@ class LWOLogger:
 
         if not handler_present:
             l.addHandler(stdout_handler)
+        _configured.add(type)
         return l
+
+
+class LWOLog:
+    """
+    A cheap front for a logger in the readers' per chunk paths. The level
+    is checked once, when the facade is made or refreshed, and messages
+    take %-style arguments so they are only formatted when emitted.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.refresh()
+
+    def refresh(self, quiet=False):
+        """Take up the logger's level, quiet drops the debug and info messages."""
+        level = self.logger.getEffectiveLevel()
+        if quiet:
+            level = max(level, logging.WARNING)
+        self.level = level
+        self.is_debug = level <= logging.DEBUG
+        self.is_info = level <= logging.INFO
+        self.is_warning = level <= logging.WARNING
+
+    def debug(self, msg, *args):
+        if self.is_debug:
+            self.logger.debug(msg, *args)
+
+    def info(self, msg, *args):
+        if self.is_info:
+            self.logger.info(msg, *args)
+
+    def warning(self, msg, *args):
+        if self.is_warning:
+            self.logger.warning(msg, *args)
+
+    def error(self, msg, *args):
+        self.logger.error(msg, *args)
@@ -0,0 +1,135 @@
+"""
+Face, vertex and smoothing angle split corner normals for a layer.
+
+LightWave smooths a face with its neighbours of the same surface when the
+angle between them is within the surface's SMAN smoothing angle, and keeps
+the edge hard otherwise. Normals are worked out for every corner at once
+with numpy scatter adds over the polygon arrays.
+"""
+import math
+
+from .lwoArray import np, PolygonArray, SurfaceTags, corner_faces
+from .lwoTriangulate import face_normals
+
+# The smoothing angle of a smooth surface saved without one, LightWave's
+# default of 89.5 degrees.
+DEFAULT_SMOOTH_ANGLE = math.radians(89.5)
+
+
+def unit(v):
+    """Rows of v scaled to length 1, zero length rows are left zero."""
+    length = np.linalg.norm(v, axis=-1, keepdims=True)
+    return np.divide(v, length, out=np.zeros_like(v), where=length > 0)
+
+
+def _scatter(index, values, count):
+    """Sum (M, 3) values into count rows by index."""
+    sums = np.empty((count, 3), dtype=np.float64)
+    for axis in range(3):
+        sums[:, axis] = np.bincount(index, weights=values[:, axis], minlength=count)
+    return sums
+
+
+def vertex_normals(pnts, pols):
+    """Area weighted unit normals per point, zero for unused points."""
+    pnts = np.asarray(pnts, dtype=np.float64).reshape(-1, 3)
+    pols = PolygonArray.from_lists(pols)
+    normals = face_normals(pnts, pols)
+    sums = _scatter(pols.indices, normals[corner_faces(pols)], len(pnts))
+    return unit(sums).astype(np.float32)
+
+
+def _pairs(starts, sizes):
+    """Every (i, j) pair of positions within the same run, for runs of sizes."""
+    members = np.repeat(starts, sizes) + np.arange(sizes.sum()) - np.repeat(
+        np.cumsum(sizes) - sizes, sizes
+    )
+    reps = np.repeat(sizes, sizes)
+    i = np.repeat(members, reps)
+    first = np.repeat(np.repeat(starts, sizes), reps)
+    j = first + np.arange(len(i)) - np.repeat(np.cumsum(reps) - reps, reps)
+    return members, i, j
+
+
+def corner_normals(pnts, pols, angles, groups=None):
+    """
+    Unit normals per polygon corner, aligned with
+    PolygonArray.from_lists(pols).indices.
+
+    Each corner takes the area weighted normals of the faces around its
+    point that are within angles[face], in radians, of its own face, and
+    in the same group, the surface tag, when groups is given. A face with
+    an angle of 0 is flat. Corners of one point are split wherever the
+    angle between their faces exceeds the threshold.
+    """
+    pnts = np.asarray(pnts, dtype=np.float64).reshape(-1, 3)
+    pols = PolygonArray.from_lists(pols)
+    angles = np.asarray(angles, dtype=np.float64)
+    normals = face_normals(pnts, pols)
+    units = unit(normals)
+    faces = corner_faces(pols)
+
+    # Runs of the corners sharing a point, and a group.
+    keys = pols.indices.astype(np.int64)
+    if groups is not None:
+        keys |= (np.asarray(groups, dtype=np.int64)[faces] + 1) << 32
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    faces = faces[order]
+    starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    sizes = np.diff(np.append(starts, len(keys)))
+    run = np.repeat(np.arange(len(starts)), sizes)
+
+    # A run whose faces are all within half its smallest angle of the run's
+    # mean normal is smooth throughout, every corner takes that mean.
+    means = unit(_scatter(run, normals[faces], len(starts)))
+    result = means[run]
+    smallest = np.minimum.reduceat(angles[faces], starts) if len(starts) else angles[:0]
+    half = np.where(smallest > 0, np.cos(smallest / 2), 2.0)[run]
+    off = np.einsum("ij,ij->i", units[faces], result) < half
+    sharp = (np.bincount(run, weights=off, minlength=len(starts)) > 0) & (sizes > 1)
+
+    # The rest check every pair of their corners.
+    members, i, j = _pairs(starts[sharp], sizes[sharp])
+    fi, fj = faces[i], faces[j]
+    cos_angles = np.where(angles > 0, np.cos(angles), 2.0)
+    dots = np.einsum("ij,ij->i", units[fi], units[fj])
+    keep = (dots >= cos_angles[fi]) | (fi == fj)
+    sums = _scatter(i[keep], normals[fj[keep]], len(keys))
+    result[members] = unit(sums[members])
+
+    normals = np.empty_like(result, dtype=np.float32)
+    normals[order] = result
+    return normals
+
+
+def smooth_angles(layer, tags, surfs):
+    """
+    The smoothing angle and the surface tag, -1 for none, of each of a
+    layer's faces, from the surfaces named by tags.
+    """
+    count = len(layer.pols)
+    tagged = SurfaceTags.from_dict(layer.surf_tags, count).index[:count]
+    index = np.full(count, -1, dtype=np.int64)
+    index[: len(tagged)] = tagged
+    by_tag = np.zeros(len(tags) + 1, dtype=np.float64)
+    for tag, name in enumerate(tags):
+        surf = surfs.get(name)
+        if surf is not None and surf.smooth:
+            by_tag[tag] = getattr(surf, "smooth_angle", 0.0) or DEFAULT_SMOOTH_ANGLE
+    # Faces with no surface, or a tag past the end, index the last, flat, entry.
+    angles = by_tag[np.where((index >= 0) & (index < len(tags)), index, len(tags))]
+    return angles, index
+
+
+def layer_normals(layer, tags, surfs):
+    """
+    The unit face normals (F, 3) and smoothing angle split corner normals
+    (corners, 3) of a layer, float32, for the tags and surfs of its
+    object.
+    """
+    pols = PolygonArray.from_lists(layer.pols)
+    pnts = np.asarray(layer.pnts, dtype=np.float64).reshape(-1, 3)
+    angles, groups = smooth_angles(layer, tags, surfs)
+    faces = unit(face_normals(pnts, pols)).astype(np.float32)
+    return faces, corner_normals(pnts, pols, angles, groups)
@@ -19,29 +19,32 @@
 import os
 import re
 import logging
-from glob import glob
 from pprint import pprint
 from collections import OrderedDict
 
 from .lwoDetect import LWODetect
+from .lwoChunk import source_path, source_label
 from .lwoLogger import LWOLogger
 from .lwoExceptions import lwoNoImageFoundException
-
-class chd:
-    def __init__(self):
-        self.load_hidden = True
-        self.skel_to_arm = False
-        self.search_paths = []
-        self.recursive = True
-        self.images = {}
-        self.cancel_search = False
+from .lwoBase import chd
+from .lwoArray import values_equal
+from .lwoImageIndex import lwoImageIndex
 
 class lwoObject:
     
     def __init__(self, filename, loglevel=logging.INFO):
-        self.name, self.ext = os.path.splitext(os.path.basename(filename))
-        self.filename = os.path.abspath(filename)
-        self.dirpath = os.path.dirname(self.filename)
+        # Besides a path, filename can be bytes, a bytearray, a memoryview or
+        # a binary file object, the object is then read from that.
+        path = source_path(filename)
+        if path is not None:
+            self.name, self.ext = os.path.splitext(os.path.basename(path))
+            self.filename = os.path.abspath(path)
+            self.dirpath = os.path.dirname(self.filename)
+        else:
+            self.name, self.ext = "", ""
+            self.filename = source_label(filename)
+            self.dirpath = os.getcwd()
+        self.source = self.filename if isinstance(filename, (str, os.PathLike)) else filename
 
         self.allow_images_missing = False
         self.absfilepath = True
@@ -53,10 +56,12 @@ class lwoObject:
         
     @property
     def layers(self):
+        self.lwo.load("layers")
         return self.lwo.layers
         
     @property
     def surfs(self):
+        self.lwo.load("surfs")
         return self.lwo.surfs
         
     @property
@@ -65,10 +70,12 @@ class lwoObject:
         
     @property
     def tags(self):
+        self.lwo.load("tags")
         return self.lwo.tags
 
     @property
     def clips(self):
+        self.lwo.load("clips")
         return self.lwo.clips
 
     @property
@@ -77,6 +84,8 @@ class lwoObject:
         
         
     def __eq__(self, x):
+        if not isinstance(x, self.__class__):
+            return False
         __slots__ = (
             "layers",
             "surfs",
@@ -87,7 +96,7 @@ class lwoObject:
         for k in __slots__:
             a = getattr(self, k)
             b = getattr(x, k)
-            if not a == b:
+            if not values_equal(a, b):
                 #                 print(f"{k} mismatch:")
                 #                 print(f"\t{a} != {b}")
                 return False
@@ -97,11 +106,35 @@ class lwoObject:
         if not ch is None:
             self.ch = ch
 
-        self.lwo = LWODetect(self.filename, self.loglevel)
+        self.lwo = LWODetect(self.source, self.loglevel)
         self.lwo.ch = self.ch
-        self.lwo.read_lwo()
+        if self.ch.cache is not None:
+            if isinstance(self.source, str):
+                key = self.ch.cache.key(self.filename, self.ch)
+            else:
+                key = self.ch.cache.key_data(self.lwo.map, self.ch)
+            state = self.ch.cache.get(key)
+            if state is not None:
+                self.lwo.close()
+                self.lwo.set_state(state)
+            else:
+                self.lwo.read_lwo()
+                self.ch.cache.put(key, self.lwo.get_state())
+        elif self.ch.lazy:
+            self.lwo.open_lwo()
+        else:
+            self.lwo.read_lwo()
         
 
+    def iter_events(self, ch=None, drop_layers=True):
+        """Stream the file's chunks as events, see LWOBase.iter_events."""
+        if not ch is None:
+            self.ch = ch
+
+        self.lwo = LWODetect(self.source, self.loglevel)
+        self.lwo.ch = self.ch
+        return self.lwo.iter_events(drop_layers)
+
     @property
     def elements(self):
         layers = []
@@ -134,27 +167,27 @@ class lwoObject:
         return paths
     
     def resolve_clips(self):
-        files = []
-        for search_path in self.search_paths:
-            files.extend(glob(f"{search_path}/**/*.*", recursive=self.ch.recursive))
-        
+        index = self.ch.image_index
+        if index is None:
+            index = lwoImageIndex(path=self.ch.image_index_dir)
+        search_paths = self.search_paths
+
         for c_id in self.clips:
             clip = self.clips[c_id]
             # LW is windows tools, so windows path need to be replaced
             # under linux, and treated the sameunder windows
             imagefile = os.path.basename(clip.replace('\\', os.sep))
             ifile = None
-            for f in files:
-                if re.search(re.escape(imagefile), f, re.I):
-                    if self.absfilepath:
-                        ifile = os.path.abspath(f)
-                    else:
-                        ifile = os.path.relpath(f)
-
-                    if ifile not in self.images:
-                        self.images.append(ifile)
-                    continue
-            
+            # Every match is kept as an image, the last one is the clip's.
+            for f in index.find(search_paths, imagefile, self.ch.recursive):
+                if self.absfilepath:
+                    ifile = os.path.abspath(f)
+                else:
+                    ifile = os.path.relpath(f)
+
+                if ifile not in self.images:
+                    self.images.append(ifile)
+
             self.ch.images[c_id] = ifile
 
         for c_id in self.clips:
@@ -165,6 +198,7 @@ class lwoObject:
 
     def validate_lwo(self):
         self.l.info(f"Validating LWO: {self.filename}")
+        self.lwo.load("layers")
         self.l.info(f"{self.lwo.pnt_count} points")
         for surf_key in self.surfs:
             surf_data = self.surfs[surf_key]
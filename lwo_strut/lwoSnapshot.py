@@ -0,0 +1,404 @@
+"""
+A versioned binary snapshot of parsed elements, in place of pickle.
+
+    MAGIC | version (u32) | header size (u64) | JSON header | arrays
+
+The JSON header holds the small structured data (tags, surfaces, clips,
+layer names ...) and describes every array. Long lists of numbers, point
+and polygon lists and maps keyed by point or polygon id are stored as
+contiguous little endian arrays, each aligned to 8 bytes, so they can be
+memory mapped straight back in.
+"""
+
+import sys
+import json
+import mmap
+import struct
+from array import array
+from collections import OrderedDict
+
+from .lwoBase import _obj_layer, _obj_surf, _surf_texture, _surf_position
+from .lwoArray import (
+    HAVE_NUMPY,
+    np,
+    EdgeWeights,
+    PolygonArray,
+    PointRowArray,
+    SurfaceTags,
+    VMapArray,
+    VMadArray,
+)
+from .LWO1 import _surf_texture_5
+
+MAGIC = b"LWOS"
+VERSION = 2
+_PREAMBLE = struct.Struct("<4sLQ")
+_ALIGN = 8
+# Shorter lists are left in the header.
+_MIN_ARRAY = 8
+_TYPECODES = {"<i2": "h", "<i4": "i", "<i8": "q", "<f4": "f", "<f8": "d"}
+_CLASSES = {
+    c.__name__: c
+    for c in (_obj_layer, _obj_surf, _surf_texture, _surf_position, _surf_texture_5)
+}
+
+
+class lwoSnapshotException(Exception):
+    pass
+
+
+def _number_dtype(values):
+    """The array type a list of python numbers packs into, or None."""
+    if all(type(v) is int for v in values):
+        if not values:
+            return "<i4"
+        lo, hi = min(values), max(values)
+        if -(2 ** 31) <= lo and hi < 2 ** 31:
+            return "<i4"
+        if -(2 ** 63) <= lo and hi < 2 ** 63:
+            return "<i8"
+        return None
+    if all(type(v) is float for v in values):
+        try:
+            if array("f", values).tolist() == values:
+                return "<f4"
+        except OverflowError:
+            pass
+        return "<f8"
+    return None
+
+
+class _writer:
+    def __init__(self):
+        self.arrays = []
+        self.size = 0
+
+    def add(self, dtype, shape, data):
+        self.size += -self.size % _ALIGN
+        self.arrays.append((dtype, shape, self.size, data))
+        self.size += len(memoryview(data).cast("B"))
+        return len(self.arrays) - 1
+
+    def add_numbers(self, values, dtype, shape=None):
+        data = array(_TYPECODES[dtype], values)
+        if sys.byteorder == "big":
+            data.byteswap()
+        return self.add(dtype, shape or [len(values)], data)
+
+    def add_ndarray(self, a):
+        a = np.ascontiguousarray(a, dtype=a.dtype.newbyteorder("<"))
+        return self.add(a.dtype.str, list(a.shape), a)
+
+    def rows(self, values):
+        """Columns for a list of equal length number rows, or None."""
+        kind = type(values[0])
+        if kind not in (list, tuple) or not values[0]:
+            return None
+        n = len(values[0])
+        if any(type(v) is not kind or len(v) != n for v in values):
+            return None
+        cols = [list(c) for c in zip(*values)]
+        dtypes = [_number_dtype(c) for c in cols]
+        if None in dtypes:
+            return None
+        node = {"R": None, "s": kind.__name__}
+        if len(set(dtypes)) == 1:
+            flat = [v for row in values for v in row]
+            node["R"] = self.add_numbers(flat, dtypes[0], [len(values), n])
+        else:
+            node["R"] = [self.add_numbers(c, d) for c, d in zip(cols, dtypes)]
+        return node
+
+    def csr(self, values):
+        """Offsets and values for a list of variable length index lists."""
+        if any(type(v) is not list for v in values):
+            return None
+        flat = [i for v in values for i in v]
+        dtype = _number_dtype(flat)
+        if dtype is None or dtype[1] != "i":
+            return None
+        offsets = [0]
+        for v in values:
+            offsets.append(offsets[-1] + len(v))
+        return {"C": [self.add_numbers(flat, dtype), self.add_numbers(offsets, "<i8")]}
+
+    def id_map(self, value):
+        """Columns for a dict keyed by point or polygon id."""
+        keys = list(value)
+        if any(type(k) is not int for k in keys) or _number_dtype(keys) is None:
+            return None
+        vals = list(value.values())
+        if all(type(v) is dict for v in vals):
+            # VMADs, polygon id -> point id -> value
+            inner = [k for v in vals for k in v]
+            flat = [x for v in vals for x in v.values()]
+            node = {"DD": None}
+        elif all(type(v) is list for v in vals) and all(
+            type(x) is list for v in vals for x in v
+        ):
+            # Split normals, polygon id -> list of rows
+            inner = None
+            flat = [x for v in vals for x in v]
+            node = {"DL": None}
+        else:
+            node = self.rows(vals)
+            if node is None:
+                return None
+            return {"D": self.add_numbers(keys, _number_dtype(keys)), "v": node}
+
+        if inner is not None and _number_dtype(inner) is None:
+            return None
+        rows = self.rows(flat) if flat else None
+        if rows is None:
+            return None
+        offsets = [0]
+        for v in vals:
+            offsets.append(offsets[-1] + len(v))
+        ids = [
+            self.add_numbers(keys, _number_dtype(keys)),
+            self.add_numbers(offsets, "<i8"),
+        ]
+        if inner is not None:
+            ids.append(self.add_numbers(inner, _number_dtype(inner)))
+        node[next(iter(node))] = ids
+        node["v"] = rows
+        return node
+
+    def encode(self, value):
+        t = type(value)
+        if value is None or t in (bool, int, float, str):
+            return value
+        if HAVE_NUMPY and isinstance(value, np.ndarray):
+            return {"N": self.add_ndarray(value)}
+        if t is PolygonArray:
+            return {"P": [self.add_ndarray(value.indices), self.add_ndarray(value.offsets)]}
+        if t is PointRowArray:
+            return {"PR": [self.add_ndarray(value.ids), self.add_ndarray(value.values)]}
+        if t is VMapArray:
+            return {"VM": [self.add_ndarray(value.ids), self.add_ndarray(value.data)]}
+        if t is VMadArray:
+            arrays = (value.pol_ids, value.pnt_ids, value.data)
+            return {"VA": [self.add_ndarray(a) for a in arrays]}
+        if t is SurfaceTags:
+            arrays = (value.pol_ids, value.tags)
+            return {"SR": [self.add_ndarray(a) for a in arrays], "c": value.count}
+        if t is EdgeWeights:
+            return {"EW": [self.add_ndarray(value.keys64), self.add_ndarray(value.weights)]}
+        if t.__name__ in _CLASSES:
+            slots = {}
+            for k in t.__slots__:
+                if hasattr(value, k):
+                    slots[k] = self.encode(getattr(value, k))
+            extra = {k: self.encode(v) for k, v in getattr(value, "__dict__", {}).items()}
+            return {"O": t.__name__, "v": slots, "x": extra}
+        if t is tuple:
+            return {"T": [self.encode(v) for v in value]}
+        if t is list:
+            if len(value) >= _MIN_ARRAY:
+                dtype = _number_dtype(value)
+                if dtype is not None:
+                    return {"L": self.add_numbers(value, dtype)}
+                node = self.rows(value) or self.csr(value)
+                if node is not None:
+                    return node
+            return [self.encode(v) for v in value]
+        if t in (dict, OrderedDict):
+            if len(value) >= _MIN_ARRAY:
+                node = self.id_map(value)
+                if node is not None:
+                    return node
+            items = [[self.encode(k), self.encode(v)] for k, v in value.items()]
+            return {"d": items, "o": t is OrderedDict}
+        raise lwoSnapshotException(f"Can't snapshot {t.__name__}: {value!r}")
+
+
+class _reader:
+    def __init__(self, arrays, buf, lazy):
+        self.arrays = arrays
+        self.buf = buf
+        self.lazy = lazy and HAVE_NUMPY
+
+    def ndarray(self, i):
+        dtype, shape, offset = self.arrays[i]
+        a = np.frombuffer(self.buf, dtype=dtype, count=self.count(i), offset=offset)
+        a = a.reshape(shape)
+        return a if self.lazy else a.copy()
+
+    def values(self, i):
+        """An array as a (nested) python list."""
+        dtype, shape, offset = self.arrays[i]
+        if HAVE_NUMPY:
+            a = np.frombuffer(self.buf, dtype=dtype, count=self.count(i), offset=offset)
+            return a.reshape(shape).tolist()
+
+        values = array(_TYPECODES[dtype])
+        values.frombytes(self.buf[offset : offset + self.count(i) * values.itemsize])
+        if sys.byteorder == "big":
+            values.byteswap()
+        values = values.tolist()
+        if len(shape) == 2:
+            n = shape[1]
+            values = [values[j : j + n] for j in range(0, len(values), n)]
+        return values
+
+    def count(self, i):
+        count = 1
+        for n in self.arrays[i][1]:
+            count *= n
+        return count
+
+    def rows(self, node, lazy):
+        if isinstance(node["R"], int):
+            if lazy and self.lazy:
+                return self.ndarray(node["R"])
+            rows = self.values(node["R"])
+        else:
+            rows = [list(r) for r in zip(*[self.values(i) for i in node["R"]])]
+        if node["s"] == "tuple":
+            rows = [tuple(r) for r in rows]
+        return rows
+
+    def decode(self, node, lazy=True):
+        if type(node) is list:
+            return [self.decode(v, lazy) for v in node]
+        if type(node) is not dict:
+            return node
+        if "N" in node:
+            if not HAVE_NUMPY:
+                return self.values(node["N"])
+            return self.ndarray(node["N"])
+        if "P" in node:
+            node = {"C": node["P"]}
+            if HAVE_NUMPY:
+                return PolygonArray(*(self.ndarray(i) for i in node["C"]))
+        if "PR" in node:
+            ids, values = node["PR"]
+            if HAVE_NUMPY:
+                return PointRowArray(self.ndarray(ids), self.ndarray(values))
+            return [
+                [i] + v if type(v) is list else [i, v]
+                for i, v in zip(self.values(ids), self.values(values))
+            ]
+        if "VM" in node:
+            ids, data = node["VM"]
+            if HAVE_NUMPY:
+                return VMapArray(self.ndarray(ids), self.ndarray(data))
+            return dict(zip(self.values(ids), map(tuple, self.values(data))))
+        if "VA" in node:
+            if HAVE_NUMPY:
+                return VMadArray(*(self.ndarray(i) for i in node["VA"]))
+            d = {}
+            for pol, pnt, v in zip(*(self.values(i) for i in node["VA"])):
+                d.setdefault(pol, {})[pnt] = tuple(v)
+            return d
+        if "SR" in node:
+            if HAVE_NUMPY:
+                return SurfaceTags(*(self.ndarray(i) for i in node["SR"]), node["c"])
+            d = {}
+            for pol_id, tag in zip(*(self.values(i) for i in node["SR"])):
+                d.setdefault(tag, []).append(pol_id)
+            return d
+        if "ST" in node:
+            # Version 1, a tag index per face.
+            if HAVE_NUMPY:
+                index = self.ndarray(node["ST"])
+                pol_ids = np.flatnonzero(index >= 0).astype(np.int32)
+                return SurfaceTags(pol_ids, index[pol_ids].astype(np.int32), len(index))
+            d = {}
+            for pol_id, tag in enumerate(self.values(node["ST"])):
+                if tag >= 0:
+                    d.setdefault(tag, []).append(pol_id)
+            return dict(sorted(d.items()))
+        if "EW" in node:
+            keys64, weights = node["EW"]
+            if HAVE_NUMPY:
+                return EdgeWeights(self.ndarray(keys64), self.ndarray(weights))
+            return {
+                f"{k >> 32} {k & 0xFFFFFFFF}": w
+                for k, w in zip(self.values(keys64), self.values(weights))
+            }
+        if "O" in node:
+            cls = _CLASSES[node["O"]]
+            value = cls.__new__(cls)
+            for k, v in node["v"].items():
+                setattr(value, k, self.decode(v, lazy))
+            for k, v in node["x"].items():
+                setattr(value, k, self.decode(v, lazy))
+            return value
+        if "T" in node:
+            return tuple(self.decode(v, lazy) for v in node["T"])
+        if "L" in node:
+            if lazy and self.lazy:
+                return self.ndarray(node["L"])
+            return self.values(node["L"])
+        if "R" in node:
+            return self.rows(node, lazy)
+        if "C" in node:
+            if lazy and self.lazy:
+                return PolygonArray(*(self.ndarray(i) for i in node["C"]))
+            flat, offsets = (self.values(i) for i in node["C"])
+            return [flat[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+        if "D" in node:
+            return dict(zip(self.values(node["D"]), self.rows(node["v"], False)))
+        if "DD" in node or "DL" in node:
+            ids = node.get("DD") or node.get("DL")
+            keys, offsets = self.values(ids[0]), self.values(ids[1])
+            rows = self.rows(node["v"], False)
+            if "DD" in node:
+                inner = self.values(ids[2])
+                return {
+                    k: dict(zip(inner[a:b], rows[a:b]))
+                    for k, a, b in zip(keys, offsets[:-1], offsets[1:])
+                }
+            return {k: rows[a:b] for k, a, b in zip(keys, offsets[:-1], offsets[1:])}
+        if "d" in node:
+            items = [(self.decode(k, lazy), self.decode(v, lazy)) for k, v in node["d"]]
+            return OrderedDict(items) if node["o"] else dict(items)
+        raise lwoSnapshotException(f"Unknown snapshot node: {list(node)}")
+
+
+def save_snapshot(x, filename):
+    """Write the elements of a parsed lwoObject (or the elements) to filename."""
+    elements = x if isinstance(x, dict) else x.elements
+    w = _writer()
+    tree = w.encode(elements)
+    header = json.dumps(
+        {"tree": tree, "arrays": [[d, s, o] for d, s, o, _ in w.arrays]},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    header += b" " * (-(_PREAMBLE.size + len(header)) % _ALIGN)
+
+    with open(filename, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        pos = 0
+        for dtype, shape, offset, data in w.arrays:
+            f.write(b"\0" * (offset - pos))
+            f.write(data)
+            pos = offset + len(memoryview(data).cast("B"))
+
+
+def load_snapshot(filename, mmap_arrays=False):
+    """
+    Read a snapshot back into elements. With mmap_arrays (and numpy) the
+    points, polygons and other long lists stay arrays over a read only
+    mapping of the file instead of being copied into lists.
+    """
+    with open(filename, "rb") as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise lwoSnapshotException(f"Not an LWO snapshot: {filename}")
+        if version > VERSION:
+            raise lwoSnapshotException(
+                f"Snapshot version {version} is newer than {VERSION}: {filename}"
+            )
+        header = json.loads(f.read(header_len).decode("utf-8"))
+        start = _PREAMBLE.size + header_len
+        if mmap_arrays and HAVE_NUMPY:
+            buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            buf = f.read()
+            start = 0
+
+    arrays = [(d, s, start + o) for d, s, o in header["arrays"]]
+    return _reader(arrays, buf, mmap_arrays).decode(header["tree"])
@@ -0,0 +1,201 @@
+"""
+Triangulate a layer's polygons in bulk.
+
+Convex faces are fanned from their first corner, all at once with numpy.
+Faces with a reflex corner are found for the whole layer in one pass, the
+concave quads are split at their reflex corner in bulk and larger faces
+are ear clipped one at a time. Points and two point lines give no triangles.
+"""
+from .lwoArray import np, PolygonArray, corner_faces
+
+# A corner turning the wrong way by less than this, relative to its edges,
+# is taken as straight rather than reflex.
+_REFLEX_EPS = 1e-9
+
+
+def _corner_neighbours(pols):
+    """The face, previous and next corner of every corner."""
+    faces = corner_faces(pols)
+    first = pols.offsets[:-1][faces]
+    last = pols.offsets[1:][faces] - 1
+    corners = np.arange(len(pols.indices), dtype=np.int64)
+    prev_corner = np.where(corners == first, last, corners - 1)
+    next_corner = np.where(corners == last, first, corners + 1)
+    return faces, prev_corner, next_corner
+
+
+def _corner_points(pnts, pols):
+    """
+    The point of every corner, with the points of the corners before and
+    after it in its face. These are (F, n, 3) arrays when every face has n
+    corners, with faces None, otherwise (corners, 3) arrays with the face
+    of each corner.
+    """
+    counts = pols.counts
+    if len(counts) and counts.min() == counts.max():
+        p = pnts[pols.indices.reshape(len(counts), -1)]
+        return None, np.roll(p, 1, axis=1), p, np.roll(p, -1, axis=1)
+    faces, prev_corner, next_corner = _corner_neighbours(pols)
+    p = pnts[pols.indices]
+    return faces, p[prev_corner], p, p[next_corner]
+
+
+def _per_face(faces, values, count):
+    """Sum per corner values, (F, n, ...) or with their faces, per face."""
+    if faces is None:
+        return values.sum(axis=1)
+    if values.ndim == 1:
+        return np.bincount(faces, weights=values, minlength=count)
+    sums = np.empty((count,) + values.shape[1:], dtype=np.float64)
+    for axis in range(values.shape[1]):
+        sums[:, axis] = np.bincount(faces, weights=values[:, axis], minlength=count)
+    return sums
+
+
+def _normals(corner_points, count):
+    faces, p_prev, p, p_next = corner_points
+    return _per_face(faces, np.cross(p, p_next), count)
+
+
+def _reflex(corner_points, normals):
+    """A bool per corner, True where it turns against the face normal."""
+    faces, p_prev, p, p_next = corner_points
+    n = normals[:, None, :] if faces is None else normals[faces]
+    e1 = p - p_prev
+    e2 = p_next - p
+    turn = np.einsum("...j,...j->...", np.cross(e1, e2), n)
+    # Squared, turn < -eps * |e1| * |e2| * |n| for negative turns.
+    scale = (
+        np.einsum("...j,...j->...", e1, e1)
+        * np.einsum("...j,...j->...", e2, e2)
+        * np.einsum("...j,...j->...", n, n)
+    )
+    return (turn < 0) & (turn * turn > _REFLEX_EPS * _REFLEX_EPS * scale)
+
+
+def face_normals(pnts, pols):
+    """
+    The (F, 3) Newell normals of a PolygonArray's faces, not normalized,
+    their length is twice the face area.
+    """
+    pnts = np.asarray(pnts, dtype=np.float64)
+    return _normals(_corner_points(pnts, pols), len(pols))
+
+
+def concave_faces(pnts, pols):
+    """A bool per face of a PolygonArray, True where a face has a reflex corner."""
+    pnts = np.asarray(pnts, dtype=np.float64)
+    corner_points = _corner_points(pnts, pols)
+    reflex = _reflex(corner_points, _normals(corner_points, len(pols)))
+    return _per_face(corner_points[0], reflex, len(pols)) > 0
+
+
+def _inside(p, a, b, c):
+    """Whether 2D point p is in or on the counter clockwise triangle abc."""
+    return (
+        (b[0] - a[0]) * (p[1] - a[1]) - (b[1] - a[1]) * (p[0] - a[0]) >= 0
+        and (c[0] - b[0]) * (p[1] - b[1]) - (c[1] - b[1]) * (p[0] - b[0]) >= 0
+        and (a[0] - c[0]) * (p[1] - c[1]) - (a[1] - c[1]) * (p[0] - c[0]) >= 0
+    )
+
+
+def ear_clip(xy):
+    """
+    Triangles, as triples of indices into xy, of a simple counter clockwise
+    2D polygon. A face with no ear left, self intersecting or degenerate,
+    has the rest of it fanned.
+    """
+    idx = list(range(len(xy)))
+    tris = []
+    while len(idx) > 3:
+        m = len(idx)
+        for i in range(m):
+            a, b, c = idx[i - 1], idx[i], idx[(i + 1) % m]
+            pa, pb, pc = xy[a], xy[b], xy[c]
+            if (pb[0] - pa[0]) * (pc[1] - pa[1]) - (pb[1] - pa[1]) * (pc[0] - pa[0]) <= 0:
+                continue  # reflex or straight
+            if any(_inside(xy[j], pa, pb, pc) for j in idx if j not in (a, b, c)):
+                continue
+            tris.append((a, b, c))
+            del idx[i]
+            break
+        else:
+            break
+    tris.extend((idx[0], idx[k], idx[k + 1]) for k in range(1, len(idx) - 1))
+    return tris
+
+
+def _project(p, normal):
+    """2D coordinates of points p on the plane of normal, counter clockwise."""
+    axis = int(np.argmax(np.abs(normal)))
+    u, v = (axis + 1) % 3, (axis + 2) % 3
+    if normal[axis] < 0:
+        u, v = v, u
+    return p[:, [u, v]].tolist()
+
+
+def triangulate(pnts, pols):
+    """
+    Triangulate polygons, a PolygonArray or list of point index lists, over
+    the (N, 3) points.
+
+    Returns three arrays: the flat uint32 point indices, three per
+    triangle; the uint32 source face of each triangle; and the uint32
+    corner each triangle point was taken from, an index into
+    PolygonArray.from_lists(pols).indices. Per face data such as
+    surf_tags.index is then data[faces], and per corner data such as
+    corner_uvs is data[corners]. Triangles keep their face's winding and
+    come in face order.
+    """
+    pnts = np.asarray(pnts, dtype=np.float64).reshape(-1, 3)
+    pols = PolygonArray.from_lists(pols)
+    counts = pols.counts
+    first = pols.offsets[:-1]
+    concave = np.zeros(len(pols), dtype=bool)
+    corners = []
+    faces = []
+
+    if len(counts) and counts.max() >= 4:
+        corner_points = _corner_points(pnts, pols)
+        normals = _normals(corner_points, len(pols))
+        reflex = _reflex(corner_points, normals)
+        concave = (_per_face(corner_points[0], reflex, len(pols)) > 0) & (counts >= 4)
+
+        # A concave quad is split along the diagonal from its reflex corner.
+        quads = np.flatnonzero(concave & (counts == 4))
+        if len(quads):
+            quad_corners = first[quads, None] + np.arange(4)
+            r = np.argmax(reflex.reshape(-1)[quad_corners], axis=1)
+            split = (r[:, None, None] + np.array([[0, 1, 2], [0, 2, 3]])) % 4
+            corners.append((first[quads, None, None] + split).reshape(-1, 3))
+            faces.append(np.repeat(quads, 2))
+
+    # Fan the convex faces: corners (0, k, k + 1) for k = 1 .. n - 2.
+    fan = np.flatnonzero((counts >= 3) & ~concave)
+    ntris = counts[fan] - 2
+    tri_faces = np.repeat(fan, ntris)
+    k = np.arange(len(tri_faces)) - np.repeat(np.cumsum(ntris) - ntris, ntris) + 1
+    start = first[tri_faces]
+    corners.append(np.stack((start, start + k, start + k + 1), axis=1))
+    faces.append(tri_faces)
+
+    for face in np.flatnonzero(concave & (counts > 4)).tolist():
+        start, end = int(first[face]), int(pols.offsets[face + 1])
+        xy = _project(pnts[pols.indices[start:end]], normals[face])
+        tris = np.array(ear_clip(xy), dtype=np.int64).reshape(-1, 3)
+        corners.append(tris + start)
+        faces.append(np.full(len(tris), face, dtype=np.int64))
+
+    corners = np.concatenate(corners)
+    faces = np.concatenate(faces)
+    if len(fan) < len(pols):
+        order = np.argsort(faces, kind="stable")
+        corners, faces = corners[order], faces[order]
+    corners = corners.reshape(-1).astype(np.uint32)
+    indices = pols.indices[corners].astype(np.uint32)
+    return indices, faces.astype(np.uint32), corners
+
+
+def triangulate_layer(layer):
+    """triangulate() for a layer's points and polygons."""
+    return triangulate(layer.pnts, layer.pols)
@@ -0,0 +1,161 @@
+"""
+Interleaved float32 vertex buffers for a layer, one vertex per distinct
+combination of corner attributes, ready to upload.
+
+Every attribute is first resolved per polygon corner, a VMAD value taking
+precedence over the VMAP one of its point, then the rows are packed side
+by side and the duplicates merged by hashing the packed rows in bulk.
+"""
+from .lwoArray import np, PolygonArray, resolve_corners
+from .lwoNormals import DEFAULT_SMOOTH_ANGLE, corner_normals, smooth_angles
+from .lwoTriangulate import triangulate
+
+# Components of each attribute.
+SIZES = {"position": 3, "normal": 3, "uv": 2, "color": 3}
+
+_FNV_OFFSET = np.uint64(14695981039346656037) if np is not None else None
+_FNV_PRIME = np.uint64(1099511628211) if np is not None else None
+
+
+def _map_name(maps, name):
+    """The named map, the first one when name is None."""
+    if name is None:
+        return next(iter(maps), None)
+    return name
+
+
+def _uvs(layer, name):
+    name = _map_name(list(layer.uvmaps_vmap) + list(layer.uvmaps_vmad), name)
+    point_map = layer.uvmaps_vmap.get(name, {}).get("PointMap")
+    face_map = layer.uvmaps_vmad.get(name, {}).get("FaceMap")
+    return point_map, face_map, 0.0
+
+
+def _colors(layer, name):
+    name = _map_name(layer.colmaps, name)
+    colmap = layer.colmaps.get(name, {})
+    return colmap.get("PointMap"), colmap.get("FaceMap"), 1.0
+
+
+def _normals(layer, pols, tags, surfs):
+    """
+    The NORM VMAD normals, then the NORM VMAP ones, and computed smoothing
+    angle normals for the corners that have neither.
+    """
+    face_map = {
+        pol_id: {row[0]: row[1:] for row in rows} for pol_id, rows in layer.lnorms.items()
+    }
+    normals = resolve_corners(pols, layer.vnorms, face_map, 3, np.nan)
+    missing = np.isnan(normals[:, 0])
+    if missing.any():
+        if tags is not None and surfs is not None:
+            angles, groups = smooth_angles(layer, tags, surfs)
+        else:
+            angles, groups = np.full(len(pols), DEFAULT_SMOOTH_ANGLE), None
+        computed = corner_normals(layer.pnts, pols, angles, groups)
+        normals[missing] = computed[missing]
+    return normals
+
+
+def corner_attributes(layer, attributes, tags=None, surfs=None):
+    """
+    The per corner rows of each attribute, aligned with
+    PolygonArray.from_lists(layer.pols).indices, as a list of float32
+    arrays.
+
+    Attributes are "position", "normal", "uv" and "color", the last two
+    optionally naming their map as in "uv:UVMap", the first map otherwise.
+    Normals are computed from the surfaces' smoothing angles, given tags
+    and surfs, where the layer has no NORM maps.
+    """
+    return _columns(layer, PolygonArray.from_lists(layer.pols), attributes, tags, surfs)
+
+
+def _columns(layer, pols, attributes, tags, surfs):
+    columns = []
+    for attribute in attributes:
+        kind, _, name = attribute.partition(":")
+        name = name or None
+        if kind == "position":
+            pnts = np.asarray(layer.pnts, dtype=np.float32).reshape(-1, 3)
+            columns.append(pnts[pols.indices])
+        elif kind == "normal":
+            columns.append(_normals(layer, pols, tags, surfs))
+        elif kind in ("uv", "color"):
+            point_map, face_map, fill = (_uvs if kind == "uv" else _colors)(layer, name)
+            columns.append(resolve_corners(pols, point_map, face_map, SIZES[kind], fill))
+        else:
+            raise ValueError(f"Unknown vertex attribute: {attribute}")
+    return columns
+
+
+def _row_hashes(rows):
+    """A 64 bit FNV-1a hash of each row's packed 32 bit words."""
+    words = rows.view(np.uint32)
+    hashes = np.full(len(rows), _FNV_OFFSET, dtype=np.uint64)
+    for col in range(words.shape[1]):
+        hashes ^= words[:, col]
+        hashes *= _FNV_PRIME
+    return hashes
+
+
+def unique_rows(rows):
+    """
+    The distinct rows of a 2D float32 array in order of first use, and the
+    index into them of every row.
+    """
+    if not len(rows):
+        return rows, np.zeros(0, dtype=np.uint32)
+    # -0.0 and 0.0 are the same vertex.
+    rows = np.ascontiguousarray(rows + np.float32(0.0))
+    hashes = _row_hashes(rows)
+    order = np.argsort(hashes, kind="stable")
+    hashes = hashes[order]
+    new_run = np.empty(len(rows), dtype=bool)
+    new_run[0] = True
+    np.not_equal(hashes[1:], hashes[:-1], out=new_run[1:])
+    run = np.cumsum(new_run) - 1
+    # The stable sort puts the first use of a row at the start of its run.
+    firsts = order[new_run]
+
+    if not (rows[order] == rows[firsts[run]]).all():
+        # A hash collision, fall back to comparing the packed rows.
+        packed = rows.view(np.dtype((np.void, rows.itemsize * rows.shape[1]))).ravel()
+        _, firsts, inverse = np.unique(packed, return_index=True, return_inverse=True)
+        rank = np.argsort(np.argsort(firsts))
+        return rows[np.sort(firsts)], rank[inverse.reshape(-1)].astype(np.uint32)
+
+    rank = np.empty(len(firsts), dtype=np.int64)
+    rank[np.argsort(firsts)] = np.arange(len(firsts))
+    inverse = np.empty(len(rows), dtype=np.uint32)
+    inverse[order] = rank[run]
+    return rows[np.sort(firsts)], inverse
+
+
+def build_vertex_buffer(layer, attributes=("position",), tags=None, surfs=None, triangles=True):
+    """
+    An interleaved vertex buffer for a layer.
+
+    Returns the (V, stride) float32 vertices, holding the attributes in
+    the order given, and the uint32 indices: three per triangle, of
+    triangulate(), or one per polygon corner without triangles.
+    """
+    pols = PolygonArray.from_lists(layer.pols)
+    columns = _columns(layer, pols, attributes, tags, surfs)
+    rows = np.concatenate([np.asarray(c, dtype=np.float32) for c in columns], axis=1)
+    vertices, corner_vertex = unique_rows(rows)
+    if not triangles:
+        return vertices, corner_vertex
+    corners = triangulate(layer.pnts, pols)[2]
+    return vertices, corner_vertex[corners]
+
+
+def layout(attributes):
+    """(attribute, first float, count) of each attribute in a vertex."""
+    offset = 0
+    result = []
+    for attribute in attributes:
+        size = SIZES[attribute.partition(":")[0]]
+        result.append((attribute, offset, size))
+        offset += size
+    return result
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+Time the LWO readers, per chunk type, on synthetic or given files.
+
+    python -m scripts.lwo_bench --points 200000 --polygons 200000 --uvmaps 2
+    python -m scripts.lwo_bench tests/basic/src/LWO2/box/box6-hidden.lwo
+"""
+import gc
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+from lwo_strut.lwoBase import chd
+from lwo_strut.lwoArray import HAVE_NUMPY
+from lwo_strut.lwoDetect import LWODetect
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_synth import make_lwo2, make_lwob
+
+
+def chunk_label(rootchunk, lwo2=True):
+    label = rootchunk.chunkname.decode("ascii", "replace")
+    if lwo2 and rootchunk.chunkname in (b"VMAP", b"VMAD", b"POLS", b"PTAG"):
+        label += " " + bytes(rootchunk.data[0:4]).decode("ascii", "replace")
+    return label
+
+
+def time_chunks(filename, ch):
+    """
+    Parse a file one chunk at a time. Returns the reader and, per chunk
+    label, [seconds, count, bytes].
+    """
+    lwo = LWODetect(filename, logging.WARNING)
+    lwo.ch = ch
+    stats = OrderedDict()
+    lwo.open_lwo()
+    # Like timeit, keep collector pauses out of the per chunk times.
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for lwo.rootchunk in lwo.chunks:
+            label = chunk_label(lwo.rootchunk, lwo.file_type == b"LWO2")
+            size = len(lwo.rootchunk.data)
+            start = time.perf_counter()
+            lwo.parse_tags()
+            s = stats.setdefault(label, [0.0, 0, 0])
+            s[0] += time.perf_counter() - start
+            s[1] += 1
+            s[2] += size
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+        lwo.close()
+    return lwo, stats
+
+
+def _read(filename, ch):
+    x = lwoObject(filename, logging.WARNING)
+    x.read(ch)
+
+
+def _traced_peak(filename, ch):
+    tracemalloc.start()
+    try:
+        _read(filename, ch)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _rss_peak(filename, ch):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    _read(filename, ch)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return (after - before) * (1 if sys.platform == "darwin" else 1024)
+
+
+def peak_memory(filename, ch, traced=False):
+    """
+    Peak memory of a read, measured in a fresh process from the growth of
+    its max RSS. tracemalloc is exact for python allocations but slows the
+    readers down many times over, so it is only used when asked for.
+    """
+    if traced or resource is None:
+        return _traced_peak(filename, ch)
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(_rss_peak, filename, ch).result()
+
+
+def bench(filename, ch, repeat=3, traced=False):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lwo, stats = time_chunks(filename, ch)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best[0]:
+            best = (seconds, lwo, stats)
+
+    seconds, lwo, stats = best
+    result = OrderedDict()
+    result["seconds"] = seconds
+    result["bytes"] = os.path.getsize(filename)
+    result["pnts"] = sum(len(layer.pnts) for layer in lwo.layers)
+    result["pols"] = sum(len(layer.pols) for layer in lwo.layers)
+    result["peak"] = peak_memory(filename, ch, traced)
+    result["chunks"] = stats
+    return result
+
+
+def rate(n, seconds):
+    return n / seconds if seconds > 0 else float("inf")
+
+
+def report(name, mode, r, out=sys.stdout):
+    print(f"{name} [{mode}]", file=out)
+    print(
+        f"  total {r['seconds'] * 1000:9.2f} ms"
+        f"  {rate(r['bytes'] / 1e6, r['seconds']):8.2f} MB/s"
+        f"  {rate(r['pnts'], r['seconds']):12.0f} points/s"
+        f"  {rate(r['pols'], r['seconds']):12.0f} faces/s"
+        f"  peak {r['peak'] / 1e6:8.2f} MB",
+        file=out,
+    )
+    for label, (seconds, count, size) in r["chunks"].items():
+        print(
+            f"    {label:<10} x{count:<4} {size / 1e6:9.3f} MB"
+            f" {seconds * 1000:9.2f} ms {rate(size / 1e6, seconds):9.2f} MB/s",
+            file=out,
+        )
+
+
+def modes():
+    ch = chd()
+    yield "lists", ch
+    if HAVE_NUMPY:
+        ch = chd()
+        ch.use_numpy = True
+        yield "numpy", ch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("files", nargs="*", help="files to time, synthetic ones by default")
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--polygons", type=int, default=100000)
+    parser.add_argument("--uvmaps", type=int, default=1)
+    parser.add_argument("--vmads", type=int, default=1)
+    parser.add_argument("--weights", type=int, default=1)
+    parser.add_argument("--morphs", type=int, default=1)
+    parser.add_argument("--surfaces", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--tracemalloc", action="store_true", help="measure peak memory with tracemalloc"
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = list(args.files)
+        if not files:
+            synthetic = {
+                "synthetic.lwo": make_lwo2(
+                    args.points,
+                    args.polygons,
+                    args.uvmaps,
+                    args.vmads,
+                    args.weights,
+                    args.morphs,
+                    args.surfaces,
+                    sides=(3, 4, 4, 5),
+                ),
+                "synthetic-lwob.lwo": make_lwob(
+                    args.points, args.polygons, args.surfaces
+                ),
+            }
+            for name, data in synthetic.items():
+                files.append(os.path.join(tmpdir, name))
+                with open(files[-1], "wb") as f:
+                    f.write(data)
+
+        for filename in files:
+            for mode, ch in modes():
+                r = bench(filename, ch, args.repeat, args.tracemalloc)
+                report(os.path.basename(filename), mode, r)
+
+
+if __name__ == "__main__":
+    main()
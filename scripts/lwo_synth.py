@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Write synthetic LWO2 and LWOB files of any size, for tests and benchmarks.
+"""
+import struct
+import random
+import argparse
+
+
+def lwostring(s):
+    b = s.encode("utf-8") + b"\0"
+    if len(b) % 2:
+        b += b"\0"
+    return b
+
+
+def vx(index):
+    """A variable-length index, 4 bytes once past 0xFF00."""
+    if index < 0xFF00:
+        return struct.pack(">H", index)
+    return struct.pack(">L", index | 0xFF000000)
+
+
+def chunk(name, data):
+    b = name + struct.pack(">L", len(data)) + bytes(data)
+    if len(data) % 2:
+        b += b"\0"
+    return b
+
+
+def form(file_type, chunks):
+    data = file_type + b"".join(chunks)
+    return b"FORM" + struct.pack(">L", len(data)) + data
+
+
+def geometry(points, polygons, sides, seed):
+    rnd = random.Random(seed)
+    pnts = [(rnd.uniform(-1, 1), rnd.uniform(-1, 1), rnd.uniform(-1, 1)) for _ in range(points)]
+    pols = []
+    for i in range(polygons):
+        n = sides[i % len(sides)]
+        pols.append([rnd.randrange(points) for _ in range(n)])
+    if pols:
+        # Make sure the highest index, maybe a 4 byte VX, is used.
+        pols[-1][0] = points - 1
+    return pnts, pols
+
+
+def make_lwo2(
+    points=1000,
+    polygons=1000,
+    uvmaps=0,
+    vmads=0,
+    weights=0,
+    morphs=0,
+    surfaces=1,
+    sides=(4,),
+    seed=0,
+    clips=(),
+    edge_weights=False,
+):
+    """
+    An LWO2 file with one layer: points, polygons assigned round robin to
+    the surfaces, K UV maps covering every point, VMAD UVs on every other
+    polygon, weight and relative morph maps, and a still CLIP per path in
+    clips. With edge_weights, every third polygon gets subdivision edge
+    weights.
+    """
+    pnts, pols = geometry(points, polygons, sides, seed)
+    rnd = random.Random(seed + 1)
+    names = [f"Surface {i}" for i in range(surfaces)]
+
+    chunks = [chunk(b"TAGS", b"".join(lwostring(n) for n in names))]
+    layr = struct.pack(">HHfff", 0, 0, 0.0, 0.0, 0.0) + lwostring("Layer 1")
+    chunks.append(chunk(b"LAYR", layr))
+    chunks.append(chunk(b"PNTS", b"".join(struct.pack(">fff", *p) for p in pnts)))
+    chunks.append(chunk(b"BBOX", struct.pack(">6f", -1, -1, -1, 1, 1, 1)))
+
+    data = bytearray(b"FACE")
+    for pol in pols:
+        data += struct.pack(">H", len(pol)) + b"".join(vx(i) for i in pol)
+    chunks.append(chunk(b"POLS", data))
+
+    data = b"SURF" + b"".join(vx(i) + struct.pack(">H", i % surfaces) for i in range(polygons))
+    chunks.append(chunk(b"PTAG", data))
+
+    for k in range(uvmaps):
+        data = bytearray(b"TXUV" + struct.pack(">H", 2) + lwostring(f"UV {k}"))
+        for i in range(points):
+            data += vx(i) + struct.pack(">ff", rnd.random(), rnd.random())
+        chunks.append(chunk(b"VMAP", data))
+
+    for k in range(weights):
+        data = bytearray(b"WGHT" + struct.pack(">H", 1) + lwostring(f"Weight {k}"))
+        for i in range(points):
+            data += vx(i) + struct.pack(">f", rnd.random())
+        chunks.append(chunk(b"VMAP", data))
+
+    for k in range(morphs):
+        data = bytearray(b"MORF" + struct.pack(">H", 3) + lwostring(f"Morph {k}"))
+        for i in range(0, points, 2):
+            data += vx(i) + struct.pack(">fff", rnd.random(), rnd.random(), rnd.random())
+        chunks.append(chunk(b"VMAP", data))
+
+    for k in range(vmads):
+        data = bytearray(b"TXUV" + struct.pack(">H", 2) + lwostring(f"UV {k}"))
+        for pol_id in range(0, polygons, 2):
+            for pnt_id in pols[pol_id]:
+                data += vx(pnt_id) + vx(pol_id) + struct.pack(">ff", rnd.random(), rnd.random())
+        chunks.append(chunk(b"VMAD", data))
+
+    if edge_weights:
+        data = bytearray(b"WGHT" + struct.pack(">H", 1) + lwostring("Edge Weight"))
+        for pol_id in range(0, polygons, 3):
+            for pnt_id in pols[pol_id]:
+                data += vx(pnt_id) + vx(pol_id) + struct.pack(">f", rnd.random())
+        chunks.append(chunk(b"VMAD", data))
+
+    for i, path in enumerate(clips):
+        still = lwostring(path)
+        data = struct.pack(">L4sH", i + 1, b"STIL", len(still)) + still
+        chunks.append(chunk(b"CLIP", data))
+
+    for i, name in enumerate(names):
+        data = lwostring(name) + lwostring("")
+        data += b"COLR" + struct.pack(">HfffH", 14, 0.5, 0.5, 0.5, 0)
+        data += b"DIFF" + struct.pack(">HfH", 6, 1.0, 0)
+        data += b"SMAN" + struct.pack(">Hf", 4, 1.0 + i / 10)
+        chunks.append(chunk(b"SURF", data))
+
+    return form(b"LWO2", chunks)
+
+
+def make_lwob(points=1000, polygons=1000, surfaces=1, sides=(4,), seed=0):
+    """An LWOB file, the surface index is stored with each polygon."""
+    pnts, pols = geometry(min(points, 0xFFFF), polygons, sides, seed)
+    names = [f"Surface {i}" for i in range(surfaces)]
+
+    chunks = [chunk(b"SRFS", b"".join(lwostring(n) for n in names))]
+    chunks.append(chunk(b"PNTS", b"".join(struct.pack(">fff", *p) for p in pnts)))
+    data = bytearray()
+    for i, pol in enumerate(pols):
+        data += struct.pack(f">H{len(pol)}Hh", len(pol), *pol, i % surfaces + 1)
+    chunks.append(chunk(b"POLS", data))
+    for name in names:
+        data = lwostring(name)
+        data += b"COLR" + struct.pack(">HBBBB", 4, 200, 200, 200, 0)
+        data += b"DIFF" + struct.pack(">Hh", 2, 256)
+        chunks.append(chunk(b"SURF", data))
+
+    return form(b"LWOB", chunks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic LWO file.")
+    parser.add_argument("outfile")
+    parser.add_argument("--format", choices=["LWO2", "LWOB"], default="LWO2")
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--polygons", type=int, default=1000)
+    parser.add_argument("--uvmaps", type=int, default=0)
+    parser.add_argument("--vmads", type=int, default=0)
+    parser.add_argument("--weights", type=int, default=0)
+    parser.add_argument("--morphs", type=int, default=0)
+    parser.add_argument("--surfaces", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.format == "LWOB":
+        data = make_lwob(args.points, args.polygons, args.surfaces)
+    else:
+        data = make_lwo2(
+            args.points,
+            args.polygons,
+            args.uvmaps,
+            args.vmads,
+            args.weights,
+            args.morphs,
+            args.surfaces,
+        )
+    with open(args.outfile, "wb") as f:
+        f.write(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_helper import LwoFile
+
+
+def test_load_lwo_lazy():
+    infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+    f = LwoFile(infile)
+    f.check_file()
+
+    x = lwoObject(infile)
+    x.ch.lazy = True
+    x.read()
+    assert [c.chunkname for c in x.lwo.chunks][:3] == [b"TAGS", b"LAYR", b"PNTS"]
+    assert x.lwo.layers == []
+
+    assert x.tags == ["DkBlu", "Default"]
+    assert x.lwo.layers == []
+    assert x.lwo.surfs == {}
+
+    assert len(x.layers) == 2
+    assert x.lwo.surfs == {}
+    assert [c.chunkname for c in x.lwo.chunks] == [b"SURF"]
+
+    assert f.test_pickle(x.elements)
+    assert x.lwo.chunks == []
+    assert x.lwo.map is None
+
+
+def test_load_lwo_lazy_lwob():
+    infile = "tests/basic/src/LWO/box/box3-uv-layers.lwo"
+    x = lwoObject(infile)
+    x.ch.lazy = True
+    x.read()
+    y = lwoObject(infile)
+    y.read()
+
+    assert x.surfs == y.surfs
+    assert x == y
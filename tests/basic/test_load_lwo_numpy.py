@@ -0,0 +1,288 @@
+import pytest
+from lwo_strut.lwoObject import lwoObject
+from lwo_strut.lwoArray import tolist
+from scripts.lwo_helper import LwoFile
+
+np = pytest.importorskip("numpy")
+
+
+def load_numpy(infile):
+    x = lwoObject(infile)
+    x.ch.use_numpy = True
+    x.read()
+    return x
+
+
+@pytest.mark.parametrize(
+    "infile",
+    [
+        "tests/basic/src/LWO2/box/box0.lwo",
+        "tests/basic/src/LWO2/box/box6-hidden.lwo",
+        "tests/basic/src/LWO/box/box3-uv-layers.lwo",
+    ],
+)
+def test_load_lwo_numpy(infile):
+    f = LwoFile(infile)
+    f.check_file()
+
+    x = load_numpy(infile)
+    for layer in x.layers:
+        assert isinstance(layer.pnts, np.ndarray)
+        assert layer.pnts.shape == (len(layer.pnts), 3)
+
+    assert f.test_pickle(tolist(x.elements))
+
+
+def test_load_lwo_numpy_eq():
+    infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+    x = lwoObject(infile)
+    x.read()
+
+    assert x == load_numpy(infile)
+
+
+def test_load_lwo_numpy_fields(tmp_path):
+    from lwo_strut.lwoArray import values_equal
+    from scripts.lwo_synth import make_lwo2
+
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(300, 200, uvmaps=1, vmads=1, weights=1, morphs=1))
+    x = lwoObject(str(infile))
+    x.read()
+    y = load_numpy(str(infile))
+    assert isinstance(y.layers[0].pnts, np.ndarray)
+
+    for a, b in zip(x.layers, y.layers):
+        for k in a.__slots__:
+            assert values_equal(getattr(a, k), getattr(b, k)) is True, k
+    # Arrays held in lists and dicts still compare to a bool.
+    assert values_equal([x.layers[0].pnts], [y.layers[0].pnts]) is True
+    assert values_equal({"p": y.layers[0].pnts}, {"p": y.layers[0].pnts[:1]}) is False
+    assert x.layers == y.layers and x == y
+
+
+def test_decode_pols_vx():
+    from lwo_strut.lwoArray import PolygonArray, decode_pols
+
+    # A triangle with 2 byte indices, then a quad mixing in 4 byte indices.
+    data = bytes([0, 3, 0, 1, 0, 2, 0, 3])
+    data += bytes([0, 4, 0, 4, 255, 1, 0, 0, 0, 5, 255, 0, 1, 2])
+    pols = decode_pols(data)
+    assert pols.indices.dtype == np.int32
+    assert pols == [[3, 2, 1], [258, 5, 65536, 4]]
+
+    quads = decode_pols(bytes([0, 2, 0, 1, 0, 2, 0, 2, 0, 3, 0, 4]))
+    assert quads.offsets.tolist() == [0, 2, 4]
+    assert quads == [[2, 1], [4, 3]]
+
+    pols.extend(quads)
+    assert pols[1:3] == [[258, 5, 65536, 4], [2, 1]]
+    assert isinstance(pols[1:3], PolygonArray)
+
+
+def test_decode_pols_bulk(tmp_path, monkeypatch):
+    from lwo_strut import lwoArray
+    from scripts.lwo_synth import make_lwo2
+
+    # Mixed face sizes and 4 byte indices past 0xFF00 points.
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(0xFF80, 2000, sides=(3, 4, 5, 9)))
+    x = lwoObject(str(infile))
+    x.read()
+
+    calls = []
+    face_starts = lwoArray._face_starts
+
+    def spy(counts, *args):
+        calls.append(len(counts))
+        return face_starts(counts, *args)
+
+    monkeypatch.setattr(lwoArray, "_face_starts", spy)
+    y = load_numpy(str(infile))
+    assert calls
+    assert isinstance(y.layers[0].pols, lwoArray.PolygonArray)
+    assert y.layers[0].pols == x.layers[0].pols
+    assert max(map(max, x.layers[0].pols)) > 0xFF00
+
+    with pytest.raises(ValueError):
+        lwoArray.decode_pols(bytes([0, 3, 0, 1, 0, 2]))
+    with pytest.raises(ValueError):
+        lwoArray.decode_pols(bytes([0, 2, 0, 1, 255, 1]))
+
+
+def test_uv_arrays(tmp_path):
+    import pickle
+    from lwo_strut.lwoArray import VMapArray, VMadArray, PolygonArray, corner_uvs
+    from scripts.lwo_synth import make_lwo2
+
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(0xFF10, 300, uvmaps=1, vmads=1, sides=(3, 4, 5)))
+    x = lwoObject(str(infile))
+    x.read()
+    layer = x.layers[0]
+    y = load_numpy(str(infile)).layers[0]
+
+    vmap = y.uvmaps_vmap["UV 0"]["PointMap"]
+    vmad = y.uvmaps_vmad["UV 0"]["FaceMap"]
+    assert isinstance(vmap, VMapArray) and vmap.data.dtype == np.float32
+    assert isinstance(vmad, VMadArray) and vmad.pol_ids.dtype == np.int32
+    assert vmap == layer.uvmaps_vmap["UV 0"]["PointMap"]
+    assert vmad == layer.uvmaps_vmad["UV 0"]["FaceMap"]
+    assert vmap[0xFF0F] == layer.uvmaps_vmap["UV 0"]["PointMap"][0xFF0F]
+    assert vmad[2] == layer.uvmaps_vmad["UV 0"]["FaceMap"][2]
+    assert pickle.loads(pickle.dumps(vmad)) == vmad
+
+    # VMAD UVs win over the VMAP ones, face by face.
+    uvs = corner_uvs(y, "UV 0")
+    pols = PolygonArray.from_lists(layer.pols)
+    assert uvs.shape == (len(pols.indices), 2)
+    corner = 0
+    for pol_id, pol in enumerate(layer.pols):
+        for pnt_id in pol:
+            face = layer.uvmaps_vmad["UV 0"]["FaceMap"].get(pol_id, {})
+            expected = face.get(pnt_id, layer.uvmaps_vmap["UV 0"]["PointMap"][pnt_id])
+            assert tuple(uvs[corner].tolist()) == expected
+            corner += 1
+    assert np.array_equal(corner_uvs(layer, "UV 0"), uvs)
+
+
+def test_uv_array_update():
+    from lwo_strut.lwoArray import VMapArray, VMadArray
+
+    a = VMapArray.from_dict({1: (0.5, 0.5), 2: (1.0, 1.0)})
+    a.update(VMapArray.from_dict({2: (0.0, 0.0), 3: (0.25, 0.25)}))
+    assert a == {1: (0.5, 0.5), 2: (0.0, 0.0), 3: (0.25, 0.25)}
+
+    d = {0: {1: (0.5, 0.5), 2: (1.0, 1.0)}, 1: {1: (0.0, 0.0)}}
+    b = VMadArray.from_dict(d)
+    b.update({0: {3: (0.25, 0.25)}})
+    d.update({0: {3: (0.25, 0.25)}})
+    assert b == d
+    assert 1 in b and 2 not in b
+
+
+def test_vmad_array_index():
+    from lwo_strut.lwoArray import VMadArray
+
+    d = {5: {1: (0.5, 0.25), 2: (1.0, 0.0)}, 2: {7: (0.0, 1.0)}, 9: {3: (0.5, 0.5)}}
+    a = VMadArray.from_dict(d)
+    assert len(a) == 3
+    assert list(a) == list(d) and list(a.items()) == list(d.items())
+    assert a[5] == d[5] and a.get(4) is None
+    assert 9 in a and 4 not in a and -1 not in a and "5" not in a
+    with pytest.raises(KeyError):
+        a[4]
+
+    # The index is rebuilt after an update.
+    a.update({4: {0: (0.0, 0.0)}})
+    assert len(a) == 4 and a[4] == {0: (0.0, 0.0)}
+
+
+def test_weight_morph_arrays(tmp_path):
+    from lwo_strut.lwoArray import PointRowArray
+    from lwo_strut.lwoSnapshot import save_snapshot, load_snapshot
+    from scripts.lwo_synth import make_lwo2
+
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(0xFF10, 100, weights=1, morphs=1))
+    x = lwoObject(str(infile))
+    x.read()
+    layer = x.layers[0]
+    y = load_numpy(str(infile))
+
+    weights = y.layers[0].wmaps["Weight 0"]
+    morph = y.layers[0].morphs["Morph 0"]
+    assert isinstance(weights, PointRowArray) and weights.values.shape == (0xFF10,)
+    assert isinstance(morph, PointRowArray) and morph.values.shape == (0xFF10 // 2, 3)
+    assert weights == layer.wmaps["Weight 0"]
+    assert morph == layer.morphs["Morph 0"]
+    assert morph[-1] == layer.morphs["Morph 0"][-1]
+
+    save_snapshot(y, tmp_path / "synth.lwos")
+    layer = load_snapshot(tmp_path / "synth.lwos")["layers"][0]
+    assert layer["morphs"]["Morph 0"] == morph
+
+
+def test_surface_tags(tmp_path):
+    from lwo_strut.lwoArray import SurfaceTags, surface_groups
+    from lwo_strut.lwoSnapshot import save_snapshot, load_snapshot
+    from scripts.lwo_synth import make_lwo2
+
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(100, 0xFF10, surfaces=3))
+    x = lwoObject(str(infile))
+    x.read()
+    y = load_numpy(str(infile))
+
+    surf_tags = y.layers[0].surf_tags
+    assert isinstance(surf_tags, SurfaceTags)
+    assert surf_tags.index.dtype == np.int16 and len(surf_tags.index) == 0xFF10
+    assert surf_tags == x.layers[0].surf_tags
+
+    faces, tags, starts = surf_tags.groups()
+    assert tags.tolist() == [0, 1, 2]
+    for tag, a, b in zip(tags, starts[:-1], starts[1:]):
+        assert faces[a:b].tolist() == x.layers[0].surf_tags[tag]
+    for a, b in zip(surface_groups(x.layers[0].surf_tags), (faces, tags, starts)):
+        assert np.array_equal(a, b)
+
+    save_snapshot(y, tmp_path / "synth.lwos")
+    layer = load_snapshot(tmp_path / "synth.lwos")["layers"][0]
+    assert layer["surf_tags"] == surf_tags
+
+
+def test_surface_tags_records(tmp_path):
+    from lwo_strut.lwoChunk import iter_chunks
+    from lwo_strut.lwoSnapshot import save_snapshot, load_snapshot
+    from scripts.lwo_synth import chunk, form, make_lwo2, vx
+
+    # Out of order, with polygon 1 tagged twice.
+    records = [(3, 0), (2, 1), (0, 1), (1, 0), (1, 1)]
+    ptag = b"SURF" + b"".join(vx(pid) + bytes([0, sid]) for pid, sid in records)
+    chunks = []
+    for c in iter_chunks(make_lwo2(10, 4, surfaces=2)):
+        body = ptag if c.getname() == b"PTAG" else bytes(c.data)
+        chunks.append(chunk(c.getname(), body))
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(form(b"LWO2", chunks))
+
+    x = lwoObject(str(infile))
+    x.read()
+    y = load_numpy(str(infile))
+    assert x.layers[0].surf_tags == {0: [3, 1], 1: [2, 0, 1]}
+    surf_tags = y.layers[0].surf_tags
+    assert list(surf_tags.items()) == list(x.layers[0].surf_tags.items())
+    assert x.layers == y.layers
+    # The last tag of a face wins in the per face index.
+    assert surf_tags.index.tolist() == [1, 1, 1, 0]
+
+    save_snapshot(y, tmp_path / "synth.lwos")
+    layer = load_snapshot(tmp_path / "synth.lwos")["layers"][0]
+    assert list(layer["surf_tags"].items()) == list(surf_tags.items())
+
+
+def test_edge_weights(tmp_path):
+    from lwo_strut.lwoArray import EdgeWeights
+    from lwo_strut.lwoSnapshot import save_snapshot, load_snapshot
+    from scripts.lwo_synth import make_lwo2
+
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(0xFF10, 300, sides=(3, 4, 5), edge_weights=True))
+    x = lwoObject(str(infile))
+    x.read()
+    y = load_numpy(str(infile))
+
+    d = x.layers[0].edge_weights
+    edge_weights = y.layers[0].edge_weights
+    assert isinstance(edge_weights, EdgeWeights)
+    assert len(d) > 0 and edge_weights == d
+
+    key = next(iter(d))
+    a, b = map(int, key.split())
+    assert edge_weights[key] == edge_weights[a, b] == d[key]
+    assert (a, b) in edge_weights and "0 0" not in edge_weights
+    assert edge_weights.lookup([a, 0], [b, 0]).tolist() == [d[key], 0.0]
+
+    save_snapshot(y, tmp_path / "synth.lwos")
+    layer = load_snapshot(tmp_path / "synth.lwos")["layers"][0]
+    assert layer["edge_weights"] == d
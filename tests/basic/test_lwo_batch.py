@@ -0,0 +1,25 @@
+from lwo_strut.lwoBatch import load_many, find_lwo, main
+from scripts.lwo_helper import LwoFile
+
+
+def test_load_many():
+    infiles = find_lwo(["tests/basic/src"])
+    assert "tests/basic/src/LWO2/box/box0.lwo" in infiles
+    infiles.append("README.md")
+
+    results = {r.filename: r for r in load_many(infiles, workers=2)}
+    assert sorted(results) == sorted(infiles)
+    assert "Invalid LWO File Type" in results["README.md"].error
+
+    infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+    assert results[infile].error is None
+    assert LwoFile(infile).test_pickle(results[infile].elements)
+
+
+def test_load_many_summary(capsys):
+    infile = "tests/basic/src/LWO2/box/box0.lwo"
+    (r,) = load_many([infile], workers=1, summary=True)
+    assert (r.stat.layers, r.stat.pnts, r.stat.pols) == (1, 8, 6)
+
+    assert main(["-j", "1", infile]) == 0
+    assert "1 layers 8 points 6 polygons" in capsys.readouterr().out
@@ -0,0 +1,40 @@
+import os
+from lwo_strut.lwoBase import LWOBase
+from lwo_strut.lwoCache import lwoCache
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_helper import LwoFile
+
+
+def test_lwo_cache(tmp_path, monkeypatch):
+    infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+    cache = lwoCache(tmp_path, hash_content=True)
+
+    x = lwoObject(infile)
+    x.ch.cache = cache
+    x.read()
+    assert len(os.listdir(tmp_path)) == 1
+
+    def no_parse(self, wanted=None):
+        raise AssertionError("parsed despite a warm cache")
+
+    monkeypatch.setattr(LWOBase, "parse_chunks", no_parse)
+    y = lwoObject(infile)
+    y.ch.cache = cache
+    y.read()
+    assert x == y
+    assert LwoFile(infile).test_pickle(y.elements)
+
+    # Options that change the output get their own entry.
+    monkeypatch.undo()
+    y.ch.skel_to_arm = True
+    y.read()
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_lwo_cache_evict(tmp_path):
+    cache = lwoCache(tmp_path, max_size=300)
+    cache.put("a", bytes(200))
+    os.utime(cache.entry("a"), (0, 0))
+    cache.put("b", bytes(200))
+    assert cache.get("a") is None
+    assert cache.get("b") == bytes(200)
@@ -0,0 +1,17 @@
+import struct
+from lwo_strut.lwoChunk import iter_chunks, find_null
+
+
+def test_iter_chunks_padding():
+    data = b"FORM" + struct.pack(">L", 0) + b"LWO2"
+    data += b"TAGS" + struct.pack(">L", 3) + b"ab\0\0"
+    data += b"PNTS" + struct.pack(">L", 12) + bytes(12)
+    data += b"BBOX"  # truncated header, ignored like chunk.Chunk does
+    buf = memoryview(data)
+
+    chunks = list(iter_chunks(buf))
+    assert [c.chunkname for c in chunks] == [b"TAGS", b"PNTS"]
+    assert isinstance(chunks[0].read(2), memoryview)
+    assert bytes(chunks[0].read()) == b"\0"
+    assert chunks[1].getsize() == 12
+    assert find_null(buf[20:]) == 2
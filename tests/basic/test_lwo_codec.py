@@ -0,0 +1,22 @@
+import random
+from lwo_strut.lwoCodec import U2, VEC2, vx_records
+from scripts.lwo_synth import vx
+
+
+def test_vx_records():
+    rnd = random.Random(0)
+    ids = [
+        # All 2 byte, sorted past 0xFF00, then mixed sizes.
+        *[(i, i % 7) for i in range(500)],
+        *[(0xFEF0 + i, 0xFF00 + i) for i in range(100)],
+        *[(rnd.randrange(1 << 24), rnd.randrange(0xFF00)) for i in range(300)],
+    ]
+    records = [(pnt_id, pol_id, float(i), 0.5) for i, (pnt_id, pol_id) in enumerate(ids)]
+    data = b"".join(vx(p) + vx(q) + VEC2.pack(u, v) for p, q, u, v in records)
+    assert vx_records(memoryview(data), 2, VEC2) == records
+
+    tags = [(i * 97, i % 3) for i in range(1000)]
+    data = b"".join(vx(pid) + U2.pack(sid) for pid, sid in tags)
+    assert vx_records(data, 1, U2) == tags
+    assert vx_records(memoryview(bytearray(data)).cast("H"), 1, U2) == tags
+    assert vx_records(b"", 1, U2) == []
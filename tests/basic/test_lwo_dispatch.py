@@ -0,0 +1,38 @@
+import logging
+from lwo_strut.LWO2 import LWO2
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_synth import make_lwo2
+
+
+def test_chunk_stats():
+    x = lwoObject("tests/basic/src/LWO2/box/box6-hidden.lwo", logging.WARNING)
+    x.read()
+    y = lwoObject("tests/basic/src/LWO2/box/box6-hidden.lwo", logging.WARNING)
+    y.lwo = LWO2(y.filename, logging.WARNING)
+    y.lwo.chunk_stats = {}
+    y.lwo.read_lwo()
+    assert x == y
+
+    stats = y.lwo.chunk_stats
+    assert stats[("chunk", b"LAYR")][0] == len(y.layers)
+    assert stats[("chunk", b"SURF")][0] == len(y.surfs)
+    assert stats[("SURF", b"COLR")][0] == len(y.surfs)
+    assert all(seconds >= 0 for count, seconds in stats.values())
+
+
+def test_register_chunk(tmp_path):
+    class LWO2Bbox(LWO2):
+        chunk_handlers = LWO2.chunk_handlers.copy()
+
+        def read_bbox(self, s):
+            self.bbox = s.unpack_from(self.rootchunk.data)
+
+    LWO2Bbox.chunk_handlers.register(b"BBOX", "read_bbox", fmt=">6f")
+
+    infile = tmp_path / "bbox.lwo"
+    infile.write_bytes(make_lwo2(10, 10))
+    lwo = LWO2Bbox(str(infile), logging.WARNING)
+    lwo.read_lwo()
+    assert lwo.bbox == (-1, -1, -1, 1, 1, 1)
+    # The LWO2 table itself is untouched.
+    assert LWO2.chunk_handlers.table[b"BBOX"] == (None, True)
@@ -0,0 +1,74 @@
+import pytest
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_synth import make_lwo2
+
+
+def test_iter_events():
+    infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+    y = lwoObject(infile)
+    y.read()
+
+    x = lwoObject(infile)
+    events = []
+    layers = []
+    for event in x.iter_events():
+        events.append((event.type, event.subtype))
+        if event.type == "layer":
+            layers.append(event.layer)
+            assert x.lwo.layers == [event.layer]
+        elif event.type == "pnts":
+            assert event.data == event.layer.pnts
+        elif event.type == "surf":
+            assert event.data is x.lwo.surfs["Default"]
+
+    assert events == [
+        ("tags", None),
+        ("layer", None),
+        ("pnts", None),
+        ("pols", b"FACE"),
+        ("ptag", b"COLR"),
+        ("ptag", b"SURF"),
+        ("layer", None),
+        ("pnts", None),
+        ("pols", b"FACE"),
+        ("ptag", b"COLR"),
+        ("ptag", b"SURF"),
+        ("surf", None),
+    ]
+    assert layers == y.layers
+    assert x.lwo.map is None
+
+
+def test_iter_events_lwob():
+    x = lwoObject("tests/basic/src/LWO/box/box3-uv-layers.lwo")
+    events = [e.type for e in x.iter_events()]
+    assert events == ["tags", "layer", "pnts", "pols", "surf"]
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_iter_events_maps(tmp_path, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(
+        make_lwo2(60, 40, uvmaps=1, vmads=1, weights=1, morphs=1, edge_weights=True)
+    )
+    x = lwoObject(str(infile))
+    x.ch.use_numpy = use_numpy
+    events = {}
+    for event in x.iter_events():
+        if event.type in ("vmap", "vmad", "ptag"):
+            events[event.type, event.subtype, event.name] = event.data
+
+    layer = x.lwo.layers[0]
+    assert events == {
+        ("vmap", b"TXUV", "UV 0"): layer.uvmaps_vmap["UV 0"]["PointMap"],
+        ("vmap", b"WGHT", "Weight 0"): layer.wmaps["Weight 0"],
+        ("vmap", b"MORF", "Morph 0"): layer.morphs["Morph 0"],
+        ("vmad", b"TXUV", "UV 0"): layer.uvmaps_vmad["UV 0"]["FaceMap"],
+        ("vmad", b"WGHT", "Edge Weight"): layer.edge_weights,
+        ("ptag", b"SURF", None): layer.surf_tags,
+    }
+    for data in events.values():
+        assert data is not None and len(data)
+    assert events["ptag", b"SURF", None] is layer.surf_tags
@@ -0,0 +1,254 @@
+import json
+import math
+import struct
+import pytest
+from lwo_strut.lwoBase import _obj_layer
+from lwo_strut.lwoChunk import iter_chunks
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_synth import chunk, form, make_lwo2
+
+np = pytest.importorskip("numpy")
+
+from lwo_strut.lwoArray import PolygonArray
+from lwo_strut.lwoExport import _ply_faces, export_glb, export_obj, export_ply
+
+infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+
+
+def read_layers(path):
+    x = lwoObject(str(path))
+    x.read()
+    return x
+
+
+def corner_points(x):
+    """Every polygon corner's point, layer after layer."""
+    rows = []
+    for layer in x.layers:
+        pnts = np.asarray(layer.pnts, dtype=np.float32).reshape(-1, 3)
+        rows.append(pnts[PolygonArray.from_lists(layer.pols).indices])
+    return np.concatenate(rows)
+
+
+def y_up(points):
+    """Z up points or normals as the exporters write them, (x, z, -y)."""
+    return np.asarray(points, dtype=np.float32)[..., [0, 2, 1]] * np.float32([1, 1, -1])
+
+
+def read_ply(path):
+    data = path.read_bytes()
+    end = data.index(b"end_header\n") + len(b"end_header\n")
+    header = data[:end].decode("ascii").split("\n")
+    nvertex = int(header[3].split()[-1])
+    nprops = sum(line.startswith("property float") for line in header)
+    nface = int(header[3 + nprops + 1].split()[-1])
+    vertices = np.frombuffer(data, "<f4", nvertex * nprops, end).reshape(nvertex, nprops)
+    offset = end + vertices.nbytes
+    faces = []
+    for _ in range(nface):
+        n = data[offset]
+        faces.append(list(struct.unpack_from(f"<{n}I", data, offset + 1)))
+        offset += 1 + 4 * n
+    assert offset == len(data)
+    return vertices, faces
+
+
+def test_export_ply(tmp_path):
+    outfile = tmp_path / "box.ply"
+    export_ply(infile, str(outfile))
+    vertices, faces = read_ply(outfile)
+    assert vertices.shape[1] == 8
+
+    x = read_layers(infile)
+    assert len(faces) == sum(len(layer.pols) for layer in x.layers)
+    corners = np.array([i for face in faces for i in face])
+    assert np.array_equal(vertices[corners, :3], y_up(corner_points(x)))
+    assert [len(face) for face in faces] == [len(p) for layer in x.layers for p in layer.pols]
+
+
+def test_ply_faces():
+    # A face too large for a uchar count is written as triangles.
+    n = 300
+    layer = _obj_layer()
+    layer.pnts = [[math.cos(a), math.sin(a), 0] for a in np.arange(n) * 2 * math.pi / n]
+    pols = PolygonArray.from_lists([[0, 1, 2], list(range(n))])
+    corner_vertex = np.arange(n + 3, dtype=np.uint32)
+    record, count = _ply_faces(layer, pols, corner_vertex)
+    assert count == 1 + n - 2
+    assert record.nbytes == count * 13
+    assert record[:13].tolist() == [3, 0, 0, 0, 0, 1, 0, 0, 0, 2, 0, 0, 0]
+
+
+def test_export_obj(tmp_path):
+    outfile = tmp_path / "synth.obj"
+    lwofile = tmp_path / "synth.lwo"
+    lwofile.write_bytes(make_lwo2(60, 50, uvmaps=1, vmads=1, surfaces=2))
+    export_obj(str(lwofile), str(outfile))
+
+    v, vt, vn, faces, usemtl = [], [], [], [], []
+    for line in outfile.read_text().splitlines():
+        kind, *rest = line.split()
+        if kind == "v":
+            v.append([float(a) for a in rest])
+        elif kind == "vt":
+            vt.append([float(a) for a in rest])
+        elif kind == "vn":
+            vn.append([float(a) for a in rest])
+        elif kind == "f":
+            faces.append([[int(i) for i in corner.split("/")] for corner in rest])
+        elif kind == "usemtl":
+            usemtl.append(" ".join(rest))
+    assert len(v) == len(vt) == len(vn)
+    assert usemtl == ["Surface 0", "Surface 1"]
+    assert len(faces) == 50
+    assert all(a == b == c for face in faces for a, b, c in face)
+
+    x = read_layers(lwofile)
+    layer = x.layers[0]
+    # Faces come grouped by surface, round robin in the synthetic file.
+    order = [i for tag in sorted(layer.surf_tags) for i in layer.surf_tags[tag]]
+    points = np.array(v)[[a - 1 for pol in faces for a, b, c in pol]]
+    pnts = np.asarray(layer.pnts)
+    expected = np.concatenate([pnts[layer.pols[i]] for i in order])
+    assert np.allclose(points, y_up(expected), atol=1e-5)
+
+
+def stack_layers(*files):
+    """One LWO2 file with the layer of each synthetic file, in order."""
+    chunks = []
+    for index, data in enumerate(files):
+        for c in iter_chunks(data):
+            name, body = c.getname(), bytes(c.data)
+            if name == b"LAYR":
+                body = struct.pack(">H", index) + body[2:]
+            elif name in (b"TAGS", b"SURF") and index:
+                continue
+            chunks.append(chunk(name, body))
+    # The surfaces go after the last layer.
+    chunks.sort(key=lambda c: c[:4] == b"SURF")
+    return form(b"LWO2", chunks)
+
+
+def test_export_obj_layers(tmp_path):
+    outfile = tmp_path / "synth.obj"
+    lwofile = tmp_path / "synth.lwo"
+    lwofile.write_bytes(
+        stack_layers(
+            make_lwo2(30, 20, uvmaps=1),
+            make_lwo2(40, 30, seed=1),
+            make_lwo2(50, 40, uvmaps=1, seed=2),
+        )
+    )
+    export_obj(str(lwofile), str(outfile))
+
+    v, vt, faces = [], [], []
+    for line in outfile.read_text().splitlines():
+        kind, *rest = line.split()
+        if kind == "v":
+            v.append([float(a) for a in rest])
+        elif kind == "vt":
+            vt.append([float(a) for a in rest])
+        elif kind == "o":
+            faces.append([])
+        elif kind == "f":
+            faces[-1].append([corner.split("/") for corner in rest])
+    assert len(faces) == 3
+
+    x = read_layers(lwofile)
+    uvs = [l.uvmaps_vmap.get("UV 0", {}).get("PointMap") for l in x.layers]
+    assert [u is not None for u in uvs] == [True, False, True]
+    for layer, layer_faces, uvmap in zip(x.layers, faces, uvs):
+        for pol, face in zip(layer.pols, layer_faces):
+            for pnt_id, (a, b, c) in zip(pol, face):
+                assert np.allclose(v[int(a) - 1], y_up(layer.pnts[pnt_id]), atol=1e-5)
+                if uvmap is None:
+                    assert b == ""
+                else:
+                    assert np.allclose(vt[int(b) - 1], uvmap[pnt_id], atol=1e-5)
+    assert max(int(corner[1]) for face in faces[2] for corner in face) == len(vt)
+
+
+def read_glb(path):
+    data = path.read_bytes()
+    magic, version, length = struct.unpack_from("<4sII", data)
+    assert (magic, version, length) == (b"glTF", 2, len(data))
+    size, kind = struct.unpack_from("<I4s", data, 12)
+    assert kind == b"JSON" and size % 4 == 0
+    gltf = json.loads(data[20 : 20 + size])
+    bin_size, kind = struct.unpack_from("<I4s", data, 20 + size)
+    assert kind == b"BIN\0"
+    return gltf, data[28 + size : 28 + size + bin_size]
+
+
+def accessor(gltf, binary, i):
+    a = gltf["accessors"][i]
+    view = gltf["bufferViews"][a["bufferView"]]
+    dtype = {5126: "<f4", 5125: "<u4"}[a["componentType"]]
+    width = {"SCALAR": 1, "VEC2": 2, "VEC3": 3}[a["type"]]
+    stride = view.get("byteStride", 4 * width) // 4
+    start = view["byteOffset"] + a["byteOffset"]
+    words = np.frombuffer(binary, dtype, offset=start, count=(a["count"] - 1) * stride + width)
+    return np.lib.stride_tricks.as_strided(
+        words, (a["count"], width), (4 * stride, 4)
+    ).copy()
+
+
+def test_export_glb(tmp_path):
+    outfile = tmp_path / "box.glb"
+    x = lwoObject(infile)
+    export_glb(x, str(outfile))
+    gltf, binary = read_glb(outfile)
+
+    assert gltf["buffers"] == [{"byteLength": len(binary)}]
+    assert [m["name"] for m in gltf["materials"]] == ["Default"]
+    assert "pbrMetallicRoughness" in gltf["materials"][0]
+    assert [n["name"] for n in gltf["nodes"]] == ["Layer 2", "Layer 1"]
+
+    y = read_layers(infile)
+    for mesh, layer in zip(gltf["meshes"], y.layers):
+        (primitive,) = mesh["primitives"]
+        positions = accessor(gltf, binary, primitive["attributes"]["POSITION"])
+        normals = accessor(gltf, binary, primitive["attributes"]["NORMAL"])
+        indices = accessor(gltf, binary, primitive["indices"]).reshape(-1)
+        assert np.allclose(np.linalg.norm(normals, axis=1), 1, atol=1e-6)
+        # Back to Z up, every point of the layer is used.
+        points = positions[indices][:, [0, 2, 1]] * [1, -1, 1]
+        pnts = np.asarray(layer.pnts, dtype=np.float32)
+        assert np.allclose(np.unique(points, axis=0), np.unique(pnts, axis=0))
+        tris = points.reshape(-1, 3, 3)
+        area = np.linalg.norm(np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0]), axis=1)
+        assert area.sum() > 0
+
+
+def test_export_axes(tmp_path):
+    # Every format writes the same Y up points and normals.
+    export_glb(infile, str(tmp_path / "box.glb"))
+    export_ply(infile, str(tmp_path / "box.ply"), attributes=("position", "normal"))
+    export_obj(infile, str(tmp_path / "box.obj"))
+
+    gltf, binary = read_glb(tmp_path / "box.glb")
+    glb = []
+    for mesh in gltf["meshes"]:
+        attributes = mesh["primitives"][0]["attributes"]
+        glb.append(
+            np.hstack([accessor(gltf, binary, attributes[a]) for a in ("POSITION", "NORMAL")])
+        )
+    glb = np.concatenate(glb)
+    ply = read_ply(tmp_path / "box.ply")[0]
+    rows = {"v": [], "vn": []}
+    for line in (tmp_path / "box.obj").read_text().splitlines():
+        kind, *rest = line.split()
+        if kind in rows:
+            rows[kind].append([float(a) for a in rest])
+    obj = np.hstack([rows["v"], rows["vn"]])
+
+    def same_rows(a, b):
+        # Every row of each has a close match in the other.
+        distance = np.abs(np.asarray(a)[:, None] - np.asarray(b)[None]).max(axis=2)
+        return (distance.min(axis=1) < 1e-5).all() and (distance.min(axis=0) < 1e-5).all()
+
+    assert same_rows(glb, ply)
+    assert same_rows(ply, obj)
+    x = read_layers(infile)
+    pnts = np.concatenate([np.asarray(layer.pnts) for layer in x.layers])
+    assert same_rows(ply[:, :3], y_up(pnts))
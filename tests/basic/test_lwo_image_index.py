@@ -0,0 +1,104 @@
+import os
+import pytest
+from lwo_strut.lwoObject import lwoObject
+from lwo_strut.lwoImageIndex import lwoImageIndex, scan_root
+from lwo_strut.lwoExceptions import lwoNoImageFoundException
+from scripts.lwo_synth import make_lwo2
+
+
+def touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+    return str(path)
+
+
+def test_scan_root(tmp_path):
+    top = touch(tmp_path / "Wood.PNG")
+    deep = touch(tmp_path / "a" / "b" / "wood.png")
+    touch(tmp_path / ".hidden" / "wood.png")
+    touch(tmp_path / "a" / "noext")
+
+    index = scan_root(str(tmp_path))
+    assert index["wood.png"] == [top, deep]
+    assert "noext" not in index
+
+    # Like glob's ** without recursive, only one directory down.
+    assert scan_root(str(tmp_path), recursive=False) == {}
+    assert scan_root(str(tmp_path / "a"), recursive=False) == {"wood.png": [deep]}
+    assert scan_root(str(tmp_path), recursive=True) == index
+
+
+def test_resolve_clips(tmp_path):
+    objects = tmp_path / "objects"
+    objects.mkdir()
+    infile = objects / "clips.lwo"
+    infile.write_bytes(make_lwo2(10, 10, clips=["C:\\images\\Brick.png", "x/metal.jpg"]))
+    brick = touch(tmp_path / "images" / "brick.png")
+    metal = touch(tmp_path / "images" / "sub" / "METAL.JPG")
+    metal2 = touch(tmp_path / "more" / "metal.jpg")
+
+    index = lwoImageIndex()
+    x = lwoObject(str(infile))
+    x.ch.search_paths = ["../images", str(tmp_path / "more")]
+    x.ch.image_index = index
+    x.read()
+    x.resolve_clips()
+    assert x.ch.images == {1: brick, 2: metal2}
+    assert x.images == [brick, metal, metal2]
+
+    # The index is shared, a second object doesn't walk the roots again.
+    os.remove(brick)
+    y = lwoObject(str(infile))
+    y.ch.search_paths = x.ch.search_paths
+    y.ch.image_index = index
+    y.read()
+    y.resolve_clips()
+    assert y.ch.images == x.ch.images
+
+    index.clear()
+    z = lwoObject(str(infile))
+    z.ch.search_paths = x.ch.search_paths
+    z.ch.image_index = index
+    z.read()
+    with pytest.raises(lwoNoImageFoundException):
+        z.resolve_clips()
+
+
+def test_saved_index(tmp_path):
+    images = tmp_path / "images"
+    brick = touch(images / "a" / "brick.png")
+    touch(images / "b" / "c" / "metal.jpg")
+    # Old enough that the saved listings are trusted.
+    for d in (images, images / "a", images / "b", images / "b" / "c"):
+        os.utime(d, ns=(10 ** 18, 10 ** 18))
+
+    saved = tmp_path / "index"
+    index = lwoImageIndex(path=str(saved))
+    assert index.find([str(images)], "BRICK.png") == [brick]
+    assert index.dirs_listed == 4
+
+    # Nothing changed, nothing is listed again.
+    index = lwoImageIndex(path=str(saved))
+    assert index.find([str(images)], "brick.png") == [brick]
+    assert index.dirs_listed == 0
+
+    # Only the changed directory is listed.
+    wood = touch(images / "b" / "wood.png")
+    index = lwoImageIndex(path=str(saved))
+    assert index.find([str(images)], "wood.png") == [wood]
+    assert index.find([str(images)], "metal.jpg")
+    assert index.dirs_listed == 1
+
+
+def test_resolve_clips_saved_index(tmp_path):
+    infile = tmp_path / "clips.lwo"
+    infile.write_bytes(make_lwo2(10, 10, clips=["brick.png"]))
+    brick = touch(tmp_path / "images" / "brick.png")
+
+    x = lwoObject(str(infile))
+    x.ch.search_paths = ["images"]
+    x.ch.image_index_dir = str(tmp_path / "index")
+    x.read()
+    x.resolve_clips()
+    assert x.ch.images == {1: brick}
+    assert os.listdir(tmp_path / "index")
@@ -0,0 +1,33 @@
+import logging
+from lwo_strut.lwoObject import lwoObject
+from lwo_strut.lwoLogger import LWOLogger, LWOLog
+
+
+def test_log_chunks(caplog):
+    infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+    with caplog.at_level(logging.INFO, logger="LWO"):
+        x = lwoObject(infile, logging.INFO)
+        x.read()
+    assert f"Importing LWO: {x.filename}" in caplog.messages
+
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="LWO"):
+        x = lwoObject(infile, logging.INFO)
+        x.ch.log_chunks = False
+        x.read()
+    assert not caplog.messages
+
+
+def test_lwo_log():
+    l = LWOLogger("LWO", logging.WARNING)
+    assert LWOLogger("LWO", logging.WARNING) is l
+    assert len(l.handlers) == 1
+
+    class Loud:
+        def __str__(self):
+            raise AssertionError("formatted a filtered message")
+
+    log = LWOLog(l)
+    assert not log.is_info and log.is_warning
+    log.info("%s", Loud())
+    log.debug("%s", Loud())
@@ -0,0 +1,56 @@
+import math
+import pytest
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_synth import make_lwo2
+
+np = pytest.importorskip("numpy")
+
+from lwo_strut.lwoNormals import corner_normals, layer_normals, vertex_normals
+
+# A unit cube, faces wound with their normals pointing out.
+CUBE_PNTS = [[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)]
+CUBE_POLS = [
+    [0, 1, 3, 2],
+    [4, 6, 7, 5],
+    [0, 4, 5, 1],
+    [2, 3, 7, 6],
+    [0, 2, 6, 4],
+    [1, 5, 7, 3],
+]
+
+
+def test_corner_normals():
+    s = 1 / math.sqrt(3)
+    hard = corner_normals(CUBE_PNTS, CUBE_POLS, [math.radians(89.5)] * 6)
+    assert hard.dtype == np.float32 and hard.shape == (24, 3)
+    assert hard[:4].tolist() == [[-1, 0, 0]] * 4
+
+    smooth = corner_normals(CUBE_PNTS, CUBE_POLS, [math.radians(91)] * 6)
+    assert np.allclose(smooth[0], [-s, -s, -s])
+    assert np.allclose(smooth, vertex_normals(CUBE_PNTS, CUBE_POLS)[CUBE_POLS].reshape(-1, 3))
+
+    # Smooth, but only within a group, the side faces split from the rest.
+    smooth = corner_normals(CUBE_PNTS, CUBE_POLS, [math.radians(91)] * 6, [0, 0, 1, 1, 0, 0])
+    assert np.allclose(smooth[8], [0, -1, 0])
+    assert np.allclose(smooth[0], np.array([-1, 0, -1]) / math.sqrt(2))
+
+
+def test_layer_normals(tmp_path):
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(50, 40, surfaces=2))
+    x = lwoObject(str(infile))
+    x.read()
+    assert x.surfs["Surface 1"].smooth_angle == pytest.approx(1.1)
+
+    layer = x.layers[0]
+    faces, corners = layer_normals(layer, x.tags, x.surfs)
+    assert faces.shape == (40, 3) and corners.shape == (160, 3)
+    # Random faces repeating a point can be degenerate, with no normal.
+    lengths = np.linalg.norm(corners, axis=1)
+    assert np.allclose(lengths[lengths > 0], 1, atol=1e-6)
+
+    # With every surface flat, each corner takes its face's normal.
+    for surf in x.surfs.values():
+        surf.smooth = False
+    faces, corners = layer_normals(layer, x.tags, x.surfs)
+    assert np.array_equal(corners, np.repeat(faces, 4, axis=0))
@@ -0,0 +1,25 @@
+import pytest
+from lwo_strut.lwoObject import lwoObject
+from lwo_strut.lwoDetect import LWODetect
+
+
+@pytest.mark.parametrize(
+    "infile",
+    [
+        "tests/basic/src/LWO2/box/box0.lwo",
+        "tests/basic/src/LWO2/box/box6-hidden.lwo",
+        "tests/basic/src/LWO/box/box3-uv-layers.lwo",
+    ],
+)
+def test_probe_lwo(infile):
+    x = lwoObject(infile)
+    x.read()
+
+    s = LWODetect.probe(infile)
+    assert s.file_type == x.lwo.file_type.decode("ascii")
+    assert s.layers == len(x.layers)
+    assert s.pnts == sum(len(l.pnts) for l in x.layers)
+    assert s.pols == sum(len(l.pols) for l in x.layers)
+    assert s.tags == x.tags
+    assert s.surfs == list(x.surfs)
+    assert s.clips == list(x.clips.values())
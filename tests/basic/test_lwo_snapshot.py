@@ -0,0 +1,54 @@
+import pytest
+from lwo_strut.lwoObject import lwoObject
+from lwo_strut.lwoArray import HAVE_NUMPY, PolygonArray, tolist
+from lwo_strut.lwoSnapshot import save_snapshot, load_snapshot
+from scripts.lwo_helper import LwoFile
+
+infiles = [
+    "tests/basic/src/LWO2/box/box0.lwo",
+    "tests/basic/src/LWO2/box/box6-hidden.lwo",
+    "tests/basic/src/LWO/box/box3-uv-layers.lwo",
+]
+
+
+@pytest.mark.parametrize("infile", infiles)
+def test_snapshot_roundtrip(infile, tmp_path):
+    f = LwoFile(infile)
+    x = lwoObject(infile)
+    x.read()
+
+    outfile = tmp_path / "x.lwos"
+    save_snapshot(x, outfile)
+    assert f.test_pickle(load_snapshot(outfile))
+
+
+def test_snapshot_maps(tmp_path):
+    layer = {
+        "uvmaps_vmad": {"UV": {"FaceMap": {i: {i + 1: (0.5, 0.25)} for i in range(9)}}},
+        "lnorms": {i: [[i, 0.0, 1.0, 0.0], [i + 1, 1.0, 0.0, 0.0]] for i in range(9)},
+        "morphs": {"M": [[i, 0.1 * i, 0.0, 1.0] for i in range(9)]},
+        "surf_tags": {0: list(range(20)), 3: [20]},
+        "pivot": [0, 0.0, 1],
+        "edge_weights": {"1 2": 0.5},
+    }
+    outfile = tmp_path / "x.lwos"
+    save_snapshot({"layers": [layer]}, outfile)
+    assert load_snapshot(outfile) == {"layers": [layer]}
+
+
+@pytest.mark.skipif(not HAVE_NUMPY, reason="needs numpy")
+def test_snapshot_mmap(tmp_path):
+    infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+    f = LwoFile(infile)
+    x = lwoObject(infile)
+    x.ch.use_numpy = True
+    x.read()
+
+    outfile = tmp_path / "x.lwos"
+    save_snapshot(x, outfile)
+    y = load_snapshot(outfile, mmap_arrays=True)
+    layer = y["layers"][0]
+    assert layer["pnts"].shape == (len(x.layers[0].pnts), 3)
+    assert isinstance(layer["pols"], PolygonArray)
+    assert not layer["pnts"].flags.writeable
+    assert f.test_pickle(tolist(y))
@@ -0,0 +1,80 @@
+import io
+import pytest
+from lwo_strut.lwoCache import lwoCache
+from lwo_strut.lwoDetect import LWODetect
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_helper import LwoFile
+
+infile = "tests/basic/src/LWO2/box/box6-hidden.lwo"
+
+
+def sources():
+    with open(infile, "rb") as f:
+        data = f.read()
+    return {
+        "bytes": data,
+        "bytearray": bytearray(data),
+        "memoryview": memoryview(data),
+        "BytesIO": io.BytesIO(data),
+    }
+
+
+@pytest.mark.parametrize("kind", ["bytes", "bytearray", "memoryview", "BytesIO"])
+def test_read_buffer(kind):
+    source = sources()[kind]
+    x = lwoObject(source)
+    assert x.filename == f"<{kind}>"
+    x.read()
+    assert LwoFile(infile).test_pickle(x.elements)
+    assert LWODetect.probe(sources()[kind]).pnts == x.lwo.pnt_count
+
+
+def test_read_file_object(tmp_path):
+    y = lwoObject(infile)
+    y.read()
+
+    with open(infile, "rb") as f:
+        x = lwoObject(f)
+        assert x.filename == y.filename and x.dirpath == y.dirpath
+        x.read()
+        assert x == y
+        assert f.tell() == 0
+
+    # A stream is read from where it is, and left there.
+    data = open(infile, "rb").read()
+    stream = io.BytesIO(b"junk" + data)
+    stream.seek(4)
+    x = lwoObject(stream)
+    x.read()
+    assert stream.tell() == 4
+    assert x == y
+    # The buffer is read again on a second read.
+    x.read()
+    assert x == y
+
+
+def test_read_buffer_once(monkeypatch):
+    # The header is sniffed from the buffer the parser then reads.
+    reads = []
+    stream = io.BytesIO(open(infile, "rb").read())
+    read = stream.read
+    monkeypatch.setattr(stream, "read", lambda *args: reads.append(args) or read(*args))
+    x = lwoObject(stream)
+    x.read()
+    assert len(reads) == 1
+
+
+def test_read_buffer_cache(tmp_path):
+    data = open(infile, "rb").read()
+    cache = lwoCache(tmp_path)
+    for source in (data, io.BytesIO(data)):
+        x = lwoObject(source)
+        x.ch.cache = cache
+        x.read()
+        assert LwoFile(infile).test_pickle(x.elements)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_read_buffer_errors():
+    with pytest.raises(Exception, match="header"):
+        lwoObject(b"FORM").read()
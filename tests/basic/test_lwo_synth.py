@@ -0,0 +1,56 @@
+import io
+import logging
+from lwo_strut.lwoObject import lwoObject
+from lwo_strut.lwoArray import HAVE_NUMPY
+from lwo_strut.lwoBase import chd
+from scripts.lwo_synth import make_lwo2, make_lwob
+from scripts.lwo_bench import bench, report
+
+
+def read(infile, use_numpy=False):
+    x = lwoObject(str(infile), logging.WARNING)
+    x.ch.use_numpy = use_numpy and HAVE_NUMPY
+    x.read()
+    return x
+
+
+def test_synth_lwo2(tmp_path):
+    # Enough points for 4 byte VX indices.
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(
+        make_lwo2(0xFF10, 200, uvmaps=2, vmads=1, weights=1, morphs=1, surfaces=3, sides=(3, 4, 5))
+    )
+
+    x = read(infile)
+    layer = x.layers[0]
+    assert len(layer.pnts) == 0xFF10
+    assert [len(p) for p in layer.pols[:3]] == [3, 4, 5]
+    assert max(i for p in layer.pols for i in p) >= 0xFF00
+    assert sorted(layer.surf_tags) == [0, 1, 2]
+    assert list(layer.uvmaps_vmap) == ["UV 0", "UV 1"]
+    assert len(layer.uvmaps_vmad["UV 0"]["FaceMap"]) == 100
+    assert len(layer.wmaps["Weight 0"]) == 0xFF10
+    assert len(layer.morphs["Morph 0"]) == 0xFF10 // 2
+    assert list(x.surfs) == ["Surface 0", "Surface 1", "Surface 2"]
+
+    assert x == read(infile, use_numpy=True)
+
+
+def test_synth_lwob(tmp_path):
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwob(100, 50, surfaces=2))
+    x = read(infile)
+    assert (len(x.layers[0].pnts), len(x.layers[0].pols)) == (100, 50)
+    assert x.layers[0].surf_tags[1] == list(range(1, 50, 2))
+
+
+def test_bench(tmp_path):
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(100, 100, uvmaps=1))
+    r = bench(str(infile), chd(), repeat=1, traced=True)
+    assert (r["pnts"], r["pols"]) == (100, 100)
+    assert r["chunks"]["VMAP TXUV"][1:] == [1, 100 * 10 + 12]
+
+    out = io.StringIO()
+    report("synth.lwo", "lists", r, out)
+    assert "POLS FACE" in out.getvalue()
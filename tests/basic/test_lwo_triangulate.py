@@ -0,0 +1,61 @@
+import logging
+import pytest
+from lwo_strut.lwoObject import lwoObject
+
+np = pytest.importorskip("numpy")
+
+from lwo_strut.lwoArray import PolygonArray
+from lwo_strut.lwoTriangulate import concave_faces, ear_clip, triangulate, triangulate_layer
+
+
+def tri_areas(pnts, indices):
+    p = np.asarray(pnts, dtype=np.float64)[indices.reshape(-1, 3)]
+    return np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+
+
+def test_triangulate():
+    pnts = [
+        # An L shaped hexagon, concave at (1, 1)
+        [0, 0, 0], [2, 0, 0], [2, 0, 1], [1, 0, 1], [1, 0, 2], [0, 0, 2],
+        # A quad, concave at (0.5, 0.5, 0)
+        [0, 0, 0], [2, 0, 0], [0.5, 0.5, 0], [0, 2, 0],
+    ]
+    pols = [[0, 1, 2, 3, 4, 5], [6, 7, 8, 9], [6, 7, 8], [0, 1], [7, 8, 9, 6]]
+    assert concave_faces(pnts, PolygonArray.from_lists(pols)).tolist() == [
+        True, True, False, False, True,
+    ]
+
+    indices, faces, corners = triangulate(pnts, pols)
+    assert indices.dtype == faces.dtype == corners.dtype == np.uint32
+    assert faces.tolist() == [0, 0, 0, 0, 1, 1, 2, 4, 4]
+    assert PolygonArray.from_lists(pols).indices[corners].tolist() == indices.tolist()
+
+    normals = tri_areas(pnts, indices)
+    assert (normals[:4, 1] < 0).all() and (normals[4:, 2] > 0).all()
+    area = np.linalg.norm(normals, axis=1) / 2
+    assert np.bincount(faces, weights=area).tolist() == [3.0, 1.0, 0.5, 0.0, 1.0]
+
+
+def test_ear_clip():
+    # A comb, every other corner reflex.
+    xy = [[0, 0], [6, 0], [6, 2], [5, 1], [4, 2], [3, 1], [2, 2], [1, 1], [0, 2]]
+    tris = ear_clip(xy)
+    assert len(tris) == len(xy) - 2
+    area = 0.0
+    for a, b, c in tris:
+        (ax, ay), (bx, by), (cx, cy) = xy[a], xy[b], xy[c]
+        cross = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        assert cross > 0
+        area += cross / 2
+    assert area == 9.0
+
+
+def test_triangulate_layer():
+    x = lwoObject("tests/basic/src/LWO2/box/box6-hidden.lwo", logging.WARNING)
+    x.read()
+    layer = x.layers[0]
+    indices, faces, corners = triangulate_layer(layer)
+    assert len(faces) == sum(len(p) - 2 for p in layer.pols)
+    for face in (0, len(layer.pols) - 1):
+        tris = indices.reshape(-1, 3)[faces == face]
+        assert set(tris.reshape(-1).tolist()) == set(layer.pols[face])
@@ -0,0 +1,97 @@
+import pytest
+from lwo_strut.lwoBase import _obj_layer
+from lwo_strut.lwoObject import lwoObject
+from scripts.lwo_synth import make_lwo2
+
+np = pytest.importorskip("numpy")
+
+from lwo_strut.lwoArray import PolygonArray, corner_uvs
+from lwo_strut import lwoVertexBuffer
+from lwo_strut.lwoTriangulate import triangulate
+from lwo_strut.lwoVertexBuffer import build_vertex_buffer, layout, unique_rows
+
+CUBE_PNTS = [[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)]
+CUBE_POLS = [
+    [0, 1, 3, 2],
+    [4, 6, 7, 5],
+    [0, 4, 5, 1],
+    [2, 3, 7, 6],
+    [0, 2, 6, 4],
+    [1, 5, 7, 3],
+]
+
+
+def cube():
+    layer = _obj_layer()
+    layer.pnts = CUBE_PNTS
+    layer.pols = CUBE_POLS
+    return layer
+
+
+def test_unique_rows(monkeypatch):
+    rows = np.array([[1, 2], [0, -0.0], [1, 2], [0, 0], [3, 4]], dtype=np.float32)
+    vertices, inverse = unique_rows(rows)
+    assert vertices.tolist() == [[1, 2], [0, 0], [3, 4]]
+    assert inverse.dtype == np.uint32 and inverse.tolist() == [0, 1, 0, 1, 2]
+    assert np.array_equal(vertices[inverse], rows)
+
+    # Every row colliding falls back to comparing the rows themselves.
+    monkeypatch.setattr(lwoVertexBuffer, "_row_hashes", lambda r: np.zeros(len(r), np.uint64))
+    assert [a.tolist() for a in unique_rows(rows)] == [vertices.tolist(), inverse.tolist()]
+
+
+def test_build_vertex_buffer():
+    layer = cube()
+    vertices, indices = build_vertex_buffer(layer)
+    assert vertices.dtype == np.float32 and vertices.shape == (8, 3)
+    assert indices.dtype == np.uint32 and len(indices) == 36
+    tri_pnts = np.array(CUBE_PNTS, dtype=np.float32)[triangulate(CUBE_PNTS, CUBE_POLS)[0]]
+    assert np.array_equal(vertices[indices], tri_pnts)
+
+    # Hard edges split every corner.
+    vertices, indices = build_vertex_buffer(layer, ["position", "normal"], triangles=False)
+    assert vertices.shape == (24, 6)
+    assert vertices[indices[:4], 3:].tolist() == [[-1, 0, 0]] * 4
+
+    # A VMAD UV on one corner of point 0 splits it from the VMAP UV.
+    layer.uvmaps_vmap = {"UV": {"PointMap": {i: (0.5, 0.5) for i in range(8)}}}
+    layer.uvmaps_vmad = {"UV": {"FaceMap": {2: {0: (0.0, 1.0)}}}}
+    vertices, indices = build_vertex_buffer(layer, ["position", "uv"], triangles=False)
+    assert vertices.shape == (9, 5)
+    assert vertices[indices[8]].tolist() == [0, 0, 0, 0, 1]
+    assert vertices[indices[0]].tolist() == [0, 0, 0, 0.5, 0.5]
+
+    # NORM VMAD normals win over the NORM VMAP ones.
+    layer.vnorms = {i: [0.0, 0.0, 1.0] for i in range(8)}
+    layer.lnorms = {0: [[1, 0.0, 1.0, 0.0]]}
+    vertices, indices = build_vertex_buffer(layer, ["normal"], triangles=False)
+    assert vertices.tolist() == [[0, 0, 1], [0, 1, 0]]
+    assert indices[:4].tolist() == [0, 1, 0, 0]
+
+    assert layout(["position", "normal", "uv:UV"]) == [
+        ("position", 0, 3),
+        ("normal", 3, 3),
+        ("uv:UV", 6, 2),
+    ]
+    with pytest.raises(ValueError):
+        build_vertex_buffer(layer, ["tangent"])
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_vertex_buffer_layer(tmp_path, use_numpy):
+    infile = tmp_path / "synth.lwo"
+    infile.write_bytes(make_lwo2(60, 50, uvmaps=1, vmads=1, surfaces=2))
+    x = lwoObject(str(infile))
+    x.ch.use_numpy = use_numpy
+    x.read()
+    layer = x.layers[0]
+
+    attributes = ["position", "normal", "uv"]
+    vertices, indices = build_vertex_buffer(layer, attributes, x.tags, x.surfs, triangles=False)
+    assert vertices.shape[1] == 8
+    name = next(iter(layer.uvmaps_vmap))
+    uvs = corner_uvs(layer, name)
+    assert np.array_equal(vertices[indices, 6:], uvs)
+    pnts = np.asarray(layer.pnts, dtype=np.float32).reshape(-1, 3)
+    assert np.array_equal(vertices[indices, :3], pnts[PolygonArray.from_lists(layer.pols).indices])
+    assert len(vertices) == len(np.unique(vertices, axis=0))